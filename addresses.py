@@ -0,0 +1,88 @@
+import re
+import logging
+from functools import lru_cache
+from keccak import keccak256
+
+logger = logging.getLogger(__name__)
+
+# Checksums kept in memory; repeated addresses are hashed once
+CHECKSUM_CACHE_SIZE = 65536
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+_HEX_ADDRESS = re.compile(r'0[xX][0-9a-fA-F]{40}')
+
+@lru_cache(maxsize=CHECKSUM_CACHE_SIZE)
+def to_checksum_address(address):
+    """EIP-55 mixed-case form of a 0x-prefixed hex address"""
+    hex_part = address[2:].lower()
+    digest = keccak256(hex_part.encode('ascii')).hex()
+    return "0x" + "".join(c.upper() if int(digest[i], 16) >= 8 else c for i, c in enumerate(hex_part))
+
+def check_address(address):
+    """Return the reason an address is unusable, or None if it is valid"""
+    address = str(address).strip()
+    if not address.startswith(('0x', '0X')):
+        return "missing 0x prefix"
+    if len(address) != 42:
+        return f"wrong length ({len(address) - 2} hex digits instead of 40)"
+    if not _HEX_ADDRESS.fullmatch(address):
+        return "not hexadecimal"
+    if address[2:] == "0" * 40:
+        return "zero address"
+    # All-lowercase or all-uppercase addresses carry no checksum
+    hex_part = address[2:]
+    if hex_part != hex_part.lower() and hex_part != hex_part.upper():
+        if to_checksum_address(address) != "0x" + hex_part:
+            return "checksum mismatch (mistyped character?)"
+    return None
+
+class AddressReport:
+    """
+    Outcome of validate_addresses() for a batch of rows.
+
+    valid lists the (row_number, row) pairs with usable addresses, invalid
+    lists (row_number, address, reason) for the rest, and duplicates maps
+    each address that occurs more than once (lowercase) to its row numbers.
+    """
+
+    def __init__(self):
+        self.valid = []
+        self.invalid = []
+        self.duplicates = {}
+
+    def summary(self):
+        """One-line description for the status pane and logs"""
+        duplicate_rows = sum(len(rows) for rows in self.duplicates.values())
+        return (f"{len(self.valid)} valid addresses, {len(self.invalid)} invalid, "
+                f"{len(self.duplicates)} duplicated across {duplicate_rows} rows")
+
+    def issues(self):
+        """Human-readable lines for every invalid and duplicated address"""
+        lines = [f"Row {row_number}: {reason} ({address})" for row_number, address, reason in self.invalid]
+        for address, rows in self.duplicates.items():
+            lines.append(f"Rows {', '.join(map(str, rows))}: duplicate address {address}")
+        return lines
+
+def validate_addresses(rows):
+    """
+    Check the address of every (row_number, [address, value]) pair in one pass.
+
+    Addresses are checked for the 0x prefix, length, hex digits and, when
+    written in mixed case, their EIP-55 checksum. Repeated addresses are
+    reported as duplicates but still count as valid.
+    """
+    report = AddressReport()
+    seen = {}
+    for row_number, row in rows:
+        address = str(row[0]).strip()
+        reason = check_address(address)
+        if reason:
+            report.invalid.append((row_number, address, reason))
+            continue
+        report.valid.append((row_number, row))
+        seen.setdefault(address.lower(), []).append(row_number)
+    report.duplicates = {address: numbers for address, numbers in seen.items() if len(numbers) > 1}
+    if report.invalid or report.duplicates:
+        logger.warning(report.summary())
+    return report
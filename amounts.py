@@ -0,0 +1,132 @@
+import re
+import logging
+from decimal import Decimal, InvalidOperation
+
+logger = logging.getLogger(__name__)
+
+# Token decimals; the form takes values in the smallest unit (wei)
+DECIMALS = 18
+
+# Characters accepted as thousands separators (the decimal separator is excluded)
+THOUSANDS_SEPARATORS = (',', '.', ' ', '\u00a0', '\u202f', "'", '_')
+
+# Largest value a uint256 argument can hold
+MAX_UINT256 = 2 ** 256 - 1
+
+_NUMBER = re.compile(r'([+-]?)([^eE]*)(?:[eE]([+-]?[0-9]+))?')
+_DIGITS = re.compile(r'[0-9]*')
+_GROUPED = re.compile(r'[0-9]{1,3}(,[0-9]{3})+')
+
+class AmountError(ValueError):
+    """Raised for a value that cannot be converted to wei exactly"""
+
+def parse_amount(text, decimal_separator='.'):
+    """
+    Parse a sheet value into an exact Decimal.
+
+    Accepts thousands separators grouped by three (e.g. "1,234.5" or,
+    with decimal_separator=',', "1.234,5") and scientific notation
+    ("1.5e-3"). Never goes through float.
+    """
+    if isinstance(text, Decimal):
+        return text
+    if isinstance(text, int) and not isinstance(text, bool):
+        return Decimal(text)
+    if isinstance(text, float):
+        # The shortest repr, so 0.1 stays 0.1 rather than its binary expansion
+        return Decimal(repr(text))
+
+    match = _NUMBER.fullmatch(str(text).strip())
+    if not match or not match.group(2):
+        raise AmountError(f"not a number: {text!r}")
+    sign, number, exponent = match.groups()
+
+    integer, _, fraction = number.partition(decimal_separator)
+    separators = {c for c in integer if c in THOUSANDS_SEPARATORS and c != decimal_separator}
+    if len(separators) > 1:
+        raise AmountError(f"mixed thousands separators: {text!r}")
+    if separators:
+        separator = separators.pop()
+        if not _GROUPED.fullmatch(integer.replace(separator, ',')):
+            raise AmountError(f"misplaced thousands separator: {text!r}")
+        integer = integer.replace(separator, '')
+    if not (integer or fraction) or not _DIGITS.fullmatch(integer) or not _DIGITS.fullmatch(fraction):
+        raise AmountError(f"not a number: {text!r}")
+
+    try:
+        return Decimal(f"{sign}{integer or '0'}{'.' + fraction if fraction else ''}e{exponent or '0'}")
+    except InvalidOperation:
+        raise AmountError(f"not a number: {text!r}")
+
+def to_wei(value, decimals=DECIMALS, decimal_separator='.'):
+    """
+    Convert an amount in whole tokens to integer wei, exactly.
+
+    Raises AmountError for zero and negative values, values with more
+    than decimals fractional digits and values that do not fit in a
+    uint256.
+    """
+    amount = parse_amount(value, decimal_separator)
+    if not amount.is_finite():
+        raise AmountError(f"not a finite number: {value!r}")
+    sign, digits, exponent = amount.as_tuple()
+    units = int(''.join(map(str, digits)) or '0')
+    if units == 0:
+        # Also "-0"; locking nothing is never what the sheet meant
+        raise AmountError(f"zero amount: {value!r}")
+    if sign:
+        raise AmountError(f"negative amount: {value!r}")
+
+    exponent += decimals
+    # Checked before the power is taken, so "1e999999999" and "1e-999999999" fail fast
+    if len(digits) + exponent > len(str(MAX_UINT256)):
+        raise AmountError(f"amount too large: {value!r}")
+    if -exponent > len(digits):
+        # Below one wei, whatever the digits are
+        raise AmountError(f"more than {decimals} decimal places: {value!r}")
+    if exponent >= 0:
+        wei = units * 10 ** exponent
+    else:
+        wei, remainder = divmod(units, 10 ** -exponent)
+        if remainder:
+            raise AmountError(f"more than {decimals} decimal places: {value!r}")
+    if wei > MAX_UINT256:
+        raise AmountError(f"amount too large: {value!r}")
+    return wei
+
+def normalize_amount(text, decimal_separator='.'):
+    """Rewrite a sheet value as a plain decimal string without separators or exponent"""
+    return format(parse_amount(text, decimal_separator), 'f')
+
+def convert_batch(rows, decimals=DECIMALS, decimal_separator='.'):
+    """
+    Check the value of every (row_number, [address, value]) pair in one pass.
+
+    Returns (valid, invalid). valid lists the convertible rows with their
+    value rewritten by normalize_amount, so later to_wei() calls need no
+    locale settings. invalid lists (row_number, value, reason) for every
+    row whose value cannot be converted exactly, so bad rows can be
+    reported before any browser work starts.
+    """
+    invalid = []
+    valid = list(iter_converted(rows, invalid, decimals, decimal_separator))
+    if invalid:
+        logger.warning(f"{len(invalid)} of {len(valid) + len(invalid)} rows have invalid amounts")
+    return valid, invalid
+
+def iter_converted(rows, invalid, decimals=DECIMALS, decimal_separator='.'):
+    """
+    Streaming form of convert_batch: yield the convertible rows with their
+    value normalized and append (row_number, value, reason) to invalid for
+    the rest, so rows can be checked as the sheet chunks arrive.
+    """
+    for row_number, row in rows:
+        try:
+            to_wei(row[1], decimals, decimal_separator)
+            normalized = normalize_amount(row[1], decimal_separator)
+        except AmountError as e:
+            invalid.append((row_number, row[1], str(e)))
+            continue
+        if normalized != row[1]:
+            row = [row[0], normalized] + list(row[2:])
+        yield row_number, row
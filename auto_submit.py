@@ -1,6 +1,9 @@
-import time
 import logging
-from sheet_reader import get_sheet_data
+from sheet_reader import iter_sheet_data, iter_valid_rows
+from amounts import iter_converted
+from addresses import validate_addresses
+from run_journal import RunJournal, skip_completed, skip_exported
+from dedupe_index import DedupeIndex
 from bscscan_filler import fill_bscscan_contract
 
 # Set up logging
@@ -24,33 +27,53 @@ def auto_submit():
     logger.info(f"Starting process with spreadsheet: {spreadsheet_url}")
     logger.info(f"Reading rows {start_row} to {end_row}, columns {columns}")
     
-    # Step 1: Get the data from the Google Sheet
+    # Rows confirmed in earlier runs are not filled again when resuming, unless their content changed
+    # Address/amount pairs already submitted to this contract are skipped
+    dedupe = DedupeIndex(website_url)
+    journal = RunJournal(spreadsheet_url, dedupe=dedupe)
+    completed = {}
+    resume = input("Skip rows already completed in earlier runs? (y/n): ")
+    if resume.lower() == 'y':
+        completed = journal.completed_rows()
+    
+    # Step 1: Get the data from the Google Sheet and check every amount and address up front,
+    # row by row as the chunks arrive, keeping only the rows that pass
+    invalid = []
     try:
-        data = get_sheet_data(spreadsheet_url, start_row, end_row, columns)
-        logger.info(f"Successfully retrieved {len(data)} rows of data")
-        
-        if not data:
-            logger.warning("No data found in spreadsheet. Please check your inputs.")
-            return
+        rows = iter_valid_rows(iter_sheet_data(spreadsheet_url, start_row, end_row, columns))
+        report = validate_addresses(iter_converted(rows, invalid))
     except Exception as e:
         logger.error(f"Error retrieving data from spreadsheet: {e}")
         return
     
+    rows = list(skip_exported(skip_completed(report.valid, completed), journal.exported_rows()))
+    if not rows and not invalid and not report.invalid:
+        logger.warning("No data found in spreadsheet. Please check your inputs.")
+        return
+    
     # Print preview of data
     logger.info("Data preview:")
-    for i, row in enumerate(data[:3]):  # Show first 3 rows as preview
-        logger.info(f"Row {i+start_row}: {row}")
+    for row_number, row in rows[:3]:  # Show first 3 rows as preview
+        logger.info(f"Row {row_number}: {row}")
     
-    if len(data) > 3:
-        logger.info(f"... and {len(data)-3} more rows")
+    if len(rows) > 3:
+        logger.info(f"... and {len(rows) - 3} more rows")
     
-    confirm = input("Data retrieved. Proceed with form filling? (y/n): ")
-    if confirm.lower() != 'y':
+    for row_number, value, reason in invalid:
+        logger.warning(f"Row {row_number}: invalid amount ({reason})")
+    for line in report.issues():
+        logger.warning(line)
+    rejected = len(invalid) + len(report.invalid)
+    if rejected:
+        confirm = input(f"{rejected} rows have invalid amounts or addresses. Skip them and proceed? (y/n): ")
+    else:
+        confirm = input("Data retrieved. Proceed with form filling? (y/n): ")
+    if confirm.lower() != 'y' or not rows:
         logger.info("Process cancelled by user")
         return
 
     # Step 2: Fill the BSCScan contract form with each row of data
-    fill_bscscan_contract(website_url, data)
+    fill_bscscan_contract(website_url, rows, journal=journal, dedupe=dedupe)
 
     logger.info("Process completed!")
 
@@ -0,0 +1,110 @@
+"""
+Measure form-filling throughput against the local write-contract fixture.
+
+Serves benchmarks/fixtures, opens it in headless Chrome and fills generated
+rows with the same fill_row/clear_row steps the worker pool uses, then
+reports rows/sec and p50/p95 latency per step. Nothing touches bscscan.com.
+
+    python benchmarks/bench_fill.py --rows 200 --fill-mode js
+    python benchmarks/bench_fill.py --rows 200 --workers 3 --latency 0.05
+"""
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import serve_fixture
+from amounts import to_wei
+from run_metrics import RunMetrics
+from browser_session import create_driver
+from worker_pool import BrowserWorkerPool
+from contract_form import (ContractFrame, wait_for_page_ready, fill_row, clear_row,
+                           FILL_MODE_KEYS, FILL_MODE_JS, READY_TIMEOUT, POLL_INTERVAL)
+
+def generate_rows(count, seed=0):
+    """(row_number, [address, value]) pairs with random addresses and amounts"""
+    rng = random.Random(seed)
+    for i in range(count):
+        address = "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+        value = f"{rng.randint(1, 100000)}.{rng.randint(0, 999999):06d}"
+        yield i + 2, [address, value]
+
+def run_single(url, rows, fill_mode, headless, reload_each_row, metrics, timeout, poll):
+    """Fill rows in one browser; returns the number of rows whose values didn't stick"""
+    driver = create_driver(headless=headless)
+    mismatches = 0
+    try:
+        driver.get(url)
+        wait_for_page_ready(driver, timeout, poll)
+        frame = ContractFrame(driver, timeout, poll)
+        for row_number, row in rows:
+            if reload_each_row:
+                frame.invalidate()
+                driver.refresh()
+                wait_for_page_ready(driver, timeout, poll)
+            timer = metrics.start_row()
+            value_in_wei = to_wei(row[1])
+            fill_row(driver, frame, row[0], value_in_wei, fill_mode, timeout, poll, timer)
+            # The fixture tracks values through input/change events, like the real dapp
+            state = driver.execute_script("return window.__formState;") or {}
+            if state.get('input_6_2') != row[0] or state.get('input_6_3') != str(value_in_wei):
+                mismatches += 1
+            clear_row(driver, frame, fill_mode, timeout, poll, timer)
+            timer.finish()
+    finally:
+        driver.quit()
+    metrics.finish({'filled': len(metrics.durations.get('row', ()))})
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fill engine against the local fixture")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--fill-mode", choices=[FILL_MODE_KEYS, FILL_MODE_JS], default=FILL_MODE_JS)
+    parser.add_argument("--workers", type=int, default=1, help="fill with a BrowserWorkerPool of this size")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fixture response")
+    parser.add_argument("--collapse-ms", type=int, default=350, help="duration of the expand animation")
+    parser.add_argument("--enable-ms", type=int, default=0, help="delay before the inputs are enabled")
+    parser.add_argument("--reload-each-row", action="store_true",
+                        help="reload the page before every row (cold frame and collapsed panel)")
+    parser.add_argument("--show", action="store_true", help="show the browser window")
+    parser.add_argument("--timeout", type=float, default=READY_TIMEOUT)
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--output", help="also write the metrics (.json, or .prom for Prometheus text)")
+    args = parser.parse_args(argv)
+
+    server, url = serve_fixture(latency=args.latency)
+    url += f"?collapse_ms={args.collapse_ms}&enable_ms={args.enable_ms}"
+    metrics = RunMetrics()
+    rows = generate_rows(args.rows)
+    try:
+        if args.workers > 1:
+            pool = BrowserWorkerPool(url, workers=args.workers, fill_mode=args.fill_mode,
+                                     headless=not args.show, timeout=args.timeout, poll=args.poll,
+                                     metrics=metrics)
+            pool.run(rows)
+            mismatches = None
+        else:
+            mismatches = run_single(url, rows, args.fill_mode, not args.show, args.reload_each_row,
+                                    metrics, args.timeout, args.poll)
+    finally:
+        server.shutdown()
+
+    filled = len(metrics.durations.get('row', ()))
+    elapsed = metrics.elapsed()
+    print(f"fill mode {args.fill_mode}, {args.workers} worker(s), latency {args.latency}s, "
+          f"collapse {args.collapse_ms}ms, enable {args.enable_ms}ms")
+    print(f"{filled} rows in {elapsed:.2f}s: {filled / elapsed if elapsed else 0:.2f} rows/sec")
+    print(f"{'step':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for step, stats in metrics.step_stats().items():
+        print(f"{step:<14}{stats['count']:>7}{stats['p50'] * 1000:>10.1f}"
+              f"{stats['p95'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}")
+    if mismatches:
+        print(f"WARNING: {mismatches} rows did not reach the page's input events")
+    if args.output:
+        metrics.write(args.output)
+    return 1 if mismatches or filled < args.rows else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Compare how long the packaged app takes to launch under each build profile.
+
+Launches the executable built by build_exe.py for every profile several
+times with BSCSCAN_EXIT_ON_FIRST_WINDOW set, so the app exits as soon as
+its window is drawn, and reports the first (cold cache) launch, the median
+and worst of the rest, and the size of the bundle. --build runs the
+missing builds first.
+
+    python build_exe.py --profile onedir
+    python benchmarks/bench_launch.py --runs 5
+    python benchmarks/bench_launch.py --build --profiles onefile onedir
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from build_exe import PROFILES, build_executable, executable_path
+
+# Seconds a single launch may take before it counts as hung
+LAUNCH_TIMEOUT = 120
+
+def launch_once(path):
+    """Seconds from starting the executable until it exits after drawing its window"""
+    env = dict(os.environ, BSCSCAN_EXIT_ON_FIRST_WINDOW='1')
+    started = time.perf_counter()
+    subprocess.run([path], cwd=os.path.dirname(path), env=env, check=True, timeout=LAUNCH_TIMEOUT,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def bundle_size(path, profile):
+    """Bytes shipped for the profile: the executable, or its whole folder for one-dir builds"""
+    if profile != 'onedir':
+        return os.path.getsize(path)
+    total = 0
+    for folder, _, files in os.walk(os.path.dirname(path)):
+        total += sum(os.path.getsize(os.path.join(folder, name)) for name in files)
+    return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare launch times of the build profiles")
+    parser.add_argument("--profiles", nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--runs", type=int, default=5, help="launches per profile after the first")
+    parser.add_argument("--build", action="store_true", help="build profiles that have no executable yet")
+    args = parser.parse_args(argv)
+
+    # build_exe works relative to the repository
+    os.chdir(REPO_DIR)
+    print(f"{'profile':<10}{'first s':>9}{'median s':>10}{'max s':>8}{'size MB':>10}")
+    missing = 0
+    for profile in args.profiles:
+        path = os.path.abspath(executable_path(profile))
+        if not os.path.exists(path) and args.build:
+            build_executable(profile, package=False)
+        if not os.path.exists(path):
+            print(f"{profile:<10}not built (python build_exe.py --profile {profile})")
+            missing += 1
+            continue
+        first = launch_once(path)
+        times = [launch_once(path) for _ in range(args.runs)]
+        median = statistics.median(times) if times else first
+        worst = max(times) if times else first
+        print(f"{profile:<10}{first:>9.2f}{median:>10.2f}{worst:>8.2f}"
+              f"{bundle_size(path, profile) / 1e6:>10.1f}")
+    return 1 if missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
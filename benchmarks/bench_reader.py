@@ -0,0 +1,85 @@
+"""
+Measure how the sheet reader scales with sheet size, without Google.
+
+Registers a FakeClient in place of the gspread client and reads generated
+sheets through sheet_reader.get_sheet_data (the whole range as a list) and
+iter_sheet_data (streamed, as the fill loop consumes it). For every size it
+reports the time to the first row, the total time, rows/sec, the time
+spent inside the fake itself and the peak memory traced while reading.
+
+    python benchmarks/bench_reader.py --sizes 1000 10000 100000 1000000
+    python benchmarks/bench_reader.py --call-latency 0.3 --row-latency 0.00001
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sheets import FakeClient
+from sheet_reader import register_client, get_sheet_data, iter_sheet_data, CHUNK_SIZE
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/fake-{rows}/edit"
+COLUMNS = [1, 2]
+
+def read_list(url, rows, chunk_size):
+    # get_sheet_data always reads in CHUNK_SIZE chunks
+    return iter(get_sheet_data(url, 2, rows + 1, COLUMNS))
+
+def read_stream(url, rows, chunk_size):
+    return iter_sheet_data(url, 2, rows + 1, COLUMNS, chunk_size=chunk_size)
+
+MODES = {'list': read_list, 'stream': read_stream}
+
+def measure(mode, rows, chunk_size, options, trace_memory):
+    """Read one generated sheet; returns a dict of timings (and peak memory if traced)"""
+    client = FakeClient(rows=rows, **options)
+    register_client(client)
+    url = SHEET_URL.format(rows=rows)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    iterator = MODES[mode](url, rows, chunk_size)
+    first_row = None
+    count = 0
+    for _ in iterator:
+        if first_row is None:
+            first_row = time.perf_counter() - started
+        count += 1
+    total = time.perf_counter() - started
+    result = {'rows': count, 'first_row': first_row or total, 'total': total,
+              'serve': client.worksheet.serve_seconds, 'calls': client.worksheet.calls}
+    if trace_memory:
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sheet reader against a local fake")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--modes", nargs='+', choices=sorted(MODES), default=sorted(MODES))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per request when streaming")
+    parser.add_argument("--call-latency", type=float, default=0.0, help="seconds added to every get()")
+    parser.add_argument("--row-latency", type=float, default=0.0, help="seconds added per returned row")
+    parser.add_argument("--no-memory", action="store_true", help="skip the separate traced-memory pass")
+    args = parser.parse_args(argv)
+    options = {'call_latency': args.call_latency, 'row_latency': args.row_latency}
+
+    print(f"{'mode':<8}{'rows':>9}{'first ms':>10}{'total s':>9}{'rows/sec':>11}"
+          f"{'fake s':>8}{'calls':>7}{'peak MB':>9}")
+    for rows in args.sizes:
+        for mode in args.modes:
+            # Timings come from an untraced pass; tracing slows allocation-heavy code down
+            result = measure(mode, rows, args.chunk_size, options, trace_memory=False)
+            peak = "" if args.no_memory else \
+                f"{measure(mode, rows, args.chunk_size, options, trace_memory=True)['peak_bytes'] / 1e6:>9.1f}"
+            rate = result['rows'] / result['total'] if result['total'] else 0
+            print(f"{mode:<8}{result['rows']:>9}{result['first_row'] * 1000:>10.1f}{result['total']:>9.2f}"
+                  f"{rate:>11.0f}{result['serve']:>8.2f}{result['calls']:>7}{peak}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
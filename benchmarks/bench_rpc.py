@@ -0,0 +1,80 @@
+"""
+Measure JSON-RPC submission throughput against the local stub node.
+
+Serves stub_rpc_node, submits generated rows with rpc_submitter for each
+--max-in-flight value and reports rows/sec with p50/p95 send and receipt
+latency. Nothing leaves the machine.
+
+    python benchmarks/bench_rpc.py --rows 500 --max-in-flight 1 8 32 --block-time 1
+    python benchmarks/bench_rpc.py --latency 0.05 --private-key 0x<test key>   # needs eth_account
+"""
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_rpc_node import serve_stub_node, DEV_ACCOUNT, ABI_FILE
+from contract_call import load_abi, signature_from_abi
+from run_metrics import RunMetrics
+from row_scheduler import FILLED, FAILED, PENDING
+from rpc_submitter import RpcSubmitter
+
+CONTRACT = "0xBD576D184f5843881e471f9292036a076CB532b0"
+
+def generate_rows(count, seed=0):
+    """(row_number, [address, value]) pairs with random addresses and amounts"""
+    rng = random.Random(seed)
+    for i in range(count):
+        address = "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+        value = f"{rng.randint(1, 100000)}.{rng.randint(0, 999999):06d}"
+        yield i + 2, [address, value]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the JSON-RPC backend against a local stub node")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--max-in-flight", type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds added to every RPC response")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds until a transaction is mined")
+    parser.add_argument("--poll", type=float, default=0.2, help="seconds between receipt polls")
+    parser.add_argument("--fail-every", type=int, default=0, help="revert every Nth transaction")
+    parser.add_argument("--private-key", help="sign locally with this test key (needs eth_account)")
+    args = parser.parse_args(argv)
+
+    raw_sender = DEV_ACCOUNT
+    if args.private_key:
+        from eth_account import Account
+        raw_sender = Account.from_key(args.private_key).address
+
+    print(f"latency {args.latency}s, block time {args.block_time}s, "
+          f"{'local signing' if args.private_key else 'node signing'}")
+    print(f"{'in-flight':>9}{'rows/sec':>10}{'send p50':>10}{'send p95':>10}{'rcpt p50':>10}{'rcpt p95':>10}"
+          f"{'ok':>6}{'failed':>8}{'pending':>9}")
+    exit_code = 0
+    signature = signature_from_abi(load_abi(ABI_FILE))
+    for max_in_flight in args.max_in_flight:
+        # A fresh node per run, so nonces and blocks start from zero
+        server, url = serve_stub_node(latency=args.latency, block_time=args.block_time,
+                                      fail_every=args.fail_every, raw_sender=raw_sender)
+        metrics = RunMetrics()
+        try:
+            submitter = RpcSubmitter(url, CONTRACT, signature, private_key=args.private_key, max_in_flight=max_in_flight,
+                                     metrics=metrics, poll_interval=args.poll)
+            counts = submitter.run(generate_rows(args.rows))
+        finally:
+            server.shutdown()
+        stats = metrics.step_stats()
+        elapsed = metrics.elapsed()
+        send, receipt = stats.get('send', {}), stats.get('receipt', {})
+        print(f"{max_in_flight:>9}{counts[FILLED] / elapsed if elapsed else 0:>10.1f}"
+              f"{send.get('p50', 0) * 1000:>10.1f}{send.get('p95', 0) * 1000:>10.1f}"
+              f"{receipt.get('p50', 0) * 1000:>10.1f}{receipt.get('p95', 0) * 1000:>10.1f}"
+              f"{counts[FILLED]:>6}{counts[FAILED]:>8}{counts[PENDING]:>9}")
+        if counts[FILLED] + counts[FAILED] < args.rows and not args.fail_every:
+            exit_code = 1
+    print("send and receipt latencies in ms; rows/sec counts confirmed rows only")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
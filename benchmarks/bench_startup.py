@@ -0,0 +1,119 @@
+"""
+Measure how long bscscan_app takes to show its window.
+
+Every run starts a fresh interpreter that imports bscscan_app, creates the
+Tk root and BscscanApp and draws the first frame, and reports the import
+time, the time to the first window and which heavy dependencies were
+loaded on the way (none should be: selenium, undetected_chromedriver and
+gspread are imported on first Preview/Start). --importtime lists the
+slowest modules from python -X importtime.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --importtime --top 15 --budget 1.0
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only be imported once a feature needs them
+HEAVY_MODULES = ('selenium', 'undetected_chromedriver', 'gspread', 'oauth2client', 'eth_utils', 'Crypto')
+
+PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import bscscan_app
+imported = time.perf_counter()
+window = None
+error = None
+if {window}:
+    try:
+        root = bscscan_app.tk.Tk()
+        app = bscscan_app.BscscanApp(root)
+        root.update()
+        window = time.perf_counter() - started
+        root.destroy()
+    except bscscan_app.tk.TclError as e:
+        error = str(e)
+print(json.dumps({{'import': imported - started, 'window': window, 'error': error,
+                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def run_probe(window, workdir):
+    """One fresh interpreter; returns the probe's timings plus the whole process time"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    code = PROBE.format(window=window, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    # The app logs to a file in the working directory, so run it somewhere disposable
+    completed = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                               capture_output=True, text=True)
+    process = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "probe failed")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process'] = process
+    return result
+
+def import_times(workdir, top):
+    """Slowest modules by cumulative import time, as (microseconds, module) pairs"""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import bscscan_app"],
+                               cwd=workdir, env=env, capture_output=True, text=True)
+    entries = []
+    for line in completed.stderr.splitlines():
+        # import time:       self [us] |   cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), module.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+def describe(values):
+    if not values:
+        return "n/a"
+    return (f"median {statistics.median(values) * 1000:.0f} ms, "
+            f"min {min(values) * 1000:.0f} ms, max {max(values) * 1000:.0f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bscscan_app import and time to first window")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-window", action="store_true", help="only time the import (e.g. without a display)")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget", type=float, help="fail if the median time to first window exceeds this many seconds")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The first run also writes the .pyc files; it is reported but left out of the statistics
+        results = [run_probe(not args.no_window, workdir) for _ in range(args.runs + 1)]
+        slowest = import_times(workdir, args.top) if args.importtime else []
+
+    cold, warm = results[0], results[1:]
+    windows = [r['window'] for r in warm if r['window'] is not None]
+    print(f"first run: import {cold['import'] * 1000:.0f} ms, process {cold['process'] * 1000:.0f} ms")
+    print(f"import:        {describe([r['import'] for r in warm])}")
+    print(f"first window:  {describe(windows)}")
+    print(f"process total: {describe([r['process'] for r in warm])}")
+    errors = {r['error'] for r in warm if r['error']}
+    if errors:
+        print(f"window not shown: {'; '.join(sorted(errors))}")
+    heavy = sorted({name for r in results for name in r['heavy']})
+    print(f"heavy modules loaded at startup: {', '.join(heavy) if heavy else 'none'}")
+    if slowest:
+        print(f"{'cumulative ms':>14}  module")
+        for microseconds, module in slowest:
+            print(f"{microseconds / 1000:>14.1f}  {module}")
+
+    if args.budget is not None and windows and statistics.median(windows) > args.budget:
+        print(f"Over budget: first window took more than {args.budget:.2f}s")
+        return 1
+    return 1 if heavy else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Local stand-in for the parts of gspread the sheet reader uses.
+
+FakeClient.open_by_url(url).sheet1.get("A2:B5001") answers like the real
+Worksheet.get: a list of rows of strings for the requested A1 range, with
+rows past the end of the data left out. Cell values are derived from the
+row number, so sheets of a million rows cost no memory until read.
+Latency per call and per returned row can be added to mimic the API.
+
+    from fake_sheets import FakeClient
+    from sheet_reader import register_client
+    register_client(FakeClient(rows=100000))
+"""
+import re
+import time
+
+_A1_RANGE = re.compile(r'([A-Z]+)([0-9]+):([A-Z]+)([0-9]+)')
+
+# Multiplier spreading row numbers over the 160-bit address space
+_ADDRESS_STEP = 0x9E3779B97F4A7C15F39CC0605CEDC8341082276B
+
+def column_label(number):
+    """Convert a 1-based column number to its A1 label (1 -> A, 28 -> AB)"""
+    label = ""
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+def column_number(letters):
+    """Convert an A1 column label to its 1-based number (A -> 1, AB -> 28)"""
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord('A') + 1
+    return number
+
+class FakeWorksheet:
+    """
+    Generated worksheet: a header row, then one data row per sheet row.
+
+    Column A holds an address and column B an amount; further columns hold
+    filler text. Every invalid_every-th row has an empty amount, like a
+    partly filled sheet.
+    """
+
+    def __init__(self, rows=1000, columns=2, call_latency=0.0, row_latency=0.0, invalid_every=0, seed=0):
+        self.row_count = rows + 1
+        self.col_count = columns
+        self.call_latency = call_latency
+        self.row_latency = row_latency
+        self.invalid_every = invalid_every
+        self.seed = seed
+        self.calls = 0
+        # Time spent answering get(), so benchmarks can subtract the fake's own cost
+        self.serve_seconds = 0.0
+
+    def cell(self, row, column):
+        if row == 1:
+            return ("Address", "Value")[column - 1] if column <= 2 else f"Column {column}"
+        if column == 1:
+            return "0x%040x" % ((row + self.seed) * _ADDRESS_STEP % (1 << 160))
+        if column == 2:
+            if self.invalid_every and row % self.invalid_every == 0:
+                return ""
+            return f"{row % 1000}.{row % 97:02d}"
+        return f"r{row}c{column}"
+
+    def get(self, range_name):
+        """Values of an A1 range such as A2:B5001"""
+        started = time.perf_counter()
+        match = _A1_RANGE.fullmatch(range_name)
+        if not match:
+            raise ValueError(f"Unsupported range: {range_name}")
+        first_col, first_row = column_number(match.group(1)), int(match.group(2))
+        last_col, last_row = column_number(match.group(3)), int(match.group(4))
+        last_row = min(last_row, self.row_count)
+        last_col = min(last_col, self.col_count)
+        rows = [[self.cell(row, column) for column in range(first_col, last_col + 1)]
+                for row in range(first_row, last_row + 1)]
+        self.calls += 1
+        delay = self.call_latency + self.row_latency * len(rows)
+        if delay:
+            time.sleep(delay)
+        self.serve_seconds += time.perf_counter() - started
+        return rows
+
+    def get_all_values(self):
+        return self.get(f"A1:{column_label(self.col_count)}{self.row_count}")
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet):
+        self.sheet1 = worksheet
+        self.lastUpdateTime = "2024-01-01T00:00:00.000Z"
+        # Like gspread, so the sheet reader can look up the revision
+        worksheet.spreadsheet = self
+
+class FakeClient:
+    """Answers every open_by_url() with the same generated worksheet"""
+
+    def __init__(self, rows=1000, **options):
+        self.worksheet = FakeWorksheet(rows, **options)
+
+    def open_by_url(self, url):
+        return FakeSpreadsheet(self.worksheet)
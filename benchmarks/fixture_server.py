@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import threading
+import argparse
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture pages, optionally delaying every response"""
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_fixture(port=0, latency=0.0):
+    """
+    Start serving the fixture directory on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency: Seconds of artificial delay added to every response
+
+    Returns:
+        (server, url) where url points at the write-contract page
+    """
+    handler = type("FixtureHandler", (FixtureHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port),
+                                 functools.partial(handler, directory=FIXTURES_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/write_contract.html"
+    return server, url
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the local BSCScan write-contract fixture")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server, url = serve_fixture(args.port, args.latency)
+    print(f"Serving fixture at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
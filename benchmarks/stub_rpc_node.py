@@ -0,0 +1,246 @@
+"""
+Local stand-in for a BSC JSON-RPC node, for exercising rpc_submitter.
+
+Answers the calls the submitter makes (chain id, gas price, accounts,
+nonces, gas estimates, eth_sendTransaction/eth_sendRawTransaction,
+receipts and transaction lookups), including JSON-RPC batches. A sent
+transaction is "mined" block_time seconds later; it reverts if its
+calldata is not a sendLockByAdmin call or every fail_every-th time.
+Nonces must arrive in order, as on a real node.
+
+    python benchmarks/stub_rpc_node.py --port 8545 --block-time 3
+"""
+import os
+import sys
+import json
+import time
+import threading
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keccak import keccak256
+
+CHAIN_ID = 97
+GAS_PRICE = 3 * 10 ** 9
+GAS_USED = 52000
+
+# ABI of the contract behind the fixture form, as BscScan exports it
+ABI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "contract_abi.json")
+
+# Selector of sendLockByAdmin(uint8,address,uint256), the function in ABI_FILE
+# and on the fixture form; a literal, so calldata built from a wrong
+# signature reverts instead of being checked against itself
+SEND_LOCK_SELECTOR = "d5de9c81"
+
+# Account the stub signs eth_sendTransaction calls for
+DEV_ACCOUNT = "0x90f8bf6a479f320ead074411a4b0e7944ea8c9c1"
+
+def rlp_decode(data):
+    """Decode RLP bytes into nested lists of bytes"""
+    item, end = _rlp_item(data, 0)
+    if end != len(data):
+        raise ValueError("Trailing bytes after RLP item")
+    return item
+
+def _rlp_item(data, start):
+    prefix = data[start]
+    if prefix < 0x80:
+        return data[start:start + 1], start + 1
+    if prefix < 0xb8:
+        end = start + 1 + prefix - 0x80
+        return data[start + 1:end], end
+    if prefix < 0xc0:
+        size_length = prefix - 0xb7
+        size = int.from_bytes(data[start + 1:start + 1 + size_length], 'big')
+        begin = start + 1 + size_length
+        return data[begin:begin + size], begin + size
+    if prefix < 0xf8:
+        begin, end = start + 1, start + 1 + prefix - 0xc0
+    else:
+        size_length = prefix - 0xf7
+        begin = start + 1 + size_length
+        end = begin + int.from_bytes(data[start + 1:begin], 'big')
+    items = []
+    position = begin
+    while position < end:
+        item, position = _rlp_item(data, position)
+        items.append(item)
+    return items, end
+
+class StubNode:
+    """
+    Chain state behind the stub server.
+
+    Raw transactions can't be attributed to a sender without recovering
+    the signature, so they count against raw_sender's nonces (the address
+    of the key the benchmark signs with).
+    """
+
+    def __init__(self, block_time=0.0, fail_every=0, raw_sender=DEV_ACCOUNT):
+        self.block_time = block_time
+        self.fail_every = fail_every
+        self.raw_sender = raw_sender.lower()
+        self.nonces = {}
+        self.transactions = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def handle(self, request):
+        try:
+            method = getattr(self, request['method'])
+        except (AttributeError, KeyError):
+            return {'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32601, 'message': f"Method not found: {request.get('method')}"}}
+        try:
+            result = method(*request.get('params', []))
+        except ValueError as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32000, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    def eth_chainId(self):
+        return hex(CHAIN_ID)
+
+    def eth_gasPrice(self):
+        return hex(GAS_PRICE)
+
+    def eth_accounts(self):
+        return [DEV_ACCOUNT]
+
+    def eth_blockNumber(self):
+        return hex(self._block(time.time()))
+
+    def eth_getTransactionCount(self, address, block='latest'):
+        with self._lock:
+            return hex(self.nonces.get(address.lower(), 0))
+
+    def eth_estimateGas(self, tx, block=None):
+        if not self._valid_call(tx.get('data', '0x')):
+            raise ValueError("execution reverted")
+        return hex(GAS_USED)
+
+    def eth_sendTransaction(self, tx):
+        sender = tx.get('from', '').lower()
+        if sender != DEV_ACCOUNT:
+            raise ValueError(f"unknown account {tx.get('from')}")
+        nonce = int(tx['nonce'], 16) if 'nonce' in tx else None
+        payload = json.dumps(tx, sort_keys=True).encode('utf-8')
+        return self._accept(sender, nonce, tx.get('to'), tx.get('data', '0x'), payload)
+
+    def eth_sendRawTransaction(self, raw):
+        payload = bytes.fromhex(raw[2:])
+        fields = rlp_decode(payload)
+        if not isinstance(fields, list) or len(fields) != 9:
+            raise ValueError("only legacy transactions are supported")
+        nonce = int.from_bytes(fields[0], 'big')
+        return self._accept(self.raw_sender, nonce, "0x" + fields[3].hex(), "0x" + fields[5].hex(), payload)
+
+    def eth_getTransactionByHash(self, tx_hash):
+        with self._lock:
+            tx = self.transactions.get(tx_hash)
+        if tx is None:
+            return None
+        return {'hash': tx_hash, 'from': tx['from'], 'to': tx['to'], 'nonce': hex(tx['nonce']), 'input': tx['data']}
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        with self._lock:
+            tx = self.transactions.get(tx_hash)
+        if tx is None or time.time() < tx['mined_at']:
+            return None
+        return {'transactionHash': tx_hash, 'status': '0x1' if tx['succeeds'] else '0x0',
+                'blockNumber': hex(self._block(tx['mined_at'])), 'gasUsed': hex(GAS_USED),
+                'from': tx['from'], 'to': tx['to']}
+
+    def _accept(self, sender, nonce, to, data, payload):
+        tx_hash = "0x" + keccak256(payload).hex()
+        with self._lock:
+            if tx_hash in self.transactions:
+                raise ValueError("already known")
+            expected = self.nonces.get(sender, 0)
+            if nonce is None:
+                nonce = expected
+            if nonce < expected:
+                raise ValueError(f"nonce too low: next nonce {expected}, tx nonce {nonce}")
+            if nonce > expected:
+                raise ValueError(f"nonce too high: next nonce {expected}, tx nonce {nonce}")
+            self.nonces[sender] = nonce + 1
+            count = len(self.transactions) + 1
+            succeeds = self._valid_call(data) and not (self.fail_every and count % self.fail_every == 0)
+            self.transactions[tx_hash] = {'from': sender, 'to': to, 'nonce': nonce, 'data': data,
+                                          'mined_at': time.time() + self.block_time, 'succeeds': succeeds}
+        return tx_hash
+
+    def _valid_call(self, data):
+        # Selector plus three 32-byte arguments
+        return data.startswith("0x" + SEND_LOCK_SELECTOR) and len(data) == 2 + 2 * (4 + 3 * 32)
+
+    def _block(self, when):
+        return 1 + int((when - self.started) / self.block_time) if self.block_time else len(self.transactions)
+
+class StubRpcHandler(BaseHTTPRequestHandler):
+    """JSON-RPC over HTTP/1.1 with keep-alive, optionally delaying every response"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; don't let them wait for delayed ACKs
+    disable_nagle_algorithm = True
+    node = None
+    latency = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            request = json.loads(body)
+        except ValueError:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': "Parse error"}}
+        else:
+            if isinstance(request, list):
+                response = [self.node.handle(item) for item in request]
+            else:
+                response = self.node.handle(request)
+        data = json.dumps(response).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_stub_node(port=0, latency=0.0, **node_options):
+    """
+    Start a stub node on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency: Seconds of artificial delay added to every response
+        node_options: Passed to StubNode (block_time, fail_every, raw_sender)
+
+    Returns:
+        (server, url); server.node is the StubNode
+    """
+    node = StubNode(**node_options)
+    handler = type("StubRpcHandler", (StubRpcHandler,), {"node": node, "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.node = node
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stub BSC JSON-RPC node")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--block-time", type=float, default=3.0, help="seconds until a transaction is mined")
+    parser.add_argument("--fail-every", type=int, default=0, help="revert every Nth transaction")
+    args = parser.parse_args()
+
+    server, url = serve_stub_node(args.port, args.latency, block_time=args.block_time, fail_every=args.fail_every)
+    print(f"Stub node listening at {url} (sender {DEV_ACCOUNT})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
@@ -0,0 +1,82 @@
+import sys
+import os
+import platform
+
+def create_driver(headless=False, user_data_dir=None):
+    """
+    Launch Chrome through undetected_chromedriver with the app's options.
+
+    Args:
+        headless: Run without a visible window (e.g. on a server)
+        user_data_dir: Chrome profile directory to use instead of a fresh temporary one
+    """
+    # Imported here so the app window doesn't wait for selenium and the driver patcher
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-popup-blocking")
+    options.add_argument("--window-size=1920,1080")
+
+    # Add macOS-specific options
+    if platform.system() == 'Darwin':
+        # Check if running from app bundle and adjust paths accordingly
+        if getattr(sys, 'frozen', False):
+            # For macOS, we might need to specify the Chrome binary location
+            # if it's having trouble finding it
+            chrome_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+            if os.path.exists(chrome_path):
+                options.binary_location = chrome_path
+
+    return uc.Chrome(options=options, user_data_dir=user_data_dir, headless=headless)
+
+# Chrome profile kept between launches when a persistent profile is enabled
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".bscscan_automation", "chrome-profile")
+
+class BrowserSession:
+    """
+    Keeps one warm Chrome alive between runs in the same process.
+
+    acquire() hands back the running browser if it still responds, and
+    only launches a new one (several seconds of driver patching and
+    startup) when there is none or it was closed. With a user_data_dir,
+    cookies, cached scripts and verification state are kept on disk and
+    survive restarts; only one Chrome can use a profile at a time.
+    """
+
+    def __init__(self, user_data_dir=None, headless=False):
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        self.driver = None
+
+    def is_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, url=None):
+        """
+        Return (driver, reused), opening url unless the browser is already on it.
+        """
+        reused = self.is_alive()
+        if not reused:
+            self.quit()
+            if self.user_data_dir:
+                os.makedirs(self.user_data_dir, exist_ok=True)
+            self.driver = create_driver(headless=self.headless, user_data_dir=self.user_data_dir)
+        if url and (not reused or self.driver.current_url != url):
+            self.driver.get(url)
+        return self.driver, reused
+
+    def quit(self):
+        """Close the browser, if any"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
@@ -1,18 +1,23 @@
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchFrameException
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import time
+from sheet_reader import iter_sheet_data, iter_valid_rows, clear_client_cache
+from sheet_cache import SheetSnapshotCache
+from status_log import StatusLogSink, StatusLogHandler
+from preview_table import VirtualTable
+from amounts import iter_converted, to_wei
+from addresses import validate_addresses
+from browser_session import BrowserSession, DEFAULT_PROFILE_DIR
+from row_scheduler import RowScheduler, FILLED, SKIPPED, FAILED
+from run_journal import RunJournal, CONFIRMED, skip_completed, skip_exported
+from dedupe_index import DedupeIndex
+from run_metrics import RunMetrics, METRICS_FILE
 import logging
 import sys
 import os
+import shutil
+import filecmp
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
-import queue
+from concurrent.futures import ThreadPoolExecutor
 import platform
 
 # Set up logging
@@ -27,6 +32,12 @@ formatter = logging.Formatter('%(message)s')
 console.setFormatter(formatter)
 logger.addHandler(console)
 
+# Problems listed in the preview window; the rest are summarized
+MAX_LISTED_PROBLEMS = 1000
+
+# Snapshots of fetched ranges, so Start right after Preview skips the second fetch
+snapshot_cache = SheetSnapshotCache()
+
 # Resource path for finding files when using PyInstaller
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -37,35 +48,62 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-def get_sheet_data(spreadsheet_url, start_row, end_row):
-    """ Get data from Google Sheet """
+def install_service_account(source_path):
+    """ Copy the chosen service account file into place unless it is already there """
+    target_path = resource_path('service_account.json')
+    if os.path.exists(target_path) and filecmp.cmp(source_path, target_path, shallow=False):
+        return
+    shutil.copy(source_path, target_path)
+
+def fetch_sheet_rows(spreadsheet_url, start_row, end_row):
+    """ Fetch valid (row_number, [address, value]) pairs from Google Sheet """
     logger.info("Connecting to Google Sheets...")
     try:
-        # Define scope
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-
-        # Authenticate using service account
-        creds_path = resource_path('service_account.json')
-        creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
-        client = gspread.authorize(creds)
-
-        # Open the sheet by URL
-        sheet = client.open_by_url(spreadsheet_url).sheet1
-
-        # Read the desired rows (columns 1 and 2 only)
-        data = []
-        rows = sheet.get_all_values()[start_row-1:end_row]
-        for row in rows:
-            # Check if row has at least 2 values
-            if len(row) >= 2 and row[0] and row[1]:
-                data.append([row[0], row[1]])  # Only take first two columns
+        # Read only the desired rows of columns 1 and 2, chunk by chunk
+        rows = iter_sheet_data(spreadsheet_url, start_row, end_row, [1, 2],
+                               creds_path=resource_path('service_account.json'), cache=snapshot_cache)
+        data = list(iter_valid_rows(rows))
 
         logger.info(f"Successfully retrieved {len(data)} rows of data")
         return data
     except Exception as e:
         logger.error(f"Error retrieving data from spreadsheet: {e}")
+        # Reconnect from scratch next time in case a cached handle went stale
+        clear_client_cache()
+        return None
+
+def fetch_checked_rows(spreadsheet_url, start_row, end_row):
+    """
+    Fetch the range and check each row as its chunk arrives, keeping only
+    the rows that pass. Returns check_rows()'s result, or None on error.
+    """
+    logger.info("Connecting to Google Sheets...")
+    try:
+        rows = iter_sheet_data(spreadsheet_url, start_row, end_row, [1, 2],
+                               creds_path=resource_path('service_account.json'), cache=snapshot_cache)
+        checked = check_rows(iter_valid_rows(rows))
+        logger.info(f"Successfully retrieved and checked {len(checked[0]) + checked[2]} rows of data")
+        return checked
+    except Exception as e:
+        logger.error(f"Error retrieving data from spreadsheet: {e}")
+        # Reconnect from scratch next time, as in fetch_sheet_rows
+        clear_client_cache()
         return None
 
+def check_rows(rows):
+    """
+    Validate the amounts and addresses of (row_number, row) pairs in one pass.
+
+    Returns (valid rows, problem descriptions, number of rows rejected).
+    Duplicated addresses are described but their rows stay valid. rows may
+    be a stream; only the valid ones are kept.
+    """
+    invalid = []
+    report = validate_addresses(iter_converted(rows, invalid))
+    problems = [f"Row {row_number}: invalid amount ({reason})" for row_number, _, reason in invalid]
+    problems.extend(report.issues())
+    return report.valid, problems, len(invalid) + len(report.invalid)
+
 class BscscanApp:
     def __init__(self, root):
         self.root = root
@@ -76,8 +114,10 @@ class BscscanApp:
         # For communication between threads
         self.continue_event = threading.Event()
         self.driver = None
+        # Browser kept warm between runs and reused on the next Start
+        self.session = BrowserSession()
         self.automation_thread = None
-        self.current_row_index = 0
+        self.scheduler = None
         
         # Set icon if available - use different approach on macOS
         self.set_app_icon()
@@ -140,6 +180,26 @@ class BscscanApp:
         ttk.Entry(service_frame, textvariable=self.service_account_path, width=40).pack(side=tk.LEFT)
         ttk.Button(service_frame, text="Browse", command=self.browse_service_account).pack(side=tk.LEFT, padx=5)
         
+        # Fill mode
+        self.fast_fill = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Fast fill (set all fields in one step)",
+                        variable=self.fast_fill).grid(column=1, row=5, padx=5, pady=5, sticky=tk.W)
+        
+        # Resume mode
+        self.resume = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Resume (skip rows completed in earlier runs)",
+                        variable=self.resume).grid(column=1, row=6, padx=5, pady=5, sticky=tk.W)
+        
+        # Persistent browser profile
+        self.persistent_profile = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Keep browser profile (cookies, verification) between launches",
+                        variable=self.persistent_profile).grid(column=1, row=7, padx=5, pady=5, sticky=tk.W)
+        
+        # Duplicate submissions
+        self.skip_submitted = tk.BooleanVar(value=True)
+        ttk.Checkbutton(input_frame, text="Skip address/amount pairs already submitted to this contract",
+                        variable=self.skip_submitted).grid(column=1, row=8, padx=5, pady=5, sticky=tk.W)
+        
         # Control buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -165,6 +225,13 @@ class BscscanApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.status_text.config(yscrollcommand=scrollbar.set)
         
+        # Status messages from any thread are batched into the text widget by the Tk loop
+        self.status_sink = StatusLogSink(self.root, self.status_text)
+        status_handler = StatusLogHandler(self.status_sink)
+        status_handler.setFormatter(formatter)
+        logger.addHandler(status_handler)
+        self.status_sink.start()
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress = ttk.Progressbar(main_frame, orient=tk.HORIZONTAL, 
@@ -184,16 +251,34 @@ class BscscanApp:
             self.service_account_path.set(filename)
     
     def update_status(self, message):
-        self.status_text.insert(tk.END, f"{message}\n")
-        self.status_text.see(tk.END)
-        self.root.update_idletasks()
+        """Log a status message; safe to call from the automation thread"""
+        logger.info(message)
+    
+    def ask(self, dialog, *args):
+        """
+        Show a messagebox dialog on the Tk thread and wait for its answer.
+
+        For the automation thread only; Tk dialogs must not be opened off
+        the Tk thread, and calling this on the Tk thread would deadlock.
+        """
+        answer = {}
+        answered = threading.Event()
+        
+        def show():
+            try:
+                answer['value'] = dialog(*args)
+            finally:
+                answered.set()
+        
+        self.root.after(0, show)
+        answered.wait()
+        return answer.get('value')
     
     def preview_data(self):
         try:
             # Save the service account file if it's provided
             if self.service_account_path.get():
-                import shutil
-                shutil.copy(self.service_account_path.get(), resource_path('service_account.json'))
+                install_service_account(self.service_account_path.get())
             
             # Validate input
             if not self.sheet_url.get():
@@ -214,9 +299,10 @@ class BscscanApp:
             
             # Get data in a separate thread
             def fetch_data():
-                data = get_sheet_data(self.sheet_url.get(), int(self.start_row.get()), int(self.end_row.get()))
-                if data:
-                    self.root.after(0, lambda: self.show_preview(data))
+                rows = fetch_sheet_rows(self.sheet_url.get(), int(self.start_row.get()), int(self.end_row.get()))
+                if rows:
+                    _, problems, _ = check_rows(rows)
+                    self.root.after(0, lambda: self.show_preview(rows, problems))
                 else:
                     self.root.after(0, lambda: self.update_status("Error: Could not retrieve data from sheet"))
                     self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
@@ -226,39 +312,29 @@ class BscscanApp:
             self.update_status(f"Error previewing data: {e}")
             self.preview_btn.config(state=tk.NORMAL)
     
-    def show_preview(self, data):
+    def show_preview(self, rows, problems=()):
         self.preview_btn.config(state=tk.NORMAL)
         
         # Create preview window
         preview = tk.Toplevel(self.root)
         preview.title("Data Preview")
-        preview.geometry("500x400")
-        
-        # Create a Treeview widget
-        columns = ('Address', 'Value')
-        tree = ttk.Treeview(preview, columns=columns, show='headings')
-        tree.heading('Address', text='Address')
-        tree.heading('Value', text='Value')
-        
-        # Configure column widths
-        tree.column('Address', width=300)
-        tree.column('Value', width=150)
-        
-        # Add data to the treeview
-        for i, row in enumerate(data):
-            tree.insert('', tk.END, values=row, tags=('even' if i % 2 == 0 else 'odd',))
+        preview.geometry("600x550" if problems else "600x450")
         
-        # Add alternating row colors
-        tree.tag_configure('odd', background='#f0f0f0')
-        tree.tag_configure('even', background='white')
+        # List invalid and duplicated rows above the data
+        if problems:
+            problem_frame = ttk.LabelFrame(preview, text=f"Problems found ({len(problems)})", padding="5")
+            problem_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+            problem_list = tk.Listbox(problem_frame, height=5, fg='#b00020')
+            problem_list.pack(fill=tk.X)
+            problem_list.insert(tk.END, *problems[:MAX_LISTED_PROBLEMS])
+            if len(problems) > MAX_LISTED_PROBLEMS:
+                problem_list.insert(tk.END, f"... and {len(problems) - MAX_LISTED_PROBLEMS} more")
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(preview, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
-        
-        # Pack the widgets
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        # Only the visible rows are materialized, so large ranges open instantly; rows show sheet row numbers
+        data = [row for _, row in rows]
+        table = VirtualTable(preview, ('Address', 'Value'), data, widths={'Address': 300, 'Value': 150},
+                             row_numbers=[row_number for row_number, _ in rows])
+        table.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
         
         # Add a label with the total
         ttk.Label(preview, text=f"Total rows: {len(data)}").pack(pady=5)
@@ -272,8 +348,7 @@ class BscscanApp:
         try:
             # Save the service account file if it's provided
             if self.service_account_path.get():
-                import shutil
-                shutil.copy(self.service_account_path.get(), resource_path('service_account.json'))
+                install_service_account(self.service_account_path.get())
             
             # Validate input
             if not self.sheet_url.get():
@@ -295,23 +370,23 @@ class BscscanApp:
             
             self.update_status("Starting automation process...")
             
-            # Get data
-            data = get_sheet_data(self.sheet_url.get(), int(self.start_row.get()), int(self.end_row.get()))
-            if not data:
-                self.update_status("Error: Could not retrieve data from sheet")
-                self.start_btn.config(state=tk.NORMAL)
-                self.preview_btn.config(state=tk.NORMAL)
-                return
-            
-            self.data = data
-            self.total_rows = len(data)
-            self.current_row_index = 0
+            # Read the settings here; Tk variables belong to this thread
+            settings = {
+                'sheet_url': self.sheet_url.get(),
+                'contract_url': self.contract_url.get(),
+                'start': start,
+                'end': end,
+                'resume': self.resume.get(),
+                'skip_submitted': self.skip_submitted.get(),
+                'fast_fill': self.fast_fill.get(),
+                'profile_dir': DEFAULT_PROFILE_DIR if self.persistent_profile.get() else None,
+            }
             
             # Reset the continue event
             self.continue_event.clear()
             
-            # Start the automation in a separate thread
-            self.automation_thread = threading.Thread(target=self.run_automation)
+            # Fetching and launching happen off the Tk thread so the window stays responsive
+            self.automation_thread = threading.Thread(target=self.run_automation, args=(settings,))
             self.automation_thread.daemon = True
             self.automation_thread.start()
         except Exception as e:
@@ -320,41 +395,120 @@ class BscscanApp:
             self.preview_btn.config(state=tk.NORMAL)
             self.continue_btn.config(state=tk.DISABLED)
     
-    def run_automation(self):
+    def prepare_rows(self, settings):
+        """
+        Fetch and validate the range for a run.
+
+        Returns (scheduler, journal), or None if there is nothing to fill or
+        the operator cancelled.
+        """
+        start, end = settings['start'], settings['end']
+        
+        # Rows confirmed in earlier runs are not filled again, unless their content changed
+        dedupe = DedupeIndex(settings['contract_url']) if settings['skip_submitted'] else None
+        journal = RunJournal(settings['sheet_url'], dedupe=dedupe)
+        prepared = None
         try:
-            url = self.contract_url.get()
-            self.update_status(f"Opening browser to {url}")
+            completed = journal.completed_rows() if settings['resume'] else {}
             
-            # Launch browser with macOS-specific options if needed
-            options = uc.ChromeOptions()
-            options.add_argument("--disable-notifications")
-            options.add_argument("--disable-popup-blocking")
-            options.add_argument("--window-size=1920,1080")
-            
-            # Add macOS-specific options
-            if platform.system() == 'Darwin':
-                # Check if running from app bundle and adjust paths accordingly
-                if getattr(sys, 'frozen', False):
-                    # For macOS, we might need to specify the Chrome binary location
-                    # if it's having trouble finding it
-                    chrome_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-                    if os.path.exists(chrome_path):
-                        options.binary_location = chrome_path
-            
-            self.driver = uc.Chrome(options=options)
-            self.driver.get(url)
+            # Check the whole range as it streams in so every amount is checked before filling
+            # starts, and completed rows are skipped only if their content still matches the journal
+            checked = fetch_checked_rows(settings['sheet_url'], start, end)
+            if checked is None:
+                self.update_status("Error: Could not retrieve data from sheet")
+                return None
+            rows, problems, rejected = checked
+            if problems and not self.confirm_row_problems(problems, rejected):
+                self.update_status("Cancelled: fix the listed rows and start again")
+                return None
+            # Rows waiting in a bundle exported by the CLI are left out even without resume
+            rows = skip_exported(skip_completed(rows, completed), journal.exported_rows())
+            scheduler = RowScheduler(rows, dedupe=dedupe)
+            if not scheduler.has_pending():
+                self.update_status(f"No rows left to process ({scheduler.summary()})")
+                return None
+            prepared = scheduler, journal
+            return prepared
+        finally:
+            # Unless the run goes ahead, nothing else closes the journal and dedupe index
+            if prepared is None:
+                journal.close()
+    
+    def launch_browser(self, url, profile_dir):
+        """Open (or reuse) the browser on the contract page and wait for it to load"""
+        # A different profile setting needs a new browser
+        if profile_dir != self.session.user_data_dir:
+            self.session.quit()
+            self.session = BrowserSession(user_data_dir=profile_dir)
+        
+        self.update_status(f"Opening browser to {url}")
+        
+        # Reuse the browser from the previous run if it's still open
+        driver, reused = self.session.acquire(url)
+        if reused:
+            self.update_status("Reusing the already open browser")
+        
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        # Wait for initial page load
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        self.update_status("Page loaded initially")
+        return driver
+    
+    def confirm_row_problems(self, problems, rejected):
+        """Report invalid and duplicated rows; returns True to skip the invalid ones and go on"""
+        for line in problems:
+            self.update_status(line)
+        lines = problems[:10]
+        if len(problems) > 10:
+            lines.append(f"... and {len(problems) - 10} more")
+        question = (f"Skip the {rejected} invalid rows and continue?" if rejected
+                    else "Continue anyway?")
+        return self.ask(messagebox.askyesno, "Check Data", "Problems found in the fetched rows:\n\n"
+                        + "\n".join(lines) + "\n\n" + question)
+    
+    def run_automation(self, settings):
+        # Selenium is imported on the first Start rather than with the app, so the window opens sooner
+        from selenium.common.exceptions import TimeoutException
+        from contract_form import ContractFrame, FILL_MODE_KEYS, FILL_MODE_JS
+        
+        try:
+            # The sheet is fetched and checked while the browser starts, so
+            # startup takes as long as the slower of the two, not both
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                launch = executor.submit(self.launch_browser, settings['contract_url'], settings['profile_dir'])
+                prepared = self.prepare_rows(settings)
+                # Leaving the block waits for the launch, so Start can't race a browser still starting
             
-            # Wait for initial page load
+            driver = None
             try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                self.update_status("Page loaded initially")
+                driver = launch.result()
             except TimeoutException:
                 self.update_status("Error: Initial page load timed out")
-                self.driver.quit()
+                self.session.quit()
+            except Exception as e:
+                self.update_status(f"Error opening browser: {e}")
+                self.session.quit()
+            if prepared is None or driver is None:
+                # A browser that did open is left for the next Start to reuse
+                if prepared is not None:
+                    prepared[1].close()
+                self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
                 return
             
+            self.driver = driver
+            self.scheduler, self.journal = prepared
+            self.first_row_number = settings['start']
+            self.total_rows = settings['end'] - settings['start'] + 1
+            self.fill_mode = FILL_MODE_JS if settings['fast_fill'] else FILL_MODE_KEYS
+            self.metrics = RunMetrics()
+            self.frame = ContractFrame(self.driver)
+            
             # Enable the continue button to let user signal completion of any verification
             self.root.after(0, lambda: self.update_status("IMPORTANT: Complete any CAPTCHA or verification if present"))
             self.root.after(0, lambda: self.update_status("Click 'Continue' in the app once the page is fully loaded"))
@@ -368,7 +522,7 @@ class BscscanApp:
             self.update_status("Continuing with form filling...")
             
             # Process data rows one by one, waiting for user confirmation between rows
-            self.process_next_row()
+            self.fill_rows()
             
         except Exception as e:
             self.update_status(f"Error during automation: {e}")
@@ -376,205 +530,188 @@ class BscscanApp:
             self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
             self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
     
-    def process_next_row(self):
-        """Process the next row and then wait for user confirmation"""
+    def fill_rows(self):
+        """Fill rows one at a time until the scheduler has none left"""
+        # Last filled row the operator hasn't moved past yet
+        unconfirmed = None
         try:
-            # Check if we're done
-            if self.current_row_index >= len(self.data):
-                self.update_status("All rows processed!")
-                messagebox.showinfo("Complete", "All rows have been processed.")
-                
-                # Ask before closing browser
-                if messagebox.askyesno("Close Browser", "Close the browser?"):
-                    if self.driver:
-                        self.driver.quit()
-                    self.update_status("Browser closed")
-                else:
-                    self.update_status("Browser left open. Close it manually when finished.")
-                
-                # Re-enable buttons when done
-                self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
-                self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
-                self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
-                return
-            
-            # Get current row data
-            row_data = self.data[self.current_row_index]
-            self.update_status(f"Processing row {self.current_row_index+1} of {len(self.data)}: {row_data}")
-            
-            try:
-                # Switch to the iframe containing contract elements
-                try:
-                    # First switch back to main content just to be safe
-                    self.driver.switch_to.default_content()
-                    
-                    # Wait for the iframe to be present
-                    iframe = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.ID, "writecontractiframe"))
-                    )
-                    self.update_status("Found contract iframe")
-                    
-                    # Switch to the iframe
-                    self.driver.switch_to.frame("writecontractiframe")
-                    self.update_status("Switched to contract iframe")
-                except (TimeoutException, NoSuchFrameException) as e:
-                    self.update_status(f"Error switching to iframe: {e}")
-                    if messagebox.askretry("Error", "Failed to find contract iframe. Retry?"):
-                        # Try again
-                        self.process_next_row()
-                        return
-                    else:
-                        # Skip to next row
-                        self.current_row_index += 1
-                        self.process_next_row()
-                        return
+            while True:
+                row = self.scheduler.next_row()
+                if row is None:
+                    break
                 
-                # Find and click the sendLockByAdmin dropdown
-                try:
-                    dropdown_selector = "a[href='#collapse6'][data-bs-toggle='collapse']"
-                    dropdown = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, dropdown_selector))
-                    )
-                    
-                    # Scroll to the element to ensure it's visible
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", dropdown)
-                    time.sleep(1)  # Allow time for scrolling
-                    
-                    # Check if dropdown is already expanded
-                    is_expanded = "collapsed" not in dropdown.get_attribute("class")
-                    
-                    if not is_expanded:
-                        # Try multiple approaches to click the element
-                        try:
-                            dropdown.click()
-                        except Exception:
-                            try:
-                                self.driver.execute_script("arguments[0].click();", dropdown)
-                            except Exception:
-                                from selenium.webdriver.common.action_chains import ActionChains
-                                ActionChains(self.driver).move_to_element(dropdown).click().perform()
-                        
-                        self.update_status("Clicked on sendLockByAdmin dropdown")
-                        time.sleep(2)
-                    else:
-                        self.update_status("sendLockByAdmin dropdown already expanded")
-                except Exception as e:
-                    self.update_status(f"Error finding or clicking dropdown: {e}")
-                    if messagebox.askretry("Error", f"Error accessing dropdown. Retry row {self.current_row_index+1}?"):
-                        # Try again with same row
-                        self.process_next_row()
-                        return
-                    else:
-                        # Skip to next row
-                        self.current_row_index += 1
-                        self.process_next_row()
-                        return
+                row_number, row_data = row
+                self.update_status(f"Processing sheet row {row_number}: {row_data}")
+                timer = self.metrics.start_row()
                 
-                # Fill in the form fields
-                try:
-                    # Set types field to 2
-                    types_field = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "input_6_1"))
-                    )
-                    types_field.clear()
-                    types_field.send_keys("2")
-                    self.update_status("Entered '2' in types field")
-                    
-                    # Set address field (first column from spreadsheet)
-                    address_field = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "input_6_2"))
-                    )
-                    address_field.clear()
-                    address_field.send_keys(row_data[0])
-                    self.update_status(f"Entered address: {row_data[0]}")
-                    
-                    # Set value field (second column from spreadsheet)
-                    value_field = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "input_6_3"))
-                    )
-                    value_field.clear()
-                    value_in_wei = int(float(row_data[1]) * 1e18)  # Convert to integer wei
-                    value_field.send_keys(str(value_in_wei))       # Send as string
-                    self.update_status(f"Entered value: {row_data[1]}")
-                    
-                    self.update_status(f"✓ Row {self.current_row_index+1} filled successfully")
-                except Exception as e:
-                    self.update_status(f"Error filling fields: {e}")
-                    if messagebox.askretry("Error", f"Error filling fields. Retry row {self.current_row_index+1}?"):
-                        # Try again with same row
-                        self.process_next_row()
-                        return
-                    else:
-                        # Skip to next row
-                        self.current_row_index += 1
-                        self.process_next_row()
-                        return
-                
-                # Save references to fields for clearing after user continues
-                self.types_field = types_field
-                self.address_field = address_field
-                self.value_field = value_field
+                # Try the row once; on errors the user decides between retry and skip
+                error = self.process_row(row_number, row_data, timer)
+                if error:
+                    if not self.ask(messagebox.askretry, "Error", f"{error}. Retry row {row_number}?"):
+                        self.scheduler.skip()
+                        self.journal.record(row_number, row_data, SKIPPED)
+                        self.update_status(f"Skipped row {row_number}")
+                    elif not self.scheduler.retry():
+                        self.journal.record(row_number, row_data, FAILED)
+                        self.update_status(f"Giving up on row {row_number} after {self.scheduler.max_retries} retries")
+                    continue
                 
-                # Increment row counter for next iteration
-                self.current_row_index += 1
+                self.scheduler.filled()
+                self.journal.record(row_number, row_data, FILLED)
+                unconfirmed = row
                 
                 # Update progress bar
-                progress_value = (self.current_row_index / self.total_rows) * 100
+                progress_value = ((row_number - self.first_row_number + 1) / self.total_rows) * 100
                 self.root.after(0, lambda: self.progress_var.set(progress_value))
                 
                 # Ask user to continue to next row
-                if self.current_row_index < len(self.data):
-                    self.update_status(f"Row {self.current_row_index} complete. Click Continue to process next row.")
+                if self.scheduler.has_pending():
+                    self.update_status(f"Row {row_number} complete. Click Continue to process next row.")
                     self.root.after(0, lambda: self.continue_btn.config(state=tk.NORMAL))
                     self.continue_event.wait()
                     self.continue_event.clear()
+                    timer.lap('confirm_wait')
                     self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
+                    self.journal.record(row_number, row_data, CONFIRMED)
+                    unconfirmed = None
                     
                     # Clear fields AFTER user clicks continue button
                     try:
-                        self.types_field.clear()
-                        self.address_field.clear()
-                        self.value_field.clear()
+                        if self.types_field is None:
+                            from contract_form import clear_fields_js
+                            clear_fields_js(self.driver)
+                        else:
+                            self.types_field.clear()
+                            self.address_field.clear()
+                            self.value_field.clear()
                         self.update_status("Cleared fields for next row")
                     except Exception as e:
                         self.update_status(f"Error clearing fields: {e}")
+                    timer.lap('clear')
+                timer.finish()
+            
+            # All done - trailing empty rows may end the stream early
+            self.root.after(0, lambda: self.progress_var.set(100))
+            self.update_status(f"All rows processed! ({self.scheduler.summary()})")
+            self.metrics.finish(self.scheduler.counts)
+            self.metrics.write(METRICS_FILE)
+            for line in self.metrics.summary_lines():
+                self.update_status(line)
+            self.ask(messagebox.showinfo, "Complete", "All rows have been processed.")
+            if unconfirmed is not None:
+                self.journal.record(unconfirmed[0], unconfirmed[1], CONFIRMED)
+            
+            # Ask before closing browser
+            if self.ask(messagebox.askyesno, "Close Browser", "Close the browser?"):
+                self.session.quit()
+                self.update_status("Browser closed")
+            else:
+                self.update_status("Browser left open. It will be reused by the next Start.")
+        except Exception as e:
+            self.update_status(f"Error processing row: {e}")
+        finally:
+            self.journal.close()
+        
+        # Re-enable buttons when done
+        self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
+        self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
+        self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
+    
+    def process_row(self, row_number, row_data, timer):
+        """Fill the form with one row, timing each step; returns None on success or a short error description"""
+        from selenium.common.exceptions import TimeoutException, NoSuchFrameException
+        from contract_form import scroll_into_view, wait_for_collapse_shown, fill_fields_js, form_values, FILL_MODE_JS
+        
+        try:
+            # Switch to the iframe containing contract elements, unless we're still in it
+            try:
+                if self.frame.enter():
+                    self.update_status("Switched to contract iframe")
+                timer.lap('frame_switch')
+            except (TimeoutException, NoSuchFrameException) as e:
+                self.frame.invalidate()
+                self.update_status(f"Error switching to iframe: {e}")
+                return "Failed to find contract iframe"
+            
+            # Find and click the sendLockByAdmin dropdown
+            try:
+                dropdown = self.frame.dropdown()
+                timer.lap('locate')
+                
+                # Check if dropdown is already expanded
+                is_expanded = "collapsed" not in dropdown.get_attribute("class")
+                
+                if not is_expanded:
+                    # Scroll to the element and wait until scrolling has stopped
+                    scroll_into_view(self.driver, dropdown)
                     
-                    # Process next row
-                    self.process_next_row()
-                else:
-                    # All done
-                    self.update_status("All rows processed!")
-                    messagebox.showinfo("Complete", "All rows have been processed.")
-                    
-                    # Ask before closing browser
-                    if messagebox.askyesno("Close Browser", "Close the browser?"):
-                        if self.driver:
-                            self.driver.quit()
-                        self.update_status("Browser closed")
-                    else:
-                        self.update_status("Browser left open. Close it manually when finished.")
+                    # Try multiple approaches to click the element
+                    try:
+                        dropdown.click()
+                    except Exception:
+                        try:
+                            self.driver.execute_script("arguments[0].click();", dropdown)
+                        except Exception:
+                            from selenium.webdriver.common.action_chains import ActionChains
+                            ActionChains(self.driver).move_to_element(dropdown).click().perform()
                     
-                    # Re-enable buttons when done
-                    self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
-                    self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
-                    self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
-                
+                    self.update_status("Clicked on sendLockByAdmin dropdown")
+                    wait_for_collapse_shown(self.driver)
+                else:
+                    self.update_status("sendLockByAdmin dropdown already expanded")
+                timer.lap('expand')
             except Exception as e:
-                self.update_status(f"Unexpected error: {e}")
-                if messagebox.askretry("Error", f"Unexpected error. Retry row {self.current_row_index+1}?"):
-                    # Try again with same row
-                    self.process_next_row()
+                self.frame.invalidate()
+                self.update_status(f"Error finding or clicking dropdown: {e}")
+                return "Error accessing dropdown"
+            
+            # Fill in the form fields
+            try:
+                value_in_wei = to_wei(row_data[1])  # Exact conversion to integer wei
+                
+                if self.fill_mode == FILL_MODE_JS:
+                    # Set all three fields and read them back in a single script call
+                    fill_fields_js(self.driver, form_values(row_data[0], value_in_wei))
+                    types_field = address_field = value_field = None
+                    self.update_status(f"Entered '2', address {row_data[0]} and value {row_data[1]}")
                 else:
-                    # Skip to next row
-                    self.current_row_index += 1
-                    self.process_next_row()
+                    # Fields located for an earlier row are reused while still attached
+                    types_field, address_field, value_field = self.frame.fields()
+                    self.type_row(types_field, address_field, value_field, row_data, value_in_wei)
+                
+                timer.lap('fill')
+                self.update_status(f"✓ Row {row_number} filled successfully")
+            except Exception as e:
+                self.frame.invalidate()
+                self.update_status(f"Error filling fields: {e}")
+                return "Error filling fields"
             
+            # Save references to fields for clearing after user continues
+            self.types_field = types_field
+            self.address_field = address_field
+            self.value_field = value_field
+            return None
         except Exception as e:
-            self.update_status(f"Error processing row: {e}")
-            # Re-enable buttons
-            self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.preview_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.continue_btn.config(state=tk.DISABLED))
+            self.frame.invalidate()
+            self.update_status(f"Unexpected error: {e}")
+            return "Unexpected error"
+    
+    def type_row(self, types_field, address_field, value_field, row_data, value_in_wei):
+        """Enter the row into the form field by field, like a user typing"""
+        # Set types field to 2
+        types_field.clear()
+        types_field.send_keys("2")
+        self.update_status("Entered '2' in types field")
+        
+        # Set address field (first column from spreadsheet)
+        address_field.clear()
+        address_field.send_keys(row_data[0])
+        self.update_status(f"Entered address: {row_data[0]}")
+        
+        # Set value field (second column from spreadsheet)
+        value_field.clear()
+        value_field.send_keys(str(value_in_wei))  # Send as string
+        self.update_status(f"Entered value: {row_data[1]}")
     
     def continue_action(self):
         """User clicked continue button - signal the automation thread to continue"""
@@ -589,7 +726,13 @@ def main():
         os.environ['PYTHONAPPSKEEPPATH'] = '1'
         
     root = tk.Tk()
-    app = BscscanApp(root)
+    BscscanApp(root)
+    
+    # Launch-time measurements (benchmarks/bench_launch.py) close the app once its window is drawn
+    if os.environ.get('BSCSCAN_EXIT_ON_FIRST_WINDOW'):
+        root.update()
+        root.destroy()
+        return
     root.mainloop()
 
 if __name__ == "__main__":
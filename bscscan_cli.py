@@ -0,0 +1,354 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from sheet_reader import iter_sheet_data, iter_valid_rows
+from amounts import iter_converted, to_wei
+from addresses import validate_addresses
+from row_scheduler import FAILED, PENDING
+from run_journal import RunJournal, JOURNAL_FILE, CONFIRMED, EXPORTED, skip_completed, skip_exported, row_hash
+from dedupe_index import DedupeIndex, DEDUPE_DB, contract_id
+from contract_call import load_abi, signature_from_abi, argument_types, FUNCTION_NAME, DEFAULT_TYPES
+from rpc_client import RpcError
+from rpc_submitter import RpcSubmitter, MAX_IN_FLIGHT
+from call_bundles import export_bundles, read_manifest, BUNDLE_FORMATS, DEFAULT_GAS_BUDGET, DEFAULT_GAS_PER_CALL
+from run_metrics import RunMetrics, METRICS_FILE
+from contract_form import FILL_MODE_KEYS, FILL_MODE_JS, READY_TIMEOUT, POLL_INTERVAL
+
+# Set up logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTRACT_URL = "https://bscscan.com/token/0xBD576D184f5843881e471f9292036a076CB532b0#writeContract"
+
+# Environment variable holding the key that signs transactions for --backend rpc
+PRIVATE_KEY_ENV = 'BSCSCAN_PRIVATE_KEY'
+
+# Ways of submitting rows: the write-contract form in Chrome, or transactions through a JSON-RPC node
+BACKENDS = ('browser', 'rpc')
+
+# Answers for each --on-error policy (see bscscan_filler.AUTO_ANSWERS)
+ERROR_POLICIES = {
+    'retry': {'retry': 'y', 'continue': 'y'},  # retry up to the scheduler's limit, then move on
+    'skip': {'retry': 'n', 'continue': 'y'},
+    'stop': {'retry': 'n', 'continue': 'n'},
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Fill the BSCScan sendLockByAdmin form from a Google Sheet without a GUI or prompts.")
+    parser.add_argument('--config', help="JSON file with any of the options below (command line wins)")
+    parser.add_argument('--sheet-url', help="Google Sheets URL")
+    parser.add_argument('--start-row', type=int, help="first sheet row to process")
+    parser.add_argument('--end-row', type=int, help="last sheet row to process")
+    parser.add_argument('--contract-url', help="BSCScan write-contract URL")
+    parser.add_argument('--columns', help="sheet columns holding address and value (default: 1,2)")
+    parser.add_argument('--creds', help="service account JSON file (default: service_account.json)")
+    parser.add_argument('--headless', action='store_true', default=None, help="run Chrome without a window")
+    parser.add_argument('--fill-mode', choices=[FILL_MODE_KEYS, FILL_MODE_JS], help="how to enter values")
+    parser.add_argument('--timeout', type=float, help=f"seconds to wait for each page condition (default: {READY_TIMEOUT})")
+    parser.add_argument('--poll', type=float, help=f"seconds between readiness checks (default: {POLL_INTERVAL})")
+    parser.add_argument('--continue-policy', choices=['auto', 'prompt'],
+                        help="'auto' moves to the next row by itself, 'prompt' waits for Enter after each row")
+    parser.add_argument('--row-delay', type=float, help="seconds to pause after each filled row in auto mode")
+    parser.add_argument('--on-error', choices=sorted(ERROR_POLICIES), help="what to do when a row fails")
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help="skip rows completed in earlier runs according to the journal")
+    parser.add_argument('--journal', help=f"run journal file (default: {JOURNAL_FILE})")
+    parser.add_argument('--dedupe-db', help=f"index of address/amount pairs already submitted (default: {DEDUPE_DB})")
+    parser.add_argument('--allow-duplicates', action='store_true', default=None,
+                        help="fill rows even if the same address and amount were already submitted")
+    parser.add_argument('--metrics', help=f"step timing file; .prom or .txt for Prometheus text, else JSON (default: {METRICS_FILE})")
+    parser.add_argument('--profile-dir', help="persistent Chrome profile for single-session runs")
+    parser.add_argument('--workers', type=int, help="number of parallel browser sessions (default: 1)")
+    parser.add_argument('--decimal-separator', choices=['.', ','],
+                        help="decimal separator used by the sheet's amounts (default: '.')")
+    parser.add_argument('--skip-invalid', action='store_true', default=None,
+                        help="skip rows with invalid amounts or addresses instead of stopping before the run")
+    parser.add_argument('--check', action='store_true', default=None,
+                        help="only fetch and validate the rows, print the problems and exit")
+    parser.add_argument('--profile-root', help="directory for the workers' Chrome profiles (default: temporary)")
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help="'browser' fills the form in Chrome, 'rpc' sends transactions through --rpc-url")
+    parser.add_argument('--rpc-url', help="JSON-RPC endpoint for --backend rpc")
+    parser.add_argument('--sender', help="account sending the transactions (default: the signing key's, "
+                                         "or the node's first account)")
+    parser.add_argument('--private-key-env', help=f"environment variable holding the signing key (default: {PRIVATE_KEY_ENV}); "
+                                                  "without a key the node signs")
+    parser.add_argument('--chain-id', type=int, help="chain id for signing (default: asked from the node)")
+    parser.add_argument('--gas-limit', type=int, help="gas limit per transaction (default: estimated once)")
+    parser.add_argument('--gas-price-gwei', help="gas price in gwei (default: asked from the node)")
+    parser.add_argument('--max-in-flight', type=int, help=f"transactions waiting to be mined at once (default: {MAX_IN_FLIGHT})")
+    parser.add_argument('--types', type=int, help=f"value of the call's first argument (default: {DEFAULT_TYPES})")
+    parser.add_argument('--abi', help="the contract's verified ABI (JSON, e.g. BscScan's ABI export); the called "
+                                      "function's argument types are read from it")
+    parser.add_argument('--function-signature', help="canonical signature of the function called, "
+                                                     "e.g. sendLockByAdmin(uint8,address,uint256); checked against --abi"),
+    parser.add_argument('--export-bundles', metavar='DIR',
+                        help="write the calls as batch bundles to sign in a wallet instead of submitting them")
+    parser.add_argument('--bundle-format', choices=BUNDLE_FORMATS, help="bundle file format (default: safe)")
+    parser.add_argument('--gas-budget', type=int, help=f"estimated gas per bundle, at most (default: {DEFAULT_GAS_BUDGET})")
+    parser.add_argument('--gas-per-call', type=int, help=f"gas assumed per call (default: {DEFAULT_GAS_PER_CALL})")
+    parser.add_argument('--max-calls', type=int, help="calls per bundle, at most (default: no limit)")
+    parser.add_argument('--mark-executed', nargs='+', metavar='BUNDLE',
+                        help="bundle files a wallet has executed; their rows are recorded as confirmed")
+    return parser
+
+def load_options(argv=None):
+    """Merge the config file with command line arguments and fill in defaults"""
+    args = build_parser().parse_args(argv)
+    options = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            options.update({key.replace('-', '_'): value for key, value in json.load(f).items()})
+    options.update({key: value for key, value in vars(args).items() if value is not None and key != 'config'})
+
+    defaults = {
+        'contract_url': DEFAULT_CONTRACT_URL, 'columns': "1,2", 'creds': 'service_account.json',
+        'headless': False, 'fill_mode': FILL_MODE_KEYS, 'timeout': READY_TIMEOUT, 'poll': POLL_INTERVAL,
+        'continue_policy': 'auto', 'row_delay': 0, 'on_error': 'retry', 'resume': False, 'journal': JOURNAL_FILE,
+        'workers': 1, 'profile_root': None, 'profile_dir': None, 'decimal_separator': '.', 'skip_invalid': False,
+        'check': False, 'dedupe_db': DEDUPE_DB, 'allow_duplicates': False,
+        'metrics': METRICS_FILE, 'backend': 'browser', 'rpc_url': None, 'sender': None,
+        'private_key_env': PRIVATE_KEY_ENV, 'chain_id': None, 'gas_limit': None, 'gas_price_gwei': None,
+        'max_in_flight': MAX_IN_FLIGHT, 'types': DEFAULT_TYPES, 'abi': None, 'function_signature': None,
+        'export_bundles': None, 'bundle_format': 'safe', 'gas_budget': DEFAULT_GAS_BUDGET,
+        'gas_per_call': DEFAULT_GAS_PER_CALL, 'max_calls': None, 'mark_executed': None,
+    }
+    for key, value in defaults.items():
+        options.setdefault(key, value)
+
+    missing = [name for name in ('sheet_url', 'start_row', 'end_row') if not options.get(name)]
+    if missing:
+        raise ValueError(f"Missing required options: {', '.join(missing)}")
+    if options['start_row'] < 1 or options['end_row'] < options['start_row']:
+        raise ValueError("Invalid row numbers")
+    if isinstance(options['columns'], str):
+        options['columns'] = [int(c) for c in options['columns'].split(',')]
+    if options['on_error'] not in ERROR_POLICIES:
+        raise ValueError(f"Unknown on_error policy: {options['on_error']}")
+    if options['workers'] < 1:
+        raise ValueError("workers must be at least 1")
+    if options['workers'] > 1 and options['continue_policy'] == 'prompt':
+        raise ValueError("continue_policy 'prompt' needs a single worker")
+    if options['backend'] not in BACKENDS:
+        raise ValueError(f"Unknown backend: {options['backend']}")
+    if isinstance(options['mark_executed'], str):
+        options['mark_executed'] = [options['mark_executed']]
+    if options['mark_executed'] and options['export_bundles']:
+        raise ValueError("--mark-executed and --export-bundles can't be combined")
+    if options['export_bundles'] and options['bundle_format'] not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format: {options['bundle_format']}")
+    if options['export_bundles'] and not contract_id(options['contract_url']).startswith('0x'):
+        raise ValueError(f"No contract address in {options['contract_url']}")
+    if options['backend'] == 'rpc' and not options['export_bundles']:
+        if not options['rpc_url']:
+            raise ValueError("backend 'rpc' needs rpc_url")
+        if not contract_id(options['contract_url']).startswith('0x'):
+            raise ValueError(f"No contract address in {options['contract_url']}")
+        if options['max_in_flight'] < 1:
+            raise ValueError("max_in_flight must be at least 1")
+    if options['backend'] == 'rpc' or options['export_bundles']:
+        options['function_signature'] = call_signature(options)
+    return options
+
+def call_signature(options):
+    """
+    Signature of the function the rpc backend and bundles call, from the
+    verified ABI or given explicitly; when both are given they must agree.
+    """
+    signature = options['function_signature']
+    if signature:
+        signature = signature.replace(' ', '')
+        argument_types(signature)
+        if not signature.startswith(FUNCTION_NAME + '('):
+            raise ValueError(f"{signature} is not the form's {FUNCTION_NAME} function")
+    if options['abi']:
+        from_abi = signature_from_abi(load_abi(options['abi']))
+        if signature and signature != from_abi:
+            raise ValueError(f"function_signature {signature} does not match {from_abi} in {options['abi']}")
+        signature = from_abi
+    if not signature:
+        raise ValueError("Calling the contract directly needs its verified ABI (abi) or function_signature")
+    logger.info(f"Calling {signature}")
+    return signature
+
+def submit_rpc(options, rows, journal, dedupe, metrics):
+    """Send the rows as transactions through the JSON-RPC node; returns the outcome counts or None"""
+    gas_price = options['gas_price_gwei']
+    try:
+        submitter = RpcSubmitter(options['rpc_url'], contract_id(options['contract_url']),
+                                 options['function_signature'], sender=options['sender'],
+                                 private_key=os.environ.get(options['private_key_env']),
+                                 chain_id=options['chain_id'], gas_limit=options['gas_limit'],
+                                 gas_price=to_wei(str(gas_price), decimals=9) if gas_price is not None else None,
+                                 max_in_flight=options['max_in_flight'], types=options['types'],
+                                 journal=journal, dedupe=dedupe, metrics=metrics)
+        counts = submitter.run(rows)
+    except (RpcError, RuntimeError, ValueError) as e:
+        logger.error(f"Could not submit through {options['rpc_url']}: {e}")
+        return None
+    for line in metrics.summary_lines():
+        logger.info(line)
+    return counts
+
+def write_bundles(options, rows, journal, dedupe):
+    """Export the rows as batch bundles instead of submitting them; returns the exit code"""
+    if dedupe is not None:
+        # Claiming also drops repeats within this sheet, as the browser and RPC paths do
+        unique = []
+        for row_number, row in rows:
+            if dedupe.claim(row):
+                unique.append((row_number, row))
+            else:
+                logger.info(f"Leaving out row {row_number}: same address and amount already submitted or earlier in the sheet")
+        rows = unique
+    else:
+        rows = list(rows)
+    try:
+        paths, invalid = export_bundles(rows, contract_id(options['contract_url']), options['export_bundles'],
+                                        options['function_signature'], options['bundle_format'],
+                                        chain_id=options['chain_id'] or 56, sender=options['sender'],
+                                        gas_budget=options['gas_budget'], gas_per_call=options['gas_per_call'],
+                                        max_calls=options['max_calls'], types=options['types'])
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not export bundles: {e}")
+        return 2
+    # Until the bundles are marked executed, their rows are left out of later runs
+    contents = dict(rows)
+    for path, row_numbers in read_manifest(options['export_bundles']).items():
+        for row_number in row_numbers:
+            journal.record(row_number, contents[row_number], EXPORTED, bundle=path)
+    logger.info(f"Wrote {len(paths)} {options['bundle_format']} bundles to {options['export_bundles']}")
+    return 1 if invalid else 0
+
+def mark_executed(bundles, rows, journal):
+    """
+    Record the rows of executed bundles as CONFIRMED, which also adds them
+    to the dedupe index; returns the exit code. Rows that changed in the
+    sheet since the export are left as they are.
+    """
+    exported = journal.exported_rows()
+    contents = dict(rows)
+    incomplete = False
+    for bundle in bundles:
+        path = os.path.abspath(bundle)
+        try:
+            row_numbers = read_manifest(os.path.dirname(path))[path]
+        except (OSError, ValueError, KeyError):
+            logger.error(f"{bundle} is not listed in a bundle manifest")
+            incomplete = True
+            continue
+        marked = 0
+        for row_number in row_numbers:
+            row = contents.get(row_number)
+            if row is None or exported.get(row_number) != (row_hash(row), path):
+                logger.warning(f"Row {row_number} of {bundle} is not in the range, not waiting in this bundle "
+                               f"or changed since the export; not marking it")
+                incomplete = True
+                continue
+            journal.record(row_number, row, CONFIRMED)
+            marked += 1
+        logger.info(f"Marked {marked} of {len(row_numbers)} rows of {bundle} as executed")
+    return 1 if incomplete else 0
+
+def run(options):
+    """Run one unattended batch; returns the process exit code"""
+    start_row, end_row = options['start_row'], options['end_row']
+    logger.info(f"Starting batch for rows {start_row} to {end_row} of {options['sheet_url']}")
+
+    dedupe = None if options['allow_duplicates'] else DedupeIndex(options['contract_url'], path=options['dedupe_db'])
+    journal = RunJournal(options['sheet_url'], options['journal'], dedupe=dedupe)
+    try:
+        return run_batch(options, journal, dedupe)
+    finally:
+        # Whichever way the run ends, the journal is synced and the dedupe index closed
+        journal.close()
+
+def run_batch(options, journal, dedupe):
+    """Fetch, check and submit the rows; returns the process exit code"""
+    start_row, end_row = options['start_row'], options['end_row']
+
+    # Rows confirmed in earlier runs are not filled again when resuming, unless their content changed
+    completed = journal.completed_rows() if options['resume'] else {}
+
+    # Every amount and address is checked before a browser is launched. Rows are checked as
+    # the chunks arrive (while the next one downloads), so only the valid ones are kept
+    invalid = []
+    try:
+        rows = iter_valid_rows(iter_sheet_data(options['sheet_url'], start_row, end_row, options['columns'],
+                                               creds_path=options['creds']))
+        report = validate_addresses(iter_converted(rows, invalid, decimal_separator=options['decimal_separator']))
+    except Exception as e:
+        logger.error(f"Error retrieving data from spreadsheet: {e}")
+        return 2
+
+    for row_number, value, reason in invalid:
+        logger.error(f"Row {row_number}: invalid amount ({reason})")
+    for row_number, address, reason in report.invalid:
+        logger.error(f"Row {row_number}: invalid address {address} ({reason})")
+    for address, numbers in report.duplicates.items():
+        logger.warning(f"Rows {', '.join(map(str, numbers))}: duplicate address {address}")
+    checked = len(report.valid) + len(report.invalid) + len(invalid)
+    logger.info(f"Checked {checked} rows: {len(invalid)} invalid amounts, {report.summary()}")
+    rows = report.valid
+    rejected = len(invalid) + len(report.invalid)
+    if options['check']:
+        return 1 if rejected else 0
+    if options['mark_executed']:
+        return mark_executed(options['mark_executed'], rows, journal)
+    if rejected and not options['skip_invalid']:
+        logger.error("Fix the invalid rows or pass --skip-invalid")
+        return 2
+
+    # Rows waiting in an exported bundle are left out whether or not the run resumes
+    rows = skip_exported(skip_completed(rows, completed), journal.exported_rows())
+    if options['export_bundles']:
+        return write_bundles(options, rows, journal, dedupe)
+    metrics = RunMetrics()
+    if options['backend'] == 'rpc':
+        counts = submit_rpc(options, rows, journal, dedupe, metrics)
+    elif options['workers'] > 1:
+        # Imported here, like bscscan_filler below, so the rpc backend and bundle export run without selenium
+        from worker_pool import BrowserWorkerPool
+        pool = BrowserWorkerPool(options['contract_url'], workers=options['workers'],
+                                 fill_mode=options['fill_mode'], headless=options['headless'],
+                                 profile_root=options['profile_root'], journal=journal,
+                                 timeout=options['timeout'], poll=options['poll'], dedupe=dedupe,
+                                 metrics=metrics)
+        try:
+            counts = pool.run(rows)
+        except RuntimeError as e:
+            logger.error(f"Worker pool stopped: {e}")
+            return 3
+        for line in metrics.summary_lines():
+            logger.info(line)
+    else:
+        from bscscan_filler import fill_bscscan_contract, auto_prompt
+        answers = dict(ERROR_POLICIES[options['on_error']])
+        if options['continue_policy'] == 'prompt':
+            answers['next_row'] = None
+        counts = fill_bscscan_contract(options['contract_url'], rows,
+                                       fill_mode=options['fill_mode'], journal=journal,
+                                       prompt=auto_prompt(answers, options['row_delay']),
+                                       headless=options['headless'], timeout=options['timeout'],
+                                       poll=options['poll'], user_data_dir=options['profile_dir'],
+                                       dedupe=dedupe, metrics=metrics)
+    if counts is None:
+        return 3
+    metrics.write(options['metrics'])
+    return 1 if counts[FAILED] or counts.get(PENDING) else 0
+
+def main(argv=None):
+    try:
+        options = load_options(argv)
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid configuration: {e}")
+        return 2
+    return run(options)
+
+if __name__ == "__main__":
+    sys.exit(main())
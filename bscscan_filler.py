@@ -1,10 +1,17 @@
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, NoSuchFrameException
+from selenium.common.exceptions import TimeoutException, NoSuchFrameException
 import time
 import logging
+from browser_session import create_driver
+from amounts import to_wei
+from row_scheduler import RowScheduler, FILLED, SKIPPED, FAILED
+from run_journal import CONFIRMED
+from run_metrics import RunMetrics
+from contract_form import (ContractFrame, wait_until, wait_for_page_ready, scroll_into_view,
+                           wait_for_collapse_shown, fields_empty, fill_fields_js, clear_fields_js,
+                           form_values, FILL_MODE_KEYS, FILL_MODE_JS, READY_TIMEOUT, POLL_INTERVAL)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
@@ -12,59 +19,123 @@ logging.basicConfig(level=logging.INFO,
                     datefmt='%Y-%m-%d %H:%M:%S')
 logger = logging.getLogger(__name__)
 
-def fill_bscscan_contract(website_url, data_rows):
+# Answers used for each question when running without an operator
+AUTO_ANSWERS = {
+    'captcha': 'n',        # Is there a CAPTCHA or verification prompt?
+    'verify': '',          # Complete the verification, then press Enter
+    'check_frame': '',     # Check the interface and press Enter
+    'frame_missing': '',   # Contract iframe not found, press Enter to continue
+    'reload': 'y',         # Error accessing dropdown. Reload page?
+    'next_row': '',        # Row filled. Enter to continue or 'q' to quit
+    'retry': 'y',          # Error occurred. Retry this row?
+    'continue': 'y',       # Continue to next row?
+    'close_browser': 'y',  # Close browser?
+}
+
+def console_prompt(question, message):
+    """Ask the operator on the console"""
+    return input(message)
+
+def asks_operator(prompt, question):
+    """True if prompt puts this question to a person rather than answering it from a policy"""
+    policy = getattr(prompt, 'policy', None)
+    return policy is None or policy.get(question) is None
+
+def auto_prompt(answers=None, row_delay=0):
+    """
+    Build a prompt that answers from a policy instead of waiting for input.
+
+    Args:
+        answers: Overrides for AUTO_ANSWERS; an answer of None still asks
+                 on the console (e.g. {'next_row': None} to confirm each row)
+        row_delay: Seconds to pause after each filled row
+    """
+    policy = dict(AUTO_ANSWERS, **(answers or {}))
+
+    def prompt(question, message):
+        answer = policy[question]
+        if answer is None:
+            return input(message)
+        logger.info(f"{message}{answer} (auto)")
+        if question == 'next_row' and row_delay:
+            time.sleep(row_delay)
+        return answer
+    prompt.policy = policy
+    return prompt
+
+def fill_bscscan_contract(website_url, data_rows, fill_mode=FILL_MODE_KEYS, journal=None,
+                          prompt=console_prompt, headless=False, timeout=READY_TIMEOUT, poll=POLL_INTERVAL,
+                          user_data_dir=None, dedupe=None, metrics=None):
     """
     Fills BSCScan contract form with spreadsheet data.
     Handles iframe and potential CAPTCHA/verification challenges.
     
     Args:
         website_url: The BSCScan contract URL
-        data_rows: List of rows, each containing [address, value] for the contract
-    """
-    # Use undetected_chromedriver instead of standard selenium
-    options = uc.ChromeOptions()
-    options.add_argument("--disable-notifications")
-    options.add_argument("--disable-popup-blocking")
-    options.add_argument("--window-size=1920,1080")
+        data_rows: Iterable of (row_number, [address, value]) pairs. The
+                   front ends pass a list, since every amount and address
+                   is validated before the browser starts.
+        fill_mode: FILL_MODE_KEYS to type into each field, or FILL_MODE_JS to
+                   set and verify all fields in a single script call
+        journal: Optional run_journal.RunJournal recording each row's outcome;
+                 rows are CONFIRMED only when an operator answered next_row
+        prompt: Called as prompt(question, message) for every operator decision;
+                console_prompt asks on the console, auto_prompt() answers unattended
+        headless: Run Chrome without a window
+        timeout: Maximum seconds to wait for each page readiness condition
+        poll: Seconds between readiness checks
+        user_data_dir: Persistent Chrome profile directory, so cookies and
+                       verification state carry over between runs
+        dedupe: Optional dedupe_index.DedupeIndex; rows already submitted to
+                this contract are skipped before they reach the browser
+        metrics: Optional run_metrics.RunMetrics collecting per-step timings;
+                 a summary is logged at the end either way
     
-    # Launch browser
-    driver = uc.Chrome(options=options)
-    driver.get(website_url)
+    Returns:
+        Dict of filled/skipped/failed row counts, or None if the browser
+        could not start or the page never loaded. The journal is closed
+        either way.
+    """
+    # Launch browser (undetected_chromedriver instead of standard selenium)
+    try:
+        driver = create_driver(headless=headless, user_data_dir=user_data_dir)
+    except Exception as e:
+        logger.error(f"Could not start the browser: {e}")
+        if journal is not None:
+            journal.close()
+        return
     
     # Wait for initial page load
     try:
+        driver.get(website_url)
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
         logger.info("Page loaded initially")
-    except TimeoutException:
-        logger.error("Initial page load timed out")
+    except Exception as e:
+        logger.error(f"Initial page load failed: {e}")
         driver.quit()
+        if journal is not None:
+            journal.close()
         return
     
     # Check if there's any verification needed
-    captcha_check = input("Is there a CAPTCHA or verification prompt? (y/n): ")
+    captcha_check = prompt('captcha', "Is there a CAPTCHA or verification prompt? (y/n): ")
     if captcha_check.lower() == 'y':
         logger.info("Waiting for manual CAPTCHA/verification completion...")
-        input("Complete the verification manually, then press Enter to continue...")
+        prompt('verify', "Complete the verification manually, then press Enter to continue...")
     
-    # Additional wait after verification
-    time.sleep(5)
+    # Wait for the page to settle after verification
+    try:
+        wait_for_page_ready(driver, timeout, poll)
+    except TimeoutException:
+        logger.warning("Contract iframe not present yet after verification")
     
     # *** CRITICAL: Switch to the iframe containing contract elements ***
+    # The frame tracker keeps us there and caches located elements between rows
+    frame = ContractFrame(driver, timeout, poll)
     try:
-        # First switch back to main content just to be safe
-        driver.switch_to.default_content()
-        logger.info("Switched to default content")
-        
-        # Wait for the iframe to be present
-        iframe = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "writecontractiframe"))
-        )
-        logger.info("Found contract iframe")
-        
-        # Switch to the iframe
-        driver.switch_to.frame("writecontractiframe")
+        frame.enter()
         logger.info("Switched to contract iframe")
         
         # Quick check to ensure we're in the correct frame
@@ -75,48 +146,56 @@ def fill_bscscan_contract(website_url, data_rows):
             logger.info("Successfully switched to iframe with contract elements")
         except TimeoutException:
             logger.warning("Couldn't find contract elements after switching to iframe")
-            input("Please check if the interface looks correct and press Enter to continue...")
+            prompt('check_frame', "Please check if the interface looks correct and press Enter to continue...")
     
     except (TimeoutException, NoSuchFrameException) as e:
         logger.error(f"Error switching to iframe: {e}")
-        input("Failed to find contract iframe. Please check the page and press Enter to continue or Ctrl+C to exit...")
+        prompt('frame_missing', "Failed to find contract iframe. Please check the page and press Enter to continue or Ctrl+C to exit...")
     
     # Process each row from the spreadsheet
-    for row_index, row_data in enumerate(data_rows):
+    if metrics is None:
+        metrics = RunMetrics()
+    
+    def record(row_number, row_data, outcome):
+        if journal is not None:
+            journal.record(row_number, row_data, outcome)
+    
+    # Rows are handed out one at a time; retried rows come back before new ones
+    scheduler = RowScheduler(data_rows, dedupe=dedupe)
+    while True:
+        row = scheduler.next_row()
+        if row is None:
+            break
+        
+        row_number, row_data = row
         if len(row_data) < 2 or not row_data[0] or not row_data[1]:
-            logger.warning(f"Skipping row {row_index+1}: Invalid data format or empty fields")
+            logger.warning(f"Skipping row {row_number}: Invalid data format or empty fields")
+            scheduler.skip()
+            record(row_number, row_data, SKIPPED)
             continue
             
-        logger.info(f"Processing row {row_index+1} of {len(data_rows)}: {row_data}")
+        logger.info(f"Processing row {row_number}: {row_data}")
+        timer = metrics.start_row()
         
         try:
             # 1. Find and click the sendLockByAdmin dropdown
             try:
-                # First check if we're still in the iframe
-                try:
-                    # Quick test if we're still in the iframe
-                    driver.find_element(By.CSS_SELECTOR, "div.card-header")
-                except:
-                    logger.warning("No longer in iframe, switching back...")
-                    driver.switch_to.default_content()
-                    driver.switch_to.frame("writecontractiframe")
+                # Make sure we're still in the iframe (one script call when nothing changed)
+                if frame.enter():
                     logger.info("Switched back to contract iframe")
+                timer.lap('frame_switch')
                 
-                # Look for the dropdown by ID first (more reliable)
-                dropdown_selector = "a[href='#collapse6'][data-bs-toggle='collapse']"
-                
-                dropdown = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, dropdown_selector))
-                )
-                
-                # Scroll to the element to ensure it's visible
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", dropdown)
-                time.sleep(1)  # Allow time for scrolling
+                # Look for the dropdown, reusing the element found for an earlier row
+                dropdown = frame.dropdown()
+                timer.lap('locate')
                 
                 # Check if dropdown is already expanded
                 is_expanded = "collapsed" not in dropdown.get_attribute("class")
                 
                 if not is_expanded:
+                    # Scroll to the element and wait until scrolling has stopped
+                    scroll_into_view(driver, dropdown, timeout, poll)
+                    
                     # Try multiple approaches to click the element
                     try:
                         # First try: standard click
@@ -131,119 +210,148 @@ def fill_bscscan_contract(website_url, data_rows):
                             ActionChains(driver).move_to_element(dropdown).click().perform()
                     
                     logger.info("Clicked on sendLockByAdmin dropdown")
-                    # Wait for dropdown to fully expand
-                    time.sleep(2)
                     
-                    # Verify dropdown expanded properly
+                    # Wait for dropdown to fully expand
                     try:
-                        WebDriverWait(driver, 5).until(
-                            EC.visibility_of_element_located((By.ID, "input_6_1"))
-                        )
+                        wait_for_collapse_shown(driver, timeout=min(5, timeout), poll=poll)
                         logger.info("Dropdown expanded successfully")
                     except TimeoutException:
                         logger.warning("Dropdown might not have expanded properly. Trying again...")
                         driver.execute_script("arguments[0].click();", dropdown)
-                        time.sleep(2)
+                        wait_for_collapse_shown(driver, timeout=timeout, poll=poll)
                 else:
                     logger.info("sendLockByAdmin dropdown already expanded")
+                timer.lap('expand')
                     
             except Exception as e:
+                frame.invalidate()
                 logger.error(f"Error finding or clicking dropdown: {e}")
-                reload_option = input("Error accessing dropdown. Reload page? (y/n): ")
+                reload_option = prompt('reload', "Error accessing dropdown. Reload page? (y/n): ")
                 if reload_option.lower() == 'y':
                     driver.refresh()
-                    time.sleep(5)
                     
-                    # Switch to iframe again after refresh
+                    # Switch to iframe again once the reloaded page is ready
                     driver.switch_to.default_content()
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.ID, "writecontractiframe"))
-                    )
-                    driver.switch_to.frame("writecontractiframe")
+                    wait_for_page_ready(driver, timeout, poll)
+                    frame.enter()
                     
                     # Allow manual handling of any verification
-                    captcha_check = input("Is there a CAPTCHA or verification prompt? (y/n): ")
+                    captcha_check = prompt('captcha', "Is there a CAPTCHA or verification prompt? (y/n): ")
                     if captcha_check.lower() == 'y':
-                        input("Complete the verification manually, then press Enter to continue...")
+                        prompt('verify', "Complete the verification manually, then press Enter to continue...")
                     
-                    row_index -= 1  # Retry this row
+                    if not scheduler.retry():  # Retry this row
+                        logger.error(f"Giving up on row {row_number} after {scheduler.max_retries} retries")
+                        record(row_number, row_data, FAILED)
                     continue
                 else:
                     raise
                 
             # 2. Fill in the form fields
-            # Set types field to 2
-            try:
-                types_field = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "input_6_1"))
-                )
-                types_field.clear()
-                types_field.send_keys("2")
-                logger.info("Entered '2' in types field")
-            except Exception as e:
-                logger.error(f"Error setting types field: {e}")
-                raise
+            if fill_mode == FILL_MODE_JS:
+                # Set and verify all three fields in a single script call
+                try:
+                    value_in_wei = to_wei(row_data[1])  # Exact conversion to integer wei
+                    fill_fields_js(driver, form_values(row_data[0], value_in_wei), timeout, poll)
+                    logger.info(f"Entered '2', address {row_data[0]} and value {row_data[1]}")
+                except Exception as e:
+                    logger.error(f"Error filling fields: {e}")
+                    raise
+            else:
+                try:
+                    types_field, address_field, value_field = frame.fields()
+                except TimeoutException as e:
+                    logger.error(f"Form fields did not become ready: {e}")
+                    raise
+            
+                # Set types field to 2
+                try:
+                    types_field.clear()
+                    types_field.send_keys("2")
+                    logger.info("Entered '2' in types field")
+                except Exception as e:
+                    logger.error(f"Error setting types field: {e}")
+                    raise
                 
-            # Set address field (first column from spreadsheet)
-            try:
-                address_field = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "input_6_2"))
-                )
-                address_field.clear()
-                address_field.send_keys(row_data[0])
-                logger.info(f"Entered address: {row_data[0]}")
-            except Exception as e:
-                logger.error(f"Error setting address field: {e}")
-                raise
+                # Set address field (first column from spreadsheet)
+                try:
+                    address_field.clear()
+                    address_field.send_keys(row_data[0])
+                    logger.info(f"Entered address: {row_data[0]}")
+                except Exception as e:
+                    logger.error(f"Error setting address field: {e}")
+                    raise
                 
-            # Set value field (second column from spreadsheet)
-            try:
-                value_field = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "input_6_3"))
-                )
-                value_field.clear()
-                value_in_wei = int(float(row_data[1]) * 1e18)  # Convert to integer wei
-                value_field.send_keys(str(value_in_wei))       # Send as string
-                logger.info(f"Entered value: {row_data[1]}")
-            except Exception as e:
-                logger.error(f"Error setting value field: {e}")
-                raise
+                # Set value field (second column from spreadsheet)
+                try:
+                    value_field.clear()
+                    value_in_wei = to_wei(row_data[1])  # Exact conversion to integer wei
+                    value_field.send_keys(str(value_in_wei))       # Send as string
+                    logger.info(f"Entered value: {row_data[1]}")
+                except Exception as e:
+                    logger.error(f"Error setting value field: {e}")
+                    raise
                 
+            timer.lap('fill')
+            scheduler.filled()
+            record(row_number, row_data, FILLED)
+            
             # 3. Pause for user to review before proceeding
-            proceed = input(f"Row {row_index+1} filled. Press Enter to continue to next row or 'q' to quit: ")
+            proceed = prompt('next_row', f"Row {row_number} filled. Press Enter to continue to next row or 'q' to quit: ")
+            timer.lap('confirm_wait')
+            # Only an operator moving past the row vouches for its submission; an automatic
+            # answer leaves it FILLED, so it is neither skipped on resume nor added to dedupe
+            if asks_operator(prompt, 'next_row'):
+                record(row_number, row_data, CONFIRMED)
             if proceed.lower() == 'q':
+                timer.finish()
                 logger.info("User requested to quit")
                 break
                 
             # 4. Clear the fields for the next row
             try:
-                types_field.clear()
-                address_field.clear()
-                value_field.clear()
+                if fill_mode == FILL_MODE_JS:
+                    clear_fields_js(driver, timeout=timeout, poll=poll)
+                else:
+                    types_field.clear()
+                    address_field.clear()
+                    value_field.clear()
+                    wait_until(driver, fields_empty([types_field, address_field, value_field]), timeout, poll)
                 logger.info("Cleared fields for next row")
             except Exception as e:
                 logger.warning(f"Error clearing fields: {e}")
                 # If clearing fails, we'll continue and the new values will overwrite
-            
-            # Wait briefly before proceeding to next row
-            time.sleep(2)
+            timer.lap('clear')
+            timer.finish()
             
         except Exception as e:
-            logger.error(f"Error processing row {row_index+1}: {e}")
-            retry_option = input("Error occurred. Retry this row? (y/n): ")
+            frame.invalidate()
+            logger.error(f"Error processing row {row_number}: {e}")
+            retry_option = prompt('retry', "Error occurred. Retry this row? (y/n): ")
             if retry_option.lower() == 'y':
-                row_index -= 1  # Reprocess this row
-                continue
+                if scheduler.retry():  # Reprocess this row
+                    continue
+                logger.error(f"Giving up on row {row_number} after {scheduler.max_retries} retries")
+                record(row_number, row_data, FAILED)
+            else:
+                scheduler.skip()
+                record(row_number, row_data, SKIPPED)
             
-            continue_option = input("Continue to next row? (y/n): ")
+            continue_option = prompt('continue', "Continue to next row? (y/n): ")
             if continue_option.lower() != 'y':
                 break
     
     # Ask before closing browser
-    logger.info("All rows processed")
-    close_option = input("Close browser? (y/n): ")
+    logger.info(f"All rows processed ({scheduler.summary()})")
+    metrics.finish(scheduler.counts)
+    for line in metrics.summary_lines():
+        logger.info(line)
+    if journal is not None:
+        journal.close()
+    close_option = prompt('close_browser', "Close browser? (y/n): ")
     if close_option.lower() == 'y':
         driver.quit()
         logger.info("Browser closed")
     else:
-        logger.info("Browser left open. Close it manually when finished.")
\ No newline at end of file
+        logger.info("Browser left open. Close it manually when finished.")    
+    return scheduler.counts
@@ -1,12 +1,92 @@
 import os
+import sys
 import subprocess
 import shutil
+import argparse
 
-def build_executable():
-    print("Starting build process for BSCScan Automation Tool...")
+APP_NAME = 'BSCScan Automation'
+
+# Build profiles:
+#   onefile - a single executable, UPX-compressed; every launch unpacks the
+#             whole bundle to a temp dir before Python starts
+#   onedir  - a folder with the executable next to its libraries, nothing to
+#             unpack, no UPX, unused modules left out and bytecode compiled
+#             with -O; launches much faster but ships as a folder
+PROFILES = ('onefile', 'onedir')
+DEFAULT_PROFILE = 'onefile'
+
+# Packages the app never imports but PyInstaller may find through optional
+# imports of its dependencies
+EXCLUDED_MODULES = ['matplotlib', 'numpy', 'pandas', 'scipy', 'IPython', 'jupyter_client',
+                    'notebook', 'pytest', 'test', 'tkinter.test', 'lib2to3', 'pydoc_data']
+
+def executable_path(profile=DEFAULT_PROFILE):
+    """Where build_executable(profile) leaves the executable"""
+    name = APP_NAME + ('.exe' if os.name == 'nt' else '')
+    if profile == 'onedir':
+        return os.path.join("dist", profile, APP_NAME, name)
+    return os.path.join("dist", profile, name)
+
+def build_executable(profile=DEFAULT_PROFILE, package=True):
+    """Build the app with PyInstaller using one of PROFILES, then optionally package it with a README"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown build profile: {profile}")
+    print(f"Starting {profile} build process for BSCScan Automation Tool...")
+    
+    if profile == 'onedir':
+        spec_file = "bscscan_app_onedir.spec"
+        spec_content = ONEDIR_SPEC.format(name=APP_NAME, excludes=EXCLUDED_MODULES)
+        # PyInstaller compiles the bundled bytecode at its own interpreter's optimization level
+        command = [sys.executable, "-O", "-m", "PyInstaller"]
+    else:
+        spec_file = "bscscan_app.spec"
+        spec_content = ONEFILE_SPEC
+        command = ["pyinstaller"]
+    
+    # Write spec file
+    with open(spec_file, "w") as f:
+        f.write(spec_content)
+    
+    print("Created spec file.")
     
-    # Create spec file content
-    spec_content = """# -*- mode: python ; coding: utf-8 -*-
+    # Run PyInstaller
+    print("Running PyInstaller (this may take several minutes)...")
+    subprocess.run(command + ["--clean", "--noconfirm", "--distpath", os.path.join("dist", profile),
+                              "--workpath", os.path.join("build", profile), spec_file], check=True)
+    
+    print("Build complete!")
+    print(f"Executable created at '{executable_path(profile)}'.")
+    if package:
+        package_executable(profile)
+
+def package_executable(profile=DEFAULT_PROFILE):
+    """Copy a built executable into the distribution folder along with a README"""
+    # Create distribution package
+    dist_dir = "BSCScan Automation Package"
+    if os.path.exists(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+    
+    # Copy executable (the whole folder for one-dir builds)
+    if profile == 'onedir':
+        shutil.copytree(os.path.dirname(executable_path(profile)), os.path.join(dist_dir, APP_NAME))
+    else:
+        shutil.copy(executable_path(profile), dist_dir)
+    
+    # Create README file
+    readme_content = README_CONTENT
+    if profile == 'onedir':
+        readme_content += """
+Keep the files in the 'BSCScan Automation' folder together; the application
+needs them next to its executable.
+"""
+    
+    with open(os.path.join(dist_dir, "README.txt"), "w") as f:
+        f.write(readme_content)
+    
+    print(f"Distribution package created in '{dist_dir}' folder.")
+
+ONEFILE_SPEC = """# -*- mode: python ; coding: utf-8 -*-
 
 block_cipher = None
 
@@ -39,31 +119,41 @@ exe = EXE(pyz,
           runtime_tmpdir=None,
           console=False)
 """
-    
-    # Write spec file
-    with open("bscscan_app.spec", "w") as f:
-        f.write(spec_content)
-    
-    print("Created spec file.")
-    
-    # Run PyInstaller
-    print("Running PyInstaller (this may take several minutes)...")
-    subprocess.run(["pyinstaller", "--clean", "bscscan_app.spec"], check=True)
-    
-    print("Build complete!")
-    print("Executable created in the 'dist' folder.")
-    
-    # Create distribution package
-    dist_dir = "BSCScan Automation Package"
-    if os.path.exists(dist_dir):
-        shutil.rmtree(dist_dir)
-    os.makedirs(dist_dir)
-    
-    # Copy executable
-    shutil.copy("dist/BSCScan Automation.exe", dist_dir)
-    
-    # Create README file
-    readme_content = """BSCScan Automation Tool
+
+# The executable only holds the bootloader and scripts; libraries stay as
+# files in the folder, uncompressed, so nothing is unpacked at launch
+ONEDIR_SPEC = """# -*- mode: python ; coding: utf-8 -*-
+
+a = Analysis(['bscscan_app.py'],
+             pathex=[],
+             binaries=[],
+             datas=[],
+             hiddenimports=['pkg_resources.py2_warn'],
+             hookspath=[],
+             runtime_hooks=[],
+             excludes={excludes!r},
+             noarchive=False)
+pyz = PYZ(a.pure, a.zipped_data)
+exe = EXE(pyz,
+          a.scripts,
+          [],
+          exclude_binaries=True,
+          name={name!r},
+          debug=False,
+          bootloader_ignore_signals=False,
+          strip=False,
+          upx=False,
+          console=False)
+coll = COLLECT(exe,
+               a.binaries,
+               a.zipfiles,
+               a.datas,
+               strip=False,
+               upx=False,
+               name={name!r})
+"""
+
+README_CONTENT = """BSCScan Automation Tool
 ======================
 
 This tool automates form filling on BSCScan's contract interface using data from Google Sheets.
@@ -94,11 +184,10 @@ Support:
 -------
 For help or issues, contact the developer.
 """
-    
-    with open(os.path.join(dist_dir, "README.txt"), "w") as f:
-        f.write(readme_content)
-    
-    print(f"Distribution package created in '{dist_dir}' folder.")
 
 if __name__ == "__main__":
-    build_executable()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the BSCScan Automation executable")
+    parser.add_argument("--profile", choices=PROFILES, default=DEFAULT_PROFILE,
+                        help="onefile: single UPX-compressed executable; onedir: folder that launches faster")
+    args = parser.parse_args()
+    build_executable(args.profile)
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Precomputed calldata for many rows, exported as batch bundles a wallet can
+sign in one go instead of one form per row.
+
+Bundle formats:
+    safe        Safe Transaction Builder JSON; the Safe executes the calls
+                itself, so it must be the contract's admin
+    calls       EIP-5792 (2.0.0) wallet_sendCalls parameters, for wallets that
+                batch calls from the operator's own account
+    multicall3  aggregate3 calldata for the Multicall3 contract (.json and
+                .hex); the contract sees Multicall3 as the caller, so this
+                only suits functions that don't check msg.sender
+
+Rows are split into bundles whose estimated gas stays within a budget.
+"""
+import os
+import json
+import logging
+from functools import lru_cache
+from amounts import to_wei, AmountError
+from addresses import check_address, to_checksum_address
+from contract_call import (function_selector, argument_types, encode_argument, encode_uint, EncodingError,
+                           DEFAULT_TYPES)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMATS = ('safe', 'calls', 'multicall3')
+
+# Written next to the bundles: bundle file -> sheet rows it contains
+MANIFEST_FILE = 'bundles.json'
+
+# Multicall3 is deployed at the same address on BSC and most other chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SIGNATURE = 'aggregate3((address,bool,bytes)[])'
+
+# Gas budget per bundle; well under BSC's block gas limit so bundles get included
+DEFAULT_GAS_BUDGET = 10000000
+
+# Gas assumed for executing one sendLockByAdmin call, on top of its calldata
+DEFAULT_GAS_PER_CALL = 60000
+
+# Base cost of a transaction, and the batching contract's own cost per call
+TX_BASE_GAS = 21000
+BATCH_GAS_PER_CALL = 5000
+
+def calldata_gas(data):
+    """Intrinsic gas charged for calldata: 4 per zero byte, 16 per other byte"""
+    zeros = data.count(0)
+    return 4 * zeros + 16 * (len(data) - zeros)
+
+class CalldataEncoder:
+    """
+    Calldata of one contract function for many rows.
+
+    The signature must take the form's three arguments (types, address,
+    value), each encoded as the type it declares, the same as
+    contract_call.encode_call. The selector and the constant first
+    argument are encoded once, and address words are cached, so each row
+    costs little more than two byte conversions.
+    """
+
+    def __init__(self, signature, types=DEFAULT_TYPES):
+        arg_types = argument_types(signature)
+        if len(arg_types) != 3:
+            raise EncodingError(f"{signature} does not take the form's three arguments (types, address, value)")
+        self.signature = signature
+        self.types = types
+        self._prefix = function_selector(signature) + encode_argument(arg_types[0], types)
+        self._address_type, self._value_type = arg_types[1:]
+
+    def encode(self, address, value_in_wei):
+        if self._address_type == 'address':
+            address_word = _address_word(address)
+        else:
+            address_word = encode_argument(self._address_type, address)
+        return self._prefix + address_word + encode_argument(self._value_type, value_in_wei)
+
+    def encode_rows(self, rows):
+        """
+        Encode (row_number, [address, value]) pairs; returns (encoded, invalid)
+        with encoded as (row_number, row, calldata) and invalid as
+        (row_number, row, reason).
+        """
+        encoded, invalid = [], []
+        for row_number, row in rows:
+            try:
+                encoded.append((row_number, row, self.encode(row[0], to_wei(row[1]))))
+            except (AmountError, EncodingError, IndexError) as e:
+                invalid.append((row_number, row, str(e)))
+        return encoded, invalid
+
+@lru_cache(maxsize=65536)
+def _address_word(address):
+    reason = check_address(address)
+    if reason:
+        raise EncodingError(f"Invalid address {address}: {reason}")
+    return bytes(12) + bytes.fromhex(str(address).strip()[2:])
+
+def encode_aggregate3(target, calls, allow_failure=False):
+    """Calldata for Multicall3.aggregate3 calling target with each of calls (bytes)"""
+    target_word = _address_word(target)
+    allow_word = encode_uint(1 if allow_failure else 0)
+    tuples = []
+    for data in calls:
+        padded = data + bytes(-len(data) % 32)
+        # (address target, bool allowFailure, bytes callData); the bytes follow the three head words
+        tuples.append(target_word + allow_word + encode_uint(96) + encode_uint(len(data)) + padded)
+    # The array holds dynamic tuples, so its head lists their offsets from the end of the length word
+    offsets, position = [], 32 * len(tuples)
+    for encoded in tuples:
+        offsets.append(encode_uint(position))
+        position += len(encoded)
+    return (function_selector(AGGREGATE3_SIGNATURE) + encode_uint(32) + encode_uint(len(tuples))
+            + b"".join(offsets) + b"".join(tuples))
+
+def chunk_calls(encoded, gas_budget=DEFAULT_GAS_BUDGET, gas_per_call=DEFAULT_GAS_PER_CALL, max_calls=None):
+    """
+    Split (row_number, row, calldata) entries into lists whose estimated gas
+    (base cost, calldata and per-call execution) stays within gas_budget.
+    """
+    chunk, gas = [], TX_BASE_GAS
+    for entry in encoded:
+        # The calldata travels inside the batch's own calldata, padded with zeros
+        cost = gas_per_call + BATCH_GAS_PER_CALL + calldata_gas(entry[2]) + 4 * (-len(entry[2]) % 32) + 16 * 3 * 32
+        if TX_BASE_GAS + cost > gas_budget:
+            raise ValueError(f"Row {entry[0]} alone needs more than the gas budget of {gas_budget}")
+        if chunk and (gas + cost > gas_budget or (max_calls and len(chunk) >= max_calls)):
+            yield chunk
+            chunk, gas = [], TX_BASE_GAS
+        chunk.append(entry)
+        gas += cost
+    if chunk:
+        yield chunk
+
+def bundle_document(bundle_format, chunk, contract, chain_id, sender=None, name="bundle"):
+    """JSON-serializable bundle of one chunk in the given format"""
+    contract = to_checksum_address(contract)
+    rows = [row_number for row_number, _, _ in chunk]
+    description = f"sendLockByAdmin for {len(rows)} sheet rows ({rows[0]}-{rows[-1]})"
+    if bundle_format == 'safe':
+        return {'version': "1.0", 'chainId': str(chain_id),
+                'meta': {'name': name, 'description': description},
+                'transactions': [{'to': contract, 'value': "0", 'data': "0x" + data.hex()}
+                                 for _, _, data in chunk]}
+    if bundle_format == 'calls':
+        # wallet_sendCalls parameters as of EIP-5792 version 2.0.0
+        document = {'version': "2.0.0", 'chainId': hex(chain_id), 'atomicRequired': False,
+                    'calls': [{'to': contract, 'value': "0x0", 'data': "0x" + data.hex()} for _, _, data in chunk]}
+        if sender:
+            document['from'] = to_checksum_address(sender)
+        return document
+    if bundle_format == 'multicall3':
+        data = encode_aggregate3(contract, [data for _, _, data in chunk])
+        return {'chainId': chain_id, 'to': MULTICALL3_ADDRESS, 'value': "0", 'data': "0x" + data.hex(),
+                'description': description}
+    raise ValueError(f"Unknown bundle format: {bundle_format}")
+
+def export_bundles(rows, contract, directory, signature, bundle_format='safe', chain_id=56, sender=None,
+                   gas_budget=DEFAULT_GAS_BUDGET, gas_per_call=DEFAULT_GAS_PER_CALL, max_calls=None,
+                   types=DEFAULT_TYPES):
+    """
+    Encode the rows and write one bundle file per chunk to directory,
+    plus bundles.json mapping each bundle file to its sheet row numbers
+    (kept out of the bundles, whose formats are fixed by the wallets).
+
+    Returns (paths, invalid) where invalid lists the (row_number, row,
+    reason) entries that could not be encoded and were left out.
+    """
+    if bundle_format not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format: {bundle_format}")
+    encoded, invalid = CalldataEncoder(signature, types).encode_rows(rows)
+    for row_number, row, reason in invalid:
+        logger.warning(f"Row {row_number} left out of the bundles: {reason}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    manifest = {}
+    for index, chunk in enumerate(chunk_calls(encoded, gas_budget, gas_per_call, max_calls), 1):
+        name = f"bundle-{index:03d}"
+        document = bundle_document(bundle_format, chunk, contract, chain_id, sender, name)
+        path = os.path.join(directory, f"{name}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        paths.append(path)
+        if bundle_format == 'multicall3':
+            # Raw calldata for wallets that take a hex data field
+            with open(os.path.join(directory, f"{name}.hex"), 'w', encoding='utf-8') as f:
+                f.write(document['data'] + "\n")
+        manifest[os.path.basename(path)] = [row_number for row_number, _, _ in chunk]
+        logger.info(f"Wrote {path} with {len(chunk)} calls")
+    with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'format': bundle_format, 'chainId': chain_id, 'bundles': manifest}, f, indent=2)
+    return paths, invalid
+
+def read_manifest(directory):
+    """Map the path of each bundle in directory to the sheet rows it contains"""
+    with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {os.path.abspath(os.path.join(directory, name)): row_numbers
+            for name, row_numbers in manifest['bundles'].items()}
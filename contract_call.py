@@ -0,0 +1,97 @@
+import re
+import json
+from functools import lru_cache
+from keccak import keccak256
+from addresses import check_address
+from amounts import MAX_UINT256
+
+# Function the write-contract form calls; its inputs are (types, address, value).
+# The argument types come from the contract's verified ABI, see signature_from_abi
+FUNCTION_NAME = 'sendLockByAdmin'
+
+# Value the form's first input ("types") is filled with
+DEFAULT_TYPES = 2
+
+_SIGNATURE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*)\(([a-z0-9,]*)\)')
+
+class EncodingError(ValueError):
+    """Raised for arguments that cannot be ABI-encoded as the function expects"""
+
+@lru_cache(maxsize=None)
+def function_selector(signature):
+    """First four bytes of the Keccak-256 hash of a canonical function signature"""
+    return keccak256(signature.encode('ascii'))[:4]
+
+@lru_cache(maxsize=None)
+def argument_types(signature):
+    """Argument types of a signature such as 'f(uint256,address)'"""
+    match = _SIGNATURE.fullmatch(signature.replace(' ', ''))
+    if not match:
+        raise EncodingError(f"Not a function signature: {signature}")
+    types = tuple(match.group(2).split(',')) if match.group(2) else ()
+    for abi_type in types:
+        if abi_type not in ('address', 'bool') and not re.fullmatch(r'uint(8|16|32|64|128|256)?', abi_type):
+            raise EncodingError(f"Unsupported argument type: {abi_type}")
+    return types
+
+def load_abi(path):
+    """
+    Read a contract ABI from a JSON file: the ABI list itself, a build
+    artifact with an "abi" entry, or a BscScan getabi API response.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        abi = json.load(f)
+    if isinstance(abi, dict):
+        abi = abi.get('abi', abi.get('result'))
+        if isinstance(abi, str):
+            # getabi returns the ABI as a JSON string
+            abi = json.loads(abi)
+    if not isinstance(abi, list):
+        raise EncodingError(f"No contract ABI in {path}")
+    return abi
+
+def signature_from_abi(abi, name=FUNCTION_NAME):
+    """Canonical signature of the function called name in a contract ABI"""
+    functions = [entry for entry in abi if entry.get('type', 'function') == 'function' and entry.get('name') == name]
+    if not functions:
+        raise EncodingError(f"The ABI has no function {name}")
+    if len(functions) > 1:
+        raise EncodingError(f"The ABI has {len(functions)} functions called {name}; pass the signature instead")
+    signature = f"{name}({','.join(arg['type'] for arg in functions[0].get('inputs', []))})"
+    argument_types(signature)
+    return signature
+
+def encode_uint(value, bits=256):
+    if isinstance(value, bool) or not isinstance(value, int):
+        try:
+            value = int(str(value).strip())
+        except ValueError:
+            raise EncodingError(f"{value} is not an integer")
+    if value < 0 or value > min(MAX_UINT256, 2 ** bits - 1):
+        raise EncodingError(f"{value} does not fit in uint{bits}")
+    return value.to_bytes(32, 'big')
+
+def encode_address(address):
+    reason = check_address(address)
+    if reason:
+        raise EncodingError(f"Invalid address {address}: {reason}")
+    return bytes(12) + bytes.fromhex(str(address).strip()[2:])
+
+def encode_argument(abi_type, value):
+    """32-byte ABI encoding of one static argument"""
+    if abi_type == 'address':
+        return encode_address(value)
+    if abi_type == 'bool':
+        return encode_uint(1 if value else 0)
+    return encode_uint(value, int(abi_type[4:] or 256))
+
+def encode_call(signature, args):
+    """Calldata for calling signature with args; only static types are supported"""
+    types = argument_types(signature)
+    if len(args) != len(types):
+        raise EncodingError(f"{signature} takes {len(types)} arguments, got {len(args)}")
+    return function_selector(signature) + b"".join(encode_argument(t, a) for t, a in zip(types, args))
+
+def send_lock_calldata(signature, address, value_in_wei, types=DEFAULT_TYPES):
+    """Calldata of the call the form submits for one row"""
+    return encode_call(signature, (types, address, value_in_wei))
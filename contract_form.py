@@ -0,0 +1,263 @@
+# Elements of the BSCScan write-contract page used by the automation
+IFRAME_ID = "writecontractiframe"
+DROPDOWN_SELECTOR = "a[href='#collapse6'][data-bs-toggle='collapse']"
+COLLAPSE_ID = "collapse6"
+FIELD_IDS = ("input_6_1", "input_6_2", "input_6_3")
+
+# Seconds between readiness checks
+POLL_INTERVAL = 0.1
+
+# Maximum seconds to wait for a single readiness condition
+READY_TIMEOUT = 10
+
+# Selenium is imported by the functions that drive the page, so the constants
+# above are available (e.g. to the CLI's rpc and bundle modes) without it
+
+def wait_until(driver, condition, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """Poll condition every poll seconds until it returns something truthy"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+
+def page_ready():
+    """Condition: the current document has finished loading"""
+    def condition(driver):
+        return driver.execute_script("return document.readyState") == "complete"
+    return condition
+
+def scroll_settled(element):
+    """Condition: element has stopped moving between two consecutive polls"""
+    last_top = [None]
+
+    def condition(driver):
+        top = driver.execute_script("return arguments[0].getBoundingClientRect().top;", element)
+        settled = top == last_top[0]
+        last_top[0] = top
+        return settled
+    return condition
+
+def collapse_shown(collapse_id=COLLAPSE_ID):
+    """Condition: the Bootstrap collapse panel has finished expanding"""
+    from selenium.webdriver.common.by import By
+
+    def condition(driver):
+        classes = (driver.find_element(By.ID, collapse_id).get_attribute("class") or "").split()
+        return "show" in classes and "collapsing" not in classes
+    return condition
+
+def fields_ready(field_ids=FIELD_IDS):
+    """Condition: all form fields are visible and enabled; returns the elements"""
+    from selenium.webdriver.common.by import By
+
+    def condition(driver):
+        fields = [driver.find_element(By.ID, field_id) for field_id in field_ids]
+        if all(field.is_displayed() and field.is_enabled() for field in fields):
+            return fields
+        return False
+    return condition
+
+def fields_empty(fields):
+    """Condition: all given fields have been cleared"""
+    def condition(driver):
+        return all(not field.get_attribute("value") for field in fields)
+    return condition
+
+def wait_for_page_ready(driver, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """Wait for the page to load and the contract iframe to be present"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    wait_until(driver, page_ready(), timeout, poll)
+    return wait_until(driver, EC.presence_of_element_located((By.ID, IFRAME_ID)), timeout, poll)
+
+def scroll_into_view(driver, element, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """Scroll element to the middle of the viewport and wait for scrolling to stop"""
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});", element)
+    wait_until(driver, scroll_settled(element), timeout, poll)
+
+def wait_for_collapse_shown(driver, collapse_id=COLLAPSE_ID, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    wait_until(driver, collapse_shown(collapse_id), timeout, poll)
+
+def wait_for_fields_ready(driver, field_ids=FIELD_IDS, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """Wait until every form field can be typed into and return them in order"""
+    return wait_until(driver, fields_ready(field_ids), timeout, poll)
+
+# Ways of entering the row values into the form
+FILL_MODE_KEYS = "keys"  # clear() and send_keys() per field, like a user typing
+FILL_MODE_JS = "js"      # all fields set in a single execute_script call
+
+# Sets every field through the native value setter (so framework-managed
+# inputs see the change), fires input/change and reads the values back.
+# Returns null while any field is missing or disabled so it can be polled.
+BATCH_FILL_SCRIPT = """
+var values = arguments[0];
+var ids = Object.keys(values);
+var fields = ids.map(function (id) { return document.getElementById(id); });
+if (fields.some(function (field) { return !field || field.disabled || field.offsetParent === null; })) {
+    return null;
+}
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+var readback = {};
+fields.forEach(function (field, i) {
+    setter.call(field, values[ids[i]]);
+    field.dispatchEvent(new Event('input', {bubbles: true}));
+    field.dispatchEvent(new Event('change', {bubbles: true}));
+    readback[ids[i]] = field.value;
+});
+return readback;
+"""
+
+def form_values(address, value_in_wei, types="2"):
+    """Map the sendLockByAdmin field ids to the text to enter"""
+    return {FIELD_IDS[0]: types, FIELD_IDS[1]: address, FIELD_IDS[2]: str(value_in_wei)}
+
+def batch_filled(values):
+    """Condition: fill all fields in one script call once they are ready; returns the readback"""
+    def condition(driver):
+        return driver.execute_script(BATCH_FILL_SCRIPT, values)
+    return condition
+
+def fill_fields_js(driver, values, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """
+    Fill the form with one execute_script call per attempt and verify it.
+
+    Args:
+        driver: WebDriver already switched into the contract iframe
+        values: Dict of field id -> text, e.g. from form_values()
+
+    Raises:
+        TimeoutException: if the fields never became ready
+        ValueError: if a field reads back a different value than was set
+    """
+    readback = wait_until(driver, batch_filled(values), timeout, poll)
+    mismatched = [field_id for field_id, text in values.items() if readback.get(field_id) != text]
+    if mismatched:
+        raise ValueError(f"Fields did not keep their values: {', '.join(mismatched)}")
+    return readback
+
+def clear_fields_js(driver, field_ids=FIELD_IDS, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+    """Clear the form fields in a single script call"""
+    return fill_fields_js(driver, {field_id: "" for field_id in field_ids}, timeout, poll)
+
+# True while the document is the contract iframe and every passed element is
+# still attached to it. A stale element argument makes the call itself fail.
+FRAME_CHECK_SCRIPT = """
+var frame = window.frameElement;
+if (!frame || frame.id !== arguments[0]) {
+    return false;
+}
+for (var i = 1; i < arguments.length; i++) {
+    if (!arguments[i].isConnected) {
+        return false;
+    }
+}
+return true;
+"""
+
+class ContractFrame:
+    """
+    Keeps the driver inside the contract iframe and caches located elements.
+
+    Rows after the first reuse the current frame and the dropdown and field
+    elements found earlier. Before each row one script call confirms that
+    the driver is still in the iframe and no cached element has gone stale.
+    The frame is only re-entered and elements re-located after a reload or
+    navigation, or after invalidate() is called.
+    """
+
+    def __init__(self, driver, timeout=READY_TIMEOUT, poll=POLL_INTERVAL):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.in_frame = False
+        self._elements = {}
+
+    def enter(self):
+        """Make sure the driver is in the contract iframe; returns True if it had to switch"""
+        if self.in_frame and self._is_valid():
+            return False
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        self.invalidate()
+        self.driver.switch_to.default_content()
+        wait_until(self.driver, EC.frame_to_be_available_and_switch_to_it((By.ID, IFRAME_ID)),
+                   self.timeout, self.poll)
+        self.in_frame = True
+        return True
+
+    def invalidate(self):
+        """Forget the frame and all cached elements, e.g. after a page reload"""
+        self.in_frame = False
+        self._elements.clear()
+
+    def dropdown(self):
+        """The sendLockByAdmin collapse toggle"""
+        if 'dropdown' not in self._elements:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support import expected_conditions as EC
+            self._elements['dropdown'] = wait_until(
+                self.driver, EC.presence_of_element_located((By.CSS_SELECTOR, DROPDOWN_SELECTOR)),
+                self.timeout, self.poll)
+        return self._elements['dropdown']
+
+    def fields(self):
+        """The types, address and value inputs, waiting for them to be ready the first time"""
+        if 'fields' not in self._elements:
+            self._elements['fields'] = wait_for_fields_ready(self.driver, FIELD_IDS, self.timeout, self.poll)
+        return self._elements['fields']
+
+    def _is_valid(self):
+        cached = []
+        for element in self._elements.values():
+            cached.extend(element if isinstance(element, list) else [element])
+        try:
+            return bool(self.driver.execute_script(FRAME_CHECK_SCRIPT, IFRAME_ID, *cached))
+        except Exception:
+            # Stale element references and lost frames both end up here
+            return False
+
+def expand_dropdown(driver, frame, timeout=READY_TIMEOUT, poll=POLL_INTERVAL, timer=None):
+    """Open the sendLockByAdmin panel unless it is already open; returns True if it clicked"""
+    dropdown = frame.dropdown()
+    if timer is not None:
+        timer.lap('locate')
+    if "collapsed" not in (dropdown.get_attribute("class") or ""):
+        if timer is not None:
+            timer.lap('expand')
+        return False
+    scroll_into_view(driver, dropdown, timeout, poll)
+    try:
+        dropdown.click()
+    except Exception:
+        driver.execute_script("arguments[0].click();", dropdown)
+    wait_for_collapse_shown(driver, timeout=timeout, poll=poll)
+    if timer is not None:
+        timer.lap('expand')
+    return True
+
+def fill_row(driver, frame, address, value_in_wei, fill_mode=FILL_MODE_JS,
+             timeout=READY_TIMEOUT, poll=POLL_INTERVAL, timer=None):
+    """Enter one row into the form without any operator interaction; timer is a run_metrics.RowTimer"""
+    frame.enter()
+    if timer is not None:
+        timer.lap('frame_switch')
+    expand_dropdown(driver, frame, timeout, poll, timer)
+    values = form_values(address, value_in_wei)
+    if fill_mode == FILL_MODE_JS:
+        fill_fields_js(driver, values, timeout, poll)
+    else:
+        for field, text in zip(frame.fields(), values.values()):
+            field.clear()
+            field.send_keys(text)
+    if timer is not None:
+        timer.lap('fill')
+
+def clear_row(driver, frame, fill_mode=FILL_MODE_JS, timeout=READY_TIMEOUT, poll=POLL_INTERVAL, timer=None):
+    """Empty the form after a row"""
+    if fill_mode == FILL_MODE_JS:
+        clear_fields_js(driver, timeout=timeout, poll=poll)
+    else:
+        fields = frame.fields()
+        for field in fields:
+            field.clear()
+        wait_until(driver, fields_empty(fields), timeout, poll)
+    if timer is not None:
+        timer.lap('clear')
@@ -0,0 +1,120 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from amounts import to_wei, AmountError
+
+logger = logging.getLogger(__name__)
+
+# Default index file, next to the run journal
+DEDUPE_DB = 'bscscan_dedupe.db'
+
+# Contract function the form submits
+DEFAULT_FUNCTION = 'sendLockByAdmin'
+
+_CONTRACT_ADDRESS = re.compile(r'0x[0-9a-fA-F]{40}')
+
+def contract_id(contract_url):
+    """Contract address in a BSCScan URL (lowercase), or the URL itself if it has none"""
+    match = _CONTRACT_ADDRESS.search(contract_url)
+    return match.group(0).lower() if match else contract_url
+
+def submission_key(address, value_in_wei, contract, function=DEFAULT_FUNCTION):
+    """Hash identifying one call of function on contract with this address and amount"""
+    text = "\x1f".join((contract, function, str(address).strip().lower(), str(value_in_wei)))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+class DedupeIndex:
+    """
+    Persistent index of address/amount pairs already submitted to a contract.
+
+    Keys are submission_key() hashes in an SQLite table keyed on the hash,
+    so lookups stay fast across hundreds of thousands of historical rows
+    and across sheets, ranges and runs. Rows are added once the operator
+    has confirmed them (see RunJournal). Within a run, claim() also
+    catches repeats of a row that is still being filled; release() gives
+    the claim back when that row fails or is skipped.
+    """
+
+    def __init__(self, contract_url, function=DEFAULT_FUNCTION, path=DEDUPE_DB):
+        self.contract = contract_id(contract_url)
+        self.function = function
+        self.path = path
+        self._claimed = set()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def key(self, row):
+        """submission_key() of a [address, value] row, or None if its amount is invalid"""
+        try:
+            value_in_wei = to_wei(row[1])
+        except (AmountError, IndexError):
+            return None
+        return submission_key(row[0], value_in_wei, self.contract, self.function)
+
+    def contains(self, row):
+        key = self.key(row)
+        if key is None:
+            return False
+        with self._lock:
+            return self._exists(key)
+
+    def claim(self, row):
+        """
+        Reserve a row for filling; returns False if it was already submitted
+        or is a repeat of a row claimed earlier in this run.
+        """
+        key = self.key(row)
+        if key is None:
+            # Invalid rows are left to the fill loop to report
+            return True
+        with self._lock:
+            if key in self._claimed or self._exists(key):
+                return False
+            self._claimed.add(key)
+            return True
+
+    def release(self, row):
+        """Drop the claim on a row that was not submitted after all"""
+        key = self.key(row)
+        with self._lock:
+            self._claimed.discard(key)
+
+    def add(self, row_number, row):
+        """Record a row as submitted"""
+        key = self.key(row)
+        if key is None:
+            return
+        with self._lock:
+            self._db().execute("INSERT OR IGNORE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (key, self.contract, self.function, str(row[0]).strip(),
+                                str(to_wei(row[1])), row_number, time.strftime('%Y-%m-%d %H:%M:%S')))
+            self._conn.commit()
+            self._claimed.discard(key)
+
+    def count(self):
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _db(self):
+        # Opened on first use and shared by the fill thread and pool workers, always under the lock
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS submissions (
+                                      key TEXT PRIMARY KEY, contract TEXT, function TEXT,
+                                      address TEXT, value_wei TEXT, sheet_row INTEGER, time TEXT
+                                  ) WITHOUT ROWID""")
+            self._conn.commit()
+        return self._conn
+
+    def _exists(self, key):
+        return self._db().execute("SELECT 1 FROM submissions WHERE key = ?", (key,)).fetchone() is not None
@@ -0,0 +1,96 @@
+"""
+Keccak-256 as used by Ethereum (the original Keccak padding, not SHA3-256).
+
+Uses eth_utils or pycryptodome when either is installed and falls back
+to a pure-Python implementation, which is slower but needs nothing
+beyond the standard library.
+"""
+
+_ROUND_CONSTANTS = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+)
+
+# Rotation offsets, indexed [x][y]
+_ROTATIONS = (
+    (0, 36, 3, 41, 18),
+    (1, 44, 10, 45, 2),
+    (62, 6, 43, 15, 61),
+    (28, 55, 25, 21, 56),
+    (27, 20, 39, 8, 14),
+)
+
+_MASK = (1 << 64) - 1
+
+# Bytes absorbed per permutation for a 256-bit digest
+_RATE = 136
+
+# Rho and pi combined: (source lane, target lane, rotation)
+_RHO_PI = tuple((x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), _ROTATIONS[x][y])
+                for x in range(5) for y in range(5))
+
+# Chi neighbours of each lane within its row
+_CHI = tuple((i, (i + 1) % 5 + i - i % 5, (i + 2) % 5 + i - i % 5) for i in range(25))
+
+def _permute(state):
+    moved = [0] * 25
+    for constant in _ROUND_CONSTANTS:
+        # Theta
+        columns = [state[x] ^ state[x + 5] ^ state[x + 10] ^ state[x + 15] ^ state[x + 20] for x in range(5)]
+        for x in range(5):
+            right = columns[(x + 1) % 5]
+            parity = columns[(x - 1) % 5] ^ (((right << 1) | (right >> 63)) & _MASK)
+            for i in range(x, 25, 5):
+                state[i] ^= parity
+        # Rho and pi
+        for source, target, shift in _RHO_PI:
+            lane = state[source]
+            moved[target] = ((lane << shift) | (lane >> (64 - shift))) & _MASK if shift else lane
+        # Chi
+        for i, first, second in _CHI:
+            state[i] = moved[i] ^ (~moved[first] & moved[second])
+        # Iota
+        state[0] ^= constant
+    return state
+
+def keccak256_pure(data):
+    """Keccak-256 digest of data, in pure Python"""
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % _RATE))
+    padded[-1] |= 0x80
+
+    state = [0] * 25
+    for offset in range(0, len(padded), _RATE):
+        block = padded[offset:offset + _RATE]
+        for i in range(_RATE // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * i + 8], 'little')
+        state = _permute(state)
+    return b"".join(lane.to_bytes(8, 'little') for lane in state[:4])
+
+# Chosen on the first hash, so importing this module doesn't pull in eth_utils
+_backend = None
+
+def _select_backend():
+    """Fastest available Keccak-256 implementation"""
+    try:
+        from eth_utils import keccak as eth_keccak
+        return lambda data: eth_keccak(bytes(data))
+    except ImportError:
+        pass
+    try:
+        from Crypto.Hash import keccak
+        return lambda data: keccak.new(digest_bits=256, data=bytes(data)).digest()
+    except ImportError:
+        return keccak256_pure
+
+def keccak256(data):
+    """Keccak-256 digest of data"""
+    global _backend
+    if _backend is None:
+        _backend = _select_backend()
+    return _backend(data)
@@ -0,0 +1,158 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+# Fallback row and heading heights in pixels, used to size the visible window
+ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+class VirtualTable(ttk.Frame):
+    """
+    Treeview that only materializes the rows currently on screen.
+
+    The full data stays in the Python list. The Treeview holds just
+    enough items to fill its height, and scrolling rewrites their values
+    from the list, so previewing 100k rows costs the same as previewing
+    30. Includes jump-to-row and find-next controls.
+
+    row_numbers, if given, holds each data row's sheet row number in
+    ascending order; the first column then shows it and the jump box takes
+    it, so rows match the numbers problems are reported with. Otherwise
+    rows are numbered by 1-based position.
+    """
+
+    def __init__(self, parent, columns, data, widths=None, page_size=30, row_numbers=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.data = data
+        self.row_numbers = row_numbers
+        self.page_size = page_size
+        self.offset = 0
+        self.selected = None
+
+        # Jump and search controls
+        controls = ttk.Frame(self)
+        controls.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(controls, text="Go to row:" if row_numbers is not None else "Go to #:").pack(side=tk.LEFT)
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(controls, textvariable=self.jump_var, width=8)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind('<Return>', lambda event: self.jump())
+        ttk.Label(controls, text="Find:").pack(side=tk.LEFT, padx=(10, 0))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(controls, textvariable=self.search_var, width=20)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind('<Return>', lambda event: self.find_next())
+        ttk.Button(controls, text="Find next", command=self.find_next).pack(side=tk.LEFT)
+        self.search_status = ttk.Label(controls, text="")
+        self.search_status.pack(side=tk.LEFT, padx=5)
+
+        # Table with a scrollbar driven by the data offset rather than the items
+        body = ttk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(body, columns=('Position',) + tuple(columns), show='headings',
+                                 height=page_size, selectmode='browse')
+        self.tree.heading('Position', text='Row' if row_numbers is not None else '#')
+        self.tree.column('Position', width=60, stretch=False, anchor=tk.E)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            if widths and column in widths:
+                self.tree.column(column, width=widths[column])
+        self.tree.tag_configure('odd', background='#f0f0f0')
+        self.tree.tag_configure('even', background='white')
+        self.tree.tag_configure('match', background='#fff3b0')
+
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self._on_wheel)
+        self.tree.bind('<Up>', lambda event: self._scroll_by(-1))
+        self.tree.bind('<Down>', lambda event: self._scroll_by(1))
+        self.tree.bind('<Prior>', lambda event: self._scroll_by(-self.page_size))
+        self.tree.bind('<Next>', lambda event: self._scroll_by(self.page_size))
+        self.tree.bind('<Configure>', self._on_resize)
+
+        self._create_items()
+        self._render()
+
+    def scroll_to(self, index):
+        """Show the page starting at data index (clamped to the valid range)"""
+        self.offset = max(0, min(index, len(self.data) - self.page_size))
+        self._render()
+
+    def jump(self):
+        """Select the row numbered in the jump box (or the next one after it)"""
+        try:
+            number = int(self.jump_var.get())
+        except ValueError:
+            return
+        if self.row_numbers is not None:
+            index = bisect.bisect_left(self.row_numbers, number)
+        else:
+            index = number - 1
+        self._select(max(0, min(index, len(self.data) - 1)))
+
+    def find_next(self):
+        """Select the next row containing the search text, wrapping around"""
+        text = self.search_var.get().strip().lower()
+        if not text or not self.data:
+            return
+        start = 0 if self.selected is None else self.selected + 1
+        count = len(self.data)
+        for step in range(count):
+            index = (start + step) % count
+            if any(text in str(value).lower() for value in self.data[index]):
+                self.search_status.config(text="")
+                self._select(index)
+                return
+        self.search_status.config(text="No match")
+
+    def _select(self, index):
+        self.selected = index
+        if not self.offset <= index < self.offset + self.page_size:
+            self.scroll_to(index - self.page_size // 2)
+        else:
+            self._render()
+
+    def _create_items(self):
+        self.tree.delete(*self.tree.get_children())
+        for slot in range(self.page_size):
+            self.tree.insert('', tk.END, iid=str(slot), values=())
+
+    def _render(self):
+        for slot in range(self.page_size):
+            index = self.offset + slot
+            if index < len(self.data):
+                tag = 'match' if index == self.selected else ('even' if index % 2 == 0 else 'odd')
+                number = self.row_numbers[index] if self.row_numbers is not None else index + 1
+                self.tree.item(str(slot), values=(number,) + tuple(self.data[index]), tags=(tag,))
+            else:
+                self.tree.item(str(slot), values=(), tags=())
+        total = max(len(self.data), 1)
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+
+    def _scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.data)))
+        elif action == 'scroll':
+            step = self.page_size if unit == 'pages' else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            return self._scroll_by(-3)
+        return self._scroll_by(3)
+
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight') or ROW_HEIGHT
+        page_size = max(1, (event.height - HEADING_HEIGHT) // int(row_height))
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self._create_items()
+            self.scroll_to(self.offset)
@@ -0,0 +1,102 @@
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Row states
+PENDING = "pending"
+IN_FLIGHT = "in-flight"
+FILLED = "filled"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+# Attempts allowed per row after the first one
+MAX_RETRIES = 3
+
+class RowScheduler:
+    """
+    Iterative work queue driving the fill loop one row at a time.
+
+    Rows are pulled lazily from any iterable of (row_number, row) pairs.
+    The row being worked on is in flight until it is marked filled, skipped
+    or failed, or sent back with retry(). A retried row is handed out again
+    before any new row, at most max_retries times before it counts as
+    failed. Only counters and the retry count of the current row are kept,
+    so memory stays flat however long the batch is.
+
+    With a DedupeIndex, rows whose address and amount were already
+    submitted (or are still being filled earlier in this run) are skipped
+    as they are pulled from the source, before any browser work.
+    """
+
+    def __init__(self, rows, max_retries=MAX_RETRIES, dedupe=None):
+        self.max_retries = max_retries
+        self.dedupe = dedupe
+        self.current = None
+        self.state = None
+        self.attempts = 0
+        self.counts = {FILLED: 0, SKIPPED: 0, FAILED: 0}
+        self._source = iter(rows)
+        self._pending = deque()
+
+    def has_pending(self):
+        """True if another row is waiting, fetching it from the source if needed"""
+        while not self._pending:
+            row = next(self._source, None)
+            if row is None:
+                return False
+            if self.dedupe is not None and not self.dedupe.claim(row[1]):
+                logger.info(f"Skipping row {row[0]}: same address and amount already submitted")
+                self.counts[SKIPPED] += 1
+                continue
+            self._pending.append(row)
+        return True
+
+    def next_row(self):
+        """Take the next (row_number, row) pair in flight, or None when all are done"""
+        if self.state == IN_FLIGHT:
+            raise RuntimeError(f"Row {self.current[0]} is still in flight")
+        if not self.has_pending():
+            self.current = None
+            self.state = None
+            return None
+        row = self._pending.popleft()
+        if self.current is None or row[0] != self.current[0]:
+            self.attempts = 0
+        self.current = row
+        self.state = IN_FLIGHT
+        self.attempts += 1
+        return row
+
+    def filled(self):
+        self._finish(FILLED)
+
+    def skip(self):
+        self._finish(SKIPPED)
+
+    def fail(self):
+        self._finish(FAILED)
+
+    def retry(self):
+        """
+        Put the current row back at the front of the queue.
+
+        Returns False (and marks the row failed) once it has used up its
+        retries.
+        """
+        if self.attempts > self.max_retries:
+            self.fail()
+            return False
+        self._pending.appendleft(self.current)
+        self.state = PENDING
+        return True
+
+    def summary(self):
+        return (f"{self.counts[FILLED]} filled, {self.counts[SKIPPED]} skipped, "
+                f"{self.counts[FAILED]} failed")
+
+    def _finish(self, state):
+        self.state = state
+        self.counts[state] += 1
+        if state != FILLED and self.dedupe is not None:
+            self.dedupe.release(self.current[1])
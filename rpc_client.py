@@ -0,0 +1,113 @@
+import json
+import itertools
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+# Seconds to wait for any single JSON-RPC response
+RPC_TIMEOUT = 30
+
+class RpcError(Exception):
+    """Error returned by the node (code and data as in the JSON-RPC error object) or transport failure"""
+
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+class RpcClient:
+    """
+    Minimal Ethereum JSON-RPC client over HTTP(S).
+
+    Each thread keeps its own keep-alive connection, so sending and
+    receipt polling from different threads don't serialize on one socket
+    or pay a new handshake per request. batch() sends several calls in a
+    single request.
+    """
+
+    def __init__(self, url, timeout=RPC_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        parts = urlsplit(url)
+        self._https = parts.scheme == 'https'
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def call(self, method, *params, retry=True):
+        """
+        Result of one call; raises RpcError if the node returns an error.
+        Pass retry=False for calls that must not reach the node twice, such
+        as eth_sendTransaction.
+        """
+        payload = {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)}
+        return _result(self._post(payload, retry))
+
+    def batch(self, calls):
+        """
+        Results of several (method, params) calls sent as one request, in
+        order; a call the node rejected gets an RpcError in its place.
+        """
+        if not calls:
+            return []
+        requests = [{'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)}
+                    for method, params in calls]
+        responses = self._post(requests)
+        if not isinstance(responses, list):
+            # Nodes without batch support answer with a single error
+            raise RpcError(responses.get('error', {}).get('message', "Batch request rejected"))
+        by_id = {response.get('id'): response for response in responses}
+        results = []
+        for request in requests:
+            try:
+                results.append(_result(by_id.get(request['id'], {})))
+            except RpcError as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _post(self, payload, retry=True):
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        # A kept-alive connection the server has since closed fails once; retry on a fresh one
+        attempts = 2 if retry else 1
+        for attempt in range(attempts):
+            connection = self._connection()
+            try:
+                connection.request('POST', self._path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if attempt == attempts - 1:
+                    raise RpcError(f"Request to {self.url} failed: {e}")
+                continue
+            if response.status != 200:
+                raise RpcError(f"HTTP {response.status} from {self.url}: {data[:200]!r}")
+            try:
+                return json.loads(data)
+            except ValueError:
+                raise RpcError(f"Invalid JSON from {self.url}: {data[:200]!r}")
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            connection = connection_class(self._host, self._port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+def _result(response):
+    if 'error' in response:
+        error = response['error'] or {}
+        raise RpcError(error.get('message', "Unknown error"), error.get('code'), error.get('data'))
+    if 'result' not in response:
+        raise RpcError("Response without a result")
+    return response['result']
@@ -0,0 +1,417 @@
+import time
+import threading
+import logging
+from amounts import to_wei, AmountError
+from addresses import to_checksum_address
+from contract_call import send_lock_calldata, EncodingError, DEFAULT_TYPES
+from rpc_client import RpcClient, RpcError
+from row_scheduler import PENDING, FILLED, SKIPPED, FAILED
+from run_journal import CONFIRMED, UNKNOWN, row_hash
+
+logger = logging.getLogger(__name__)
+
+# Transactions sent but not yet mined, at most
+MAX_IN_FLIGHT = 16
+
+# Seconds between receipt polls
+RECEIPT_POLL_INTERVAL = 1.0
+
+# Seconds to wait for a receipt before leaving a transaction to the next run
+RECEIPT_TIMEOUT = 180
+
+# Headroom on top of the node's gas estimate
+GAS_MARGIN = 1.25
+
+# Node error messages meaning the nonce we sent was not the sender's next one
+_NONCE_ERRORS = ('nonce too low', 'nonce too high', 'invalid nonce', 'replacement transaction underpriced')
+
+class UncertainSendError(Exception):
+    """Raised when a transaction may have reached the node although sending it failed"""
+
+    def __init__(self, message, tx_hash=None):
+        super().__init__(message)
+        self.tx_hash = tx_hash
+
+class NonceManager:
+    """
+    Consecutive nonces for one sender.
+
+    Starts from the node's pending transaction count and counts up
+    locally, so transactions can be sent back to back without a round
+    trip each. A nonce is used up only once the node accepted a
+    transaction with it; after a nonce error, resync() goes back to the
+    node's count.
+    """
+
+    def __init__(self, client, sender):
+        self.client = client
+        self.sender = sender
+        self._next = None
+        self._lock = threading.Lock()
+
+    def peek(self):
+        with self._lock:
+            if self._next is None:
+                self._next = int(self.client.call('eth_getTransactionCount', self.sender, 'pending'), 16)
+            return self._next
+
+    def advance(self):
+        with self._lock:
+            self._next += 1
+
+    def resync(self):
+        with self._lock:
+            self._next = None
+
+class RpcSubmitter:
+    """
+    Submit rows as sendLockByAdmin transactions through a JSON-RPC node,
+    without a browser.
+
+    signature is the called function's canonical signature, read from the
+    contract's verified ABI with contract_call.signature_from_abi.
+
+    Rows are sent one after the other with locally managed nonces while up
+    to max_in_flight transactions wait to be mined; a separate thread polls
+    their receipts in batches. With private_key the transactions are signed
+    locally (needs eth_account) and sent raw; without it the node signs
+    them for sender (or its first account) with eth_sendTransaction, as a
+    development node does.
+
+    Outcomes go to the journal: FILLED with the transaction hash when the
+    node accepts a row, then CONFIRMED once mined or FAILED if it reverted
+    or was dropped. Rows the journal shows as sent in an earlier run are
+    checked on chain instead of being sent again. Transactions still
+    unmined after receipt_timeout are counted as PENDING and stay FILLED
+    in the journal for the next run to check. A row whose send failed in
+    transit after the node may have taken it is counted as PENDING too,
+    recorded as UNKNOWN and keeps its dedupe claim, so neither this run nor
+    the next sends it again.
+
+    With a DedupeIndex, rows already submitted are skipped as in
+    BrowserWorkerPool. A RunMetrics, if given, times the encode, sign,
+    send and receipt steps of every row.
+    """
+
+    def __init__(self, rpc_url, contract_address, signature, sender=None, private_key=None, chain_id=None,
+                 gas_limit=None, gas_price=None, max_in_flight=MAX_IN_FLIGHT, types=DEFAULT_TYPES,
+                 journal=None, dedupe=None, metrics=None,
+                 poll_interval=RECEIPT_POLL_INTERVAL, receipt_timeout=RECEIPT_TIMEOUT, client=None):
+        self.client = client or RpcClient(rpc_url)
+        self.contract = to_checksum_address(contract_address)
+        self.sender = sender
+        self.private_key = private_key
+        self.chain_id = chain_id
+        self.gas_limit = gas_limit
+        self.gas_price = gas_price
+        self.max_in_flight = max_in_flight
+        self.types = types
+        self.signature = signature
+        self.journal = journal
+        self.dedupe = dedupe
+        self.metrics = metrics
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.counts = {FILLED: 0, SKIPPED: 0, FAILED: 0, PENDING: 0}
+        self.nonces = None
+        self._account = None
+        self._batch_receipts = True
+        # tx hash -> (row_number, row, sent_at, timer) of transactions waiting for a receipt
+        self._in_flight = {}
+        self._sending_done = False
+        self._condition = threading.Condition()
+        self._lock = threading.Lock()
+
+    def run(self, rows):
+        """Submit every (row_number, [address, value]) pair and return the outcome counts"""
+        self._prepare()
+        logger.info(f"Submitting to {self.contract} from {self.sender} through {self.client.url}")
+        sent_before = self.journal.sent_transactions() if self.journal is not None else {}
+        poller = threading.Thread(target=self._poll_receipts, daemon=True)
+        poller.start()
+        try:
+            for row_number, row_data in rows:
+                if len(row_data) < 2 or not row_data[0] or not row_data[1]:
+                    logger.warning(f"Skipping row {row_number}: Invalid data format or empty fields")
+                    self._count(SKIPPED)
+                    self._record(row_number, row_data, SKIPPED)
+                    continue
+                earlier = sent_before.get(row_number)
+                if earlier and earlier[0] == row_hash(row_data) and self._track_earlier(row_number, row_data, earlier[1]):
+                    continue
+                if self.dedupe is not None and not self.dedupe.claim(row_data):
+                    logger.info(f"Skipping row {row_number}: same address and amount already submitted")
+                    self._count(SKIPPED)
+                    continue
+                self._wait_for_room()
+                self._submit(row_number, row_data)
+        finally:
+            with self._condition:
+                self._sending_done = True
+                self._condition.notify_all()
+            poller.join()
+            if self.journal is not None:
+                self.journal.close()
+        if self.metrics is not None:
+            self.metrics.finish(self.counts)
+        logger.info(f"RPC submission finished: {self.counts[FILLED]} confirmed, {self.counts[SKIPPED]} skipped, "
+                    f"{self.counts[FAILED]} failed, {self.counts[PENDING]} still pending")
+        return self.counts
+
+    def _prepare(self):
+        """Resolve the sender, chain id, gas price and starting nonce before the first row"""
+        if self.private_key:
+            try:
+                from eth_account import Account
+            except ImportError:
+                raise RuntimeError("Signing transactions needs eth_account (pip install eth-account)")
+            self._account = Account.from_key(self.private_key)
+            if self.sender and self.sender.lower() != self._account.address.lower():
+                raise ValueError(f"The private key belongs to {self._account.address}, not {self.sender}")
+            self.sender = self._account.address
+            if self.chain_id is None:
+                self.chain_id = int(self.client.call('eth_chainId'), 16)
+        elif self.sender is None:
+            accounts = self.client.call('eth_accounts')
+            if not accounts:
+                raise RpcError("The node has no accounts to send from; give a private key")
+            self.sender = accounts[0]
+        if self.gas_price is None:
+            self.gas_price = int(self.client.call('eth_gasPrice'), 16)
+        self.nonces = NonceManager(self.client, self.sender)
+        self.nonces.peek()
+
+    def _submit(self, row_number, row_data):
+        timer = self.metrics.start_row() if self.metrics is not None else None
+        try:
+            value_in_wei = to_wei(row_data[1])  # Exact conversion to integer wei
+            data = "0x" + send_lock_calldata(self.signature, row_data[0], value_in_wei, self.types).hex()
+            if timer is not None:
+                timer.lap('encode')
+            # A nonce error means another sender used the account; try once more from the node's count
+            for attempt in range(2):
+                tx = {'from': self.sender, 'to': self.contract, 'data': data, 'value': 0,
+                      'gasPrice': self.gas_price, 'nonce': self.nonces.peek()}
+                tx['gas'] = self._gas_for(tx)
+                try:
+                    tx_hash = self._send(tx, timer)
+                    break
+                except RpcError as e:
+                    if attempt or not any(text in str(e).lower() for text in _NONCE_ERRORS):
+                        raise
+                    logger.warning(f"Row {row_number}: {e}; resyncing the nonce")
+                    self.nonces.resync()
+        except UncertainSendError as e:
+            logger.warning(f"Row {row_number}: {e}; not sending it again. Check the transactions of {self.sender} "
+                           f"(nonce {tx['nonce']}) and delete the row's journal lines to send it again")
+            self.nonces.resync()
+            self._count(PENDING)
+            self._record(row_number, row_data, UNKNOWN, e.tx_hash)
+            return
+        except (AmountError, EncodingError, RpcError) as e:
+            logger.warning(f"Row {row_number} not sent: {e}")
+            self._fail(row_number, row_data)
+            return
+        self.nonces.advance()
+        if timer is not None:
+            timer.lap('send')
+        logger.info(f"Row {row_number} sent as {tx_hash} (nonce {tx['nonce']})")
+        self._record(row_number, row_data, FILLED, tx_hash)
+        with self._condition:
+            self._in_flight[tx_hash] = (row_number, row_data, time.time(), timer)
+            self._condition.notify_all()
+
+    def _gas_for(self, tx):
+        # Rows differ only in their arguments, so one estimate covers the run
+        if self.gas_limit is None:
+            estimate = self.client.call('eth_estimateGas', {'from': tx['from'], 'to': tx['to'], 'data': tx['data']})
+            self.gas_limit = int(int(estimate, 16) * GAS_MARGIN)
+            logger.info(f"Using a gas limit of {self.gas_limit}")
+        return self.gas_limit
+
+    def _send(self, tx, timer):
+        """Send one transaction and return its hash"""
+        if self._account is None:
+            return self._send_unsigned(tx)
+
+        fields = dict(tx, chainId=self.chain_id)
+        del fields['from']
+        signed = self._account.sign_transaction(fields)
+        raw = getattr(signed, 'raw_transaction', None) or signed.rawTransaction
+        tx_hash = "0x" + bytes(signed.hash).hex()
+        if timer is not None:
+            timer.lap('sign')
+        try:
+            return self.client.call('eth_sendRawTransaction', "0x" + bytes(raw).hex())
+        except RpcError as e:
+            # A retried request whose first attempt got through fails with "already known" or a nonce error
+            try:
+                if self.client.call('eth_getTransactionByHash', tx_hash) is not None:
+                    return tx_hash
+            except RpcError:
+                raise UncertainSendError(f"could not check whether the node got {tx_hash} ({e})", tx_hash)
+            if e.code is not None:
+                raise
+            # The request failed on the way; resending the same signed bytes can't send the row twice
+            logger.warning(f"Sending {tx_hash} failed ({e}); sending it again")
+            try:
+                return self.client.call('eth_sendRawTransaction', "0x" + bytes(raw).hex())
+            except RpcError as e:
+                raise UncertainSendError(f"sending {tx_hash} again failed ({e})", tx_hash)
+
+    def _send_unsigned(self, tx):
+        """Have the node sign and send tx; the hash comes back only if the request does"""
+        fields = {key: hex(value) if isinstance(value, int) else value for key, value in tx.items()}
+        # Not retried by the client: a lost response would look like a failure although the node took it
+        try:
+            return self.client.call('eth_sendTransaction', fields, retry=False)
+        except RpcError as e:
+            if e.code is not None:
+                raise
+            logger.warning(f"Sending nonce {tx['nonce']} failed ({e}); checking whether the node got it")
+            if self._nonce_used(tx['nonce']):
+                raise UncertainSendError(f"the node may have taken nonce {tx['nonce']} before the request failed")
+        # The nonce is still free, and stays the same, so the first request can't also be mined
+        try:
+            return self.client.call('eth_sendTransaction', fields, retry=False)
+        except RpcError as e:
+            if e.code is None or any(text in str(e).lower() for text in _NONCE_ERRORS):
+                raise UncertainSendError(f"sending nonce {tx['nonce']} again failed ({e})")
+            raise
+
+    def _nonce_used(self, nonce):
+        """Whether the sender's pending transactions include nonce; True if the node can't tell"""
+        try:
+            return int(self.client.call('eth_getTransactionCount', self.sender, 'pending'), 16) > nonce
+        except RpcError:
+            return True
+
+    def _track_earlier(self, row_number, row_data, tx_hash):
+        """Follow a transaction sent for this row in an earlier run; returns False if it was dropped"""
+        if tx_hash is None:
+            logger.warning(f"Row {row_number}: an earlier run may have sent it without getting a transaction "
+                           f"hash; skipping it. Check the transactions of {self.sender} and delete the row's "
+                           f"journal lines to send it again")
+            if self.dedupe is not None:
+                self.dedupe.claim(row_data)
+            self._count(PENDING)
+            return True
+        try:
+            receipt = self.client.call('eth_getTransactionReceipt', tx_hash)
+            known = receipt is not None or self.client.call('eth_getTransactionByHash', tx_hash) is not None
+        except RpcError as e:
+            logger.warning(f"Row {row_number}: could not check earlier transaction {tx_hash} ({e}); skipping it")
+            self._count(PENDING)
+            return True
+        if not known:
+            logger.info(f"Row {row_number}: earlier transaction {tx_hash} was dropped; sending again")
+            return False
+        logger.info(f"Row {row_number}: already sent as {tx_hash} in an earlier run")
+        if self.dedupe is not None:
+            self.dedupe.claim(row_data)
+        self._wait_for_room()
+        with self._condition:
+            self._in_flight[tx_hash] = (row_number, row_data, time.time(), None)
+        if receipt is not None:
+            self._settle(tx_hash, receipt)
+        return True
+
+    def _wait_for_room(self):
+        with self._condition:
+            while len(self._in_flight) >= self.max_in_flight:
+                self._condition.wait()
+
+    def _poll_receipts(self):
+        while True:
+            with self._condition:
+                while not self._in_flight and not self._sending_done:
+                    self._condition.wait()
+                if not self._in_flight:
+                    return
+                hashes = list(self._in_flight)
+            try:
+                receipts = self._fetch_receipts(hashes)
+            except RpcError as e:
+                logger.warning(f"Could not poll receipts: {e}")
+                receipts = [None] * len(hashes)
+            now = time.time()
+            for tx_hash, receipt in zip(hashes, receipts):
+                entry = self._in_flight.get(tx_hash)
+                if entry is None:
+                    continue
+                try:
+                    if receipt is not None and not isinstance(receipt, RpcError):
+                        self._settle(tx_hash, receipt)
+                    elif now - entry[2] > self.receipt_timeout:
+                        self._expire(tx_hash)
+                except Exception as e:
+                    # The sending thread waits on this one, so it must keep going
+                    logger.error(f"Could not handle transaction {tx_hash}: {e}")
+                    self._take(tx_hash)
+                    self._count(PENDING)
+            time.sleep(self.poll_interval)
+
+    def _fetch_receipts(self, hashes):
+        if self._batch_receipts:
+            try:
+                return self.client.batch([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in hashes])
+            except RpcError as e:
+                logger.info(f"Batch requests not available ({e}); polling receipts one by one")
+                self._batch_receipts = False
+        return [self.client.call('eth_getTransactionReceipt', tx_hash) for tx_hash in hashes]
+
+    def _settle(self, tx_hash, receipt):
+        """Record the outcome of a mined transaction"""
+        entry = self._take(tx_hash)
+        if entry is None:
+            return
+        row_number, row_data, _, timer = entry
+        if int(receipt.get('status', '0x1'), 16) == 1:
+            if timer is not None:
+                timer.lap('receipt')
+                timer.finish()
+            self._count(FILLED)
+            self._record(row_number, row_data, CONFIRMED, tx_hash)
+            logger.info(f"Row {row_number} confirmed in block {int(receipt.get('blockNumber') or '0x0', 16)}")
+        else:
+            logger.warning(f"Row {row_number}: transaction {tx_hash} reverted")
+            self._fail(row_number, row_data, tx_hash)
+
+    def _expire(self, tx_hash):
+        """Give up waiting for a receipt"""
+        try:
+            known = self.client.call('eth_getTransactionByHash', tx_hash) is not None
+        except RpcError:
+            known = True
+        entry = self._take(tx_hash)
+        if entry is None:
+            return
+        row_number, row_data = entry[:2]
+        if known:
+            logger.warning(f"Row {row_number}: no receipt for {tx_hash} after {self.receipt_timeout}s; "
+                           f"left for the next run to check")
+            self._count(PENDING)
+        else:
+            logger.warning(f"Row {row_number}: transaction {tx_hash} was dropped by the node")
+            self._fail(row_number, row_data, tx_hash)
+
+    def _take(self, tx_hash):
+        """Remove a transaction from the in-flight set, making room for the next row"""
+        with self._condition:
+            entry = self._in_flight.pop(tx_hash, None)
+            self._condition.notify_all()
+        return entry
+
+    def _fail(self, row_number, row_data, tx_hash=None):
+        self._count(FAILED)
+        self._record(row_number, row_data, FAILED, tx_hash)
+        if self.dedupe is not None:
+            self.dedupe.release(row_data)
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _record(self, row_number, row_data, outcome, tx_hash=None):
+        if self.journal is not None:
+            self.journal.record(row_number, row_data, outcome, tx_hash)
@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from row_scheduler import FILLED
+
+logger = logging.getLogger(__name__)
+
+# Default journal file, next to the log file
+JOURNAL_FILE = 'bscscan_journal.jsonl'
+
+# Outcome recorded once the operator has moved past a filled row
+CONFIRMED = "confirmed"
+
+# Outcome recorded for a transaction the node may have accepted without returning its hash
+UNKNOWN = "unknown"
+
+# Outcome recorded for a row written to a bundle that a wallet has not yet executed
+EXPORTED = "exported"
+
+# Records written between fsync calls
+SYNC_EVERY = 20
+
+def row_hash(row):
+    """Short content hash of a row, so a changed sheet row is not treated as done"""
+    return hashlib.sha256("\x1f".join(str(value) for value in row).encode('utf-8')).hexdigest()[:16]
+
+class RunJournal:
+    """
+    Append-only JSONL record of row outcomes for one sheet.
+
+    Every line holds the sheet URL, sheet row number, row content hash and
+    outcome. Lines are flushed as they are written and fsynced every
+    sync_every records (and on close), so a crash loses at most a few
+    outcomes. Resuming skips rows whose latest outcome is CONFIRMED and
+    whose content hash still matches.
+
+    Confirmed rows are also added to dedupe (a DedupeIndex), if given,
+    which is closed together with the journal.
+
+    Rows submitted as transactions carry the transaction hash, so a run
+    that stopped before their receipts arrived can check on them instead
+    of sending them again (see sent_transactions). Rows whose transaction
+    may have gone out without a hash coming back are recorded as UNKNOWN
+    and are not sent again automatically.
+
+    Rows written to a bundle by --export-bundles are recorded as EXPORTED
+    with the bundle's path, and are left out of later runs until the
+    bundle is marked executed (which records them as CONFIRMED) or their
+    journal lines are deleted (see exported_rows).
+    """
+
+    def __init__(self, sheet_url, path=JOURNAL_FILE, sync_every=SYNC_EVERY, dedupe=None):
+        self.sheet_url = sheet_url
+        self.dedupe = dedupe
+        self.path = path
+        self.sync_every = sync_every
+        self._file = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+    def record(self, row_number, row, outcome, tx_hash=None, bundle=None):
+        entry = {'sheet': self.sheet_url, 'row': row_number, 'hash': row_hash(row),
+                 'outcome': outcome, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+        if tx_hash:
+            entry['tx'] = tx_hash
+        if bundle:
+            entry['bundle'] = bundle
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._sync()
+        if outcome == CONFIRMED and self.dedupe is not None:
+            self.dedupe.add(row_number, row)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+        if self.dedupe is not None:
+            self.dedupe.close()
+
+    def completed_rows(self):
+        """Map row number -> content hash for rows of this sheet already confirmed"""
+        completed = {}
+        for entry in self._entries():
+            if entry.get('outcome') == CONFIRMED:
+                completed[entry['row']] = entry['hash']
+            else:
+                completed.pop(entry['row'], None)
+        return completed
+
+    def sent_transactions(self):
+        """
+        Map row number -> (content hash, transaction hash) for rows of this
+        sheet whose latest outcome is a transaction without a known result.
+        The transaction hash is None for UNKNOWN rows sent without one.
+        """
+        sent = {}
+        for entry in self._entries():
+            if (entry.get('tx') and entry.get('outcome') == FILLED) or entry.get('outcome') == UNKNOWN:
+                sent[entry['row']] = (entry['hash'], entry.get('tx'))
+            else:
+                sent.pop(entry['row'], None)
+        return sent
+
+    def exported_rows(self):
+        """
+        Map row number -> (content hash, bundle path) for rows of this sheet
+        whose latest outcome is EXPORTED, i.e. waiting in a bundle.
+        """
+        exported = {}
+        for entry in self._entries():
+            if entry.get('outcome') == EXPORTED:
+                exported[entry['row']] = (entry['hash'], entry.get('bundle'))
+            else:
+                exported.pop(entry['row'], None)
+        return exported
+
+    def _entries(self):
+        """Journal entries for this sheet, oldest first"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line after a crash
+                    continue
+                if entry.get('sheet') == self.sheet_url:
+                    yield entry
+
+    def _sync(self):
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning(f"Could not sync run journal: {e}")
+        self._unsynced = 0
+
+def skip_completed(rows, completed):
+    """Drop (row_number, row) pairs already completed with the same content"""
+    for row_number, row in rows:
+        if completed.get(row_number) == row_hash(row):
+            logger.info(f"Skipping row {row_number}: already completed in a previous run")
+            continue
+        yield row_number, row
+
+def skip_exported(rows, exported):
+    """Drop (row_number, row) pairs waiting in an exported bundle with the same content"""
+    for row_number, row in rows:
+        entry = exported.get(row_number)
+        if entry is not None and entry[0] == row_hash(row):
+            logger.warning(f"Skipping row {row_number}: exported to {entry[1]}; mark the bundle executed, "
+                           f"or delete the row's journal lines to submit it again")
+            continue
+        yield row_number, row
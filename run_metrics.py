@@ -0,0 +1,139 @@
+import math
+import json
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default metrics file, next to the run journal
+METRICS_FILE = 'bscscan_metrics.json'
+
+# Steps timed for each row, in the order they happen; the last four are
+# those of the JSON-RPC backend (rpc_submitter)
+STEPS = ('frame_switch', 'locate', 'expand', 'fill', 'submit', 'confirm_wait', 'clear',
+         'encode', 'sign', 'send', 'receipt')
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+class RowTimer:
+    """
+    Times the steps of one row as laps.
+
+    Each lap(step) records the time since the previous lap (or since the
+    row started), so steps can be marked in place without wrapping the
+    code in blocks. finish() records the whole row.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.started = self._last = time.perf_counter()
+
+    def lap(self, step):
+        now = time.perf_counter()
+        self.metrics.record(step, now - self._last)
+        self._last = now
+
+    def finish(self):
+        self.metrics.record('row', time.perf_counter() - self.started)
+
+class RunMetrics:
+    """
+    Step timings and row outcomes for one run.
+
+    Durations are kept per step so p50/p95 can be reported at the end; a
+    few floats per row is small next to the rows themselves. Safe to
+    share between pool workers.
+
+    Written to a file with write() and summarized with summary_lines() at
+    the end of a run.
+    """
+
+    def __init__(self):
+        # The clock starts with the first row, so setup time doesn't lower rows/min
+        self.started = None
+        self.finished = None
+        self.durations = {}
+        self.outcomes = {}
+        self._lock = threading.Lock()
+
+    def start_row(self):
+        if self.started is None:
+            self.started = time.time()
+        return RowTimer(self)
+
+    def record(self, step, seconds):
+        with self._lock:
+            self.durations.setdefault(step, []).append(seconds)
+
+    def finish(self, outcomes=None):
+        """Stop the run clock, keeping the row outcome counts (e.g. RowScheduler.counts)"""
+        self.finished = time.time()
+        if outcomes:
+            self.outcomes = dict(outcomes)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def rows_per_minute(self):
+        elapsed = self.elapsed()
+        return len(self.durations.get('row', ())) * 60 / elapsed if elapsed > 0 else 0.0
+
+    def step_stats(self):
+        """Map step -> count, total, p50, p95 and max seconds"""
+        with self._lock:
+            durations = {step: sorted(values) for step, values in self.durations.items()}
+        order = STEPS + ('row',)
+        stats = {}
+        for step in sorted(durations, key=lambda s: order.index(s) if s in order else len(order)):
+            values = durations[step]
+            stats[step] = {'count': len(values), 'total': sum(values), 'p50': percentile(values, 0.5),
+                           'p95': percentile(values, 0.95), 'max': values[-1]}
+        return stats
+
+    def to_dict(self):
+        return {'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started or time.time())),
+                'elapsed_seconds': self.elapsed(), 'rows_per_minute': self.rows_per_minute(),
+                'outcomes': dict(self.outcomes), 'steps': self.step_stats()}
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = ["# HELP bscscan_step_seconds Time spent in each step of a row",
+                 "# TYPE bscscan_step_seconds summary"]
+        for step, stats in self.step_stats().items():
+            lines.append(f'bscscan_step_seconds{{step="{step}",quantile="0.5"}} {stats["p50"]:.6f}')
+            lines.append(f'bscscan_step_seconds{{step="{step}",quantile="0.95"}} {stats["p95"]:.6f}')
+            lines.append(f'bscscan_step_seconds_sum{{step="{step}"}} {stats["total"]:.6f}')
+            lines.append(f'bscscan_step_seconds_count{{step="{step}"}} {stats["count"]}')
+        lines += ["# HELP bscscan_rows_total Rows by outcome", "# TYPE bscscan_rows_total counter"]
+        for outcome, count in sorted(self.outcomes.items()):
+            lines.append(f'bscscan_rows_total{{outcome="{outcome}"}} {count}')
+        lines += ["# HELP bscscan_rows_per_minute Rows completed per minute of the run",
+                  "# TYPE bscscan_rows_per_minute gauge",
+                  f"bscscan_rows_per_minute {self.rows_per_minute():.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_FILE):
+        """Write the metrics as Prometheus text if path ends in .prom or .txt, else as JSON"""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                if path.endswith(('.prom', '.txt')):
+                    f.write(self.to_prometheus())
+                else:
+                    json.dump(self.to_dict(), f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write run metrics: {e}")
+
+    def summary_lines(self):
+        """Short per-step summary for the status pane and logs"""
+        lines = [f"{len(self.durations.get('row', ()))} rows in {self.elapsed():.0f}s "
+                 f"({self.rows_per_minute():.1f} rows/min)"]
+        for step, stats in self.step_stats().items():
+            lines.append(f"  {step}: p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s over {stats['count']}")
+        return lines
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Ranges larger than this are streamed but never cached
+MAX_CACHED_ROWS = 100000
+
+class SheetSnapshotCache:
+    """
+    Snapshots of fetched sheet ranges, reused while the sheet is unchanged.
+
+    Entries are keyed by sheet URL, row range and columns, and store the
+    sheet revision they were read at. A lookup only hits when the entry is
+    younger than ttl seconds and its revision matches the current one
+    (sheet_reader skips the cache for sheets without a revision, whose
+    edits it can't detect). The least recently used entries are evicted
+    beyond max_entries. With a directory, snapshots are also written to
+    disk so they survive restarts.
+    """
+
+    def __init__(self, max_entries=16, ttl=600, directory=None, max_rows=MAX_CACHED_ROWS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(spreadsheet_url, start_row, end_row, columns):
+        return f"{spreadsheet_url}|{start_row}|{end_row}|{','.join(str(c) for c in columns)}"
+
+    def get(self, key, revision=None):
+        """Return the cached (row_number, row) pairs for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+            if entry is None:
+                return None
+            if time.time() - entry['fetched_at'] > self.ttl or entry['revision'] != revision:
+                self._remove(key)
+                return None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            return entry['rows']
+
+    def put(self, key, revision, rows):
+        """Store a complete range snapshot"""
+        rows = [(row_number, list(row)) for row_number, row in rows]
+        if len(rows) > self.max_rows:
+            return
+        entry = {'key': key, 'revision': revision, 'fetched_at': time.time(), 'rows': rows}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._save(entry)
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._remove(oldest)
+            self._trim_directory()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            if self.directory:
+                for name in os.listdir(self.directory):
+                    if name.endswith('.json'):
+                        os.remove(os.path.join(self.directory, name))
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('key') != key:
+            return None
+        entry['rows'] = [(row_number, row) for row_number, row in entry['rows']]
+        # Touch the file so disk eviction follows recent use
+        os.utime(path)
+        return entry
+
+    def _save(self, entry):
+        if not self.directory:
+            return
+        path = self._path(entry['key'])
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning(f"Could not write sheet snapshot: {e}")
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _trim_directory(self):
+        if not self.directory:
+            return
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith('.json')]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,21 +1,264 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import threading
+import queue
+import os
+import logging
 
-def get_sheet_data(spreadsheet_url, start_row, end_row, columns):
-    # Define scope
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+logger = logging.getLogger(__name__)
+
+# Number of rows requested per Sheets API call when reading large ranges
+CHUNK_SIZE = 5000
+
+# Number of fetched chunks allowed to wait ahead of the consumer
+PREFETCH_DEPTH = 2
+
+# Authorized clients keyed by credential file, and opened worksheets keyed
+# by (credential file, sheet URL), shared by every caller in the process
+_clients = {}
+_worksheets = {}
+_cache_lock = threading.Lock()
+
+def get_client(creds_path='service_account.json'):
+    """
+    Return a gspread client for the credential file, authorizing only once.
+
+    The client (and its access token) is reused until the token expires or
+    the credential file changes on disk.
+    """
+    path = os.path.abspath(creds_path)
+    with _cache_lock:
+        cached = _clients.get(path)
+        if cached and cached[0] is None:
+            # Registered with register_client(), not backed by the file
+            return cached[1]
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _clients.get(path)
+        if cached and cached[0] == mtime:
+            client = cached[1]
+            _refresh_if_expired(client)
+            return client
+
+        # Imported here so the app window doesn't wait for the Google client libraries
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
+        # Define scope
+        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+        # Authenticate
+        creds = ServiceAccountCredentials.from_json_keyfile_name(path, scope)
+        client = gspread.authorize(creds)
+        _clients[path] = (mtime, client)
+
+        # Worksheets opened with the old credentials are no longer valid
+        for key in [key for key in _worksheets if key[0] == path]:
+            del _worksheets[key]
+        return client
+
+def register_client(client, creds_path='service_account.json'):
+    """
+    Use an already authorized client for creds_path instead of the file.
+
+    Anything with gspread's open_by_url(url).sheet1 interface works, e.g.
+    the local fake in benchmarks/fake_sheets.py.
+    """
+    path = os.path.abspath(creds_path)
+    with _cache_lock:
+        _clients[path] = (None, client)
+        for key in [key for key in _worksheets if key[0] == path]:
+            del _worksheets[key]
+
+def _refresh_if_expired(client):
+    auth = getattr(client, 'auth', None)
+    # oauth2client credentials expose access_token_expired, google-auth ones expired
+    if getattr(auth, 'access_token_expired', False) or getattr(auth, 'expired', False):
+        if hasattr(client, 'login'):
+            client.login()
+
+def open_worksheet(spreadsheet_url, creds_path='service_account.json'):
+    """Open the first worksheet of the sheet, reusing the cached handle if present"""
+    client = get_client(creds_path)
+    key = (os.path.abspath(creds_path), spreadsheet_url)
+    with _cache_lock:
+        sheet = _worksheets.get(key)
+    if sheet is None:
+        # Open the sheet by URL
+        sheet = client.open_by_url(spreadsheet_url).sheet1
+        with _cache_lock:
+            _worksheets[key] = sheet
+    return sheet
+
+def clear_client_cache():
+    """Forget all cached clients and worksheets, e.g. after an API error"""
+    with _cache_lock:
+        _clients.clear()
+        _worksheets.clear()
+
+def column_letter(column):
+    """Convert a 1-based column number to its A1 letter (1 -> A, 28 -> AB)"""
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def iter_sheet_chunks(sheet, start_row, end_row, columns, chunk_size=CHUNK_SIZE):
+    """
+    Fetch only the requested rows and columns, one chunk at a time.
 
-    # Authenticate
-    creds = ServiceAccountCredentials.from_json_keyfile_name('service_account.json', scope)
-    client = gspread.authorize(creds)
+    Instead of downloading the whole sheet with get_all_values(), each chunk
+    asks for an A1 range such as A2:B5001. Works with anything exposing
+    gspread's Worksheet.get(range_name), so a local fake can stand in for
+    the real client.
 
-    # Open the sheet by URL
-    sheet = client.open_by_url(spreadsheet_url).sheet1
+    Args:
+        sheet: gspread Worksheet (or compatible object)
+        start_row: First sheet row to read (1-based, inclusive)
+        end_row: Last sheet row to read (1-based, inclusive)
+        columns: 1-based column numbers to keep, in output order
+        chunk_size: Maximum number of rows per API call
+
+    Yields:
+        Lists of rows, each row holding the selected column values
+    """
+    first_col = min(columns)
+    last_col = max(columns)
+    for chunk_start in range(start_row, end_row + 1, chunk_size):
+        chunk_end = min(chunk_start + chunk_size - 1, end_row)
+        range_name = f"{column_letter(first_col)}{chunk_start}:{column_letter(last_col)}{chunk_end}"
+        chunk = []
+        for row in sheet.get(range_name):
+            # The API trims trailing empty cells, so pad short rows
+            chunk.append([row[c-first_col] if c-first_col < len(row) else "" for c in columns])
+        yield chunk
+
+def iter_sheet_rows(sheet, start_row, end_row, columns, chunk_size=CHUNK_SIZE, prefetch_depth=0):
+    """
+    Yield (row_number, row) pairs lazily, fetching one chunk at a time.
+
+    Row numbers are the 1-based sheet rows, so callers can report and
+    track progress against the sheet even when rows are skipped. With
+    prefetch_depth > 0 the following chunks are downloaded in the
+    background while the current one is being consumed.
+    """
+    chunks = iter_sheet_chunks(sheet, start_row, end_row, columns, chunk_size)
+    if prefetch_depth > 0:
+        chunks = prefetch(chunks, prefetch_depth)
+    for index, chunk in enumerate(chunks):
+        chunk_start = start_row + index * chunk_size
+        for offset, row in enumerate(chunk):
+            yield chunk_start + offset, row
+
+def iter_valid_rows(rows):
+    """Drop (row_number, row) pairs that have an empty value in any column"""
+    for row_number, row in rows:
+        if all(row):
+            yield row_number, row
+
+def prefetch(iterable, depth=PREFETCH_DEPTH):
+    """
+    Iterate over iterable from a background thread, keeping up to depth
+    items buffered, so the next sheet chunk downloads while the caller is
+    still working on the current one. Errors raised by the producer are
+    re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        items = iter(iterable)
+        try:
+            # Checked before each fetch, so nothing more is downloaded once the consumer stops
+            while not stop.is_set():
+                try:
+                    item = next(items)
+                except StopIteration:
+                    buffer.put(done)
+                    return
+                buffer.put(item)
+        except Exception as e:
+            buffer.put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Let the producer exit if the consumer stops early
+        stop.set()
+        while not buffer.empty():
+            buffer.get_nowait()
+
+def get_sheet_revision(sheet):
+    """
+    Return the spreadsheet's last modified time, or None if unavailable.
+
+    This is a single Drive metadata request, far cheaper than re-reading a
+    range, and is used to tell whether a cached snapshot is still current.
+    """
+    spreadsheet = getattr(sheet, 'spreadsheet', None)
+    try:
+        if hasattr(spreadsheet, 'get_lastUpdateTime'):
+            return spreadsheet.get_lastUpdateTime()
+        return getattr(spreadsheet, 'lastUpdateTime', None)
+    except Exception:
+        return None
+
+def iter_sheet_data(spreadsheet_url, start_row, end_row, columns,
+                    creds_path='service_account.json', chunk_size=CHUNK_SIZE, cache=None):
+    """
+    Open the sheet and stream (row_number, row) pairs for the given range.
+
+    The sheet is opened eagerly so connection errors surface here, while
+    rows are fetched chunk by chunk in the background as they are consumed.
+    The iterator itself holds only a few chunks. The app and CLIs check
+    each row as it arrives (see amounts.iter_converted) and keep only the
+    valid ones, since the whole range is validated (and duplicates found)
+    before anything is filled; the app's preview keeps every row to show it.
+
+    With a sheet_cache.SheetSnapshotCache, a range already read at the
+    current sheet revision is served from the snapshot without fetching,
+    and a range read to completion is stored for the next caller. Without
+    a revision, edits can't be detected, so the cache is not used.
+    """
+    sheet = open_worksheet(spreadsheet_url, creds_path)
+    if cache is None:
+        return iter_sheet_rows(sheet, start_row, end_row, columns, chunk_size, PREFETCH_DEPTH)
+
+    revision = get_sheet_revision(sheet)
+    if revision is None:
+        logger.warning("Sheet revision unavailable; reading the range again instead of using the cached snapshot")
+        return iter_sheet_rows(sheet, start_row, end_row, columns, chunk_size, PREFETCH_DEPTH)
+    key = cache.make_key(spreadsheet_url, start_row, end_row, columns)
+    rows = cache.get(key, revision)
+    if rows is not None:
+        return iter(rows)
+    rows = iter_sheet_rows(sheet, start_row, end_row, columns, chunk_size, PREFETCH_DEPTH)
+    return _record_snapshot(rows, cache, key, revision)
+
+def _record_snapshot(rows, cache, key, revision):
+    seen = []
+    for item in rows:
+        if seen is not None:
+            seen.append(item)
+            if len(seen) > cache.max_rows:
+                seen = None
+        yield item
+    if seen is not None:
+        cache.put(key, revision, seen)
+
+def get_sheet_data(spreadsheet_url, start_row, end_row, columns):
+    sheet = open_worksheet(spreadsheet_url)
 
     # Read the desired rows
     data = []
-    for row in sheet.get_all_values()[start_row-1:end_row]:
-        selected = [row[c-1] for c in columns]  # Adjust to 0-indexed for Python lists
-        data.append(selected)
+    for chunk in iter_sheet_chunks(sheet, start_row, end_row, columns):
+        data.extend(chunk)
 
     return data
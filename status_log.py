@@ -0,0 +1,60 @@
+import logging
+from collections import deque
+import tkinter as tk
+
+# Lines kept in the status pane; older lines are dropped
+MAX_LINES = 2000
+
+# Milliseconds between refreshes of the status pane
+DRAIN_INTERVAL_MS = 100
+
+class StatusLogSink:
+    """
+    Batches status messages from any thread into a Tk text widget.
+
+    push() only appends to a bounded deque, so worker threads never touch
+    Tk. The Tk thread drains the buffer every interval_ms with a single
+    insert, then trims the widget to max_lines, so long runs keep both the
+    UI responsive and memory flat.
+    """
+
+    def __init__(self, root, text_widget, max_lines=MAX_LINES, interval_ms=DRAIN_INTERVAL_MS):
+        self.root = root
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        # deque appends and pops are thread-safe
+        self._pending = deque(maxlen=max_lines)
+
+    def push(self, message):
+        self._pending.append(message)
+
+    def start(self):
+        """Begin draining on the Tk event loop"""
+        self.root.after(self.interval_ms, self._drain)
+
+    def _drain(self):
+        lines = []
+        while self._pending:
+            lines.append(self._pending.popleft())
+        if lines:
+            self.text_widget.insert(tk.END, "\n".join(lines) + "\n")
+            # The text always ends with an empty line after the last newline
+            excess = int(self.text_widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+            if excess > 0:
+                self.text_widget.delete('1.0', f'{excess + 1}.0')
+            self.text_widget.see(tk.END)
+        self.root.after(self.interval_ms, self._drain)
+
+class StatusLogHandler(logging.Handler):
+    """Logging handler forwarding formatted records to a StatusLogSink"""
+
+    def __init__(self, sink, level=logging.INFO):
+        super().__init__(level)
+        self.sink = sink
+
+    def emit(self, record):
+        try:
+            self.sink.push(self.format(record))
+        except Exception:
+            self.handleError(record)
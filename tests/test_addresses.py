@@ -0,0 +1,39 @@
+import pytest
+
+from addresses import to_checksum_address, check_address, validate_addresses
+
+# Examples from EIP-55
+CHECKSUMMED = [
+    "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+    "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359",
+    "0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB",
+    "0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb",
+]
+
+@pytest.mark.parametrize("address", CHECKSUMMED)
+def test_to_checksum_address(address):
+    assert to_checksum_address(address.lower()) == address
+    assert to_checksum_address(address.upper().replace("0X", "0x")) == address
+
+@pytest.mark.parametrize("address", CHECKSUMMED + [a.lower() for a in CHECKSUMMED])
+def test_check_address_valid(address):
+    assert check_address(address) is None
+
+@pytest.mark.parametrize("address, reason", [
+    ("5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed", "missing 0x prefix"),
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAe", "wrong length"),
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeg", "not hexadecimal"),
+    ("0x" + "0" * 40, "zero address"),
+    ("0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD", "checksum mismatch"),
+])
+def test_check_address_invalid(address, reason):
+    assert check_address(address).startswith(reason)
+
+def test_validate_addresses_reports_invalid_and_duplicates():
+    rows = [(2, [CHECKSUMMED[0], "1"]), (3, ["0x123", "1"]), (4, [CHECKSUMMED[0].lower(), "2"]),
+            (5, [CHECKSUMMED[1], "1"])]
+    report = validate_addresses(rows)
+    assert [row_number for row_number, _ in report.valid] == [2, 4, 5]
+    assert [row_number for row_number, _, _ in report.invalid] == [3]
+    assert report.duplicates == {CHECKSUMMED[0].lower(): [2, 4]}
+    assert len(report.issues()) == 2
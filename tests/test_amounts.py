@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+import pytest
+
+from amounts import to_wei, parse_amount, normalize_amount, convert_batch, iter_converted, AmountError, MAX_UINT256
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", 10 ** 18),
+    ("0.1", 10 ** 17),
+    ("0.000000000000000001", 1),
+    ("1,234.5", 1234500000000000000000),
+    ("1.5e-3", 1500000000000000),
+    ("  42  ", 42 * 10 ** 18),
+    (0.1, 10 ** 17),
+    (3, 3 * 10 ** 18),
+    (Decimal("2.50"), 25 * 10 ** 17),
+])
+def test_to_wei(value, expected):
+    assert to_wei(value) == expected
+
+def test_to_wei_comma_decimal_separator():
+    assert to_wei("1.234,5", decimal_separator=',') == 1234500000000000000000
+
+@pytest.mark.parametrize("value", [
+    "", "abc", "1.2.3", "-1", "0.0000000000000000001", "12,34", "1,234 567", "1e999999999", "nan", "inf",
+    "0", "-0", "0.000", "0e10", 0, "1e-100000000", "-1e-100000000", "1.5e-18",
+])
+def test_to_wei_rejects(value):
+    with pytest.raises(AmountError):
+        to_wei(value)
+
+def test_to_wei_trailing_zeros_within_decimals():
+    assert to_wei("1." + "0" * 40) == 10 ** 18
+    assert to_wei("100e-20") == 1
+
+def test_to_wei_uint256_bound():
+    assert to_wei(MAX_UINT256, decimals=0) == MAX_UINT256
+    with pytest.raises(AmountError):
+        to_wei(MAX_UINT256 + 1, decimals=0)
+
+def test_parse_amount_never_goes_through_float():
+    assert parse_amount("0.30000000000000001") == Decimal("0.30000000000000001")
+
+def test_normalize_amount():
+    assert normalize_amount("1,000.50") == "1000.50"
+    assert normalize_amount("2.0") == "2.0"
+    assert normalize_amount("1e3") == "1000"
+
+def test_convert_batch_splits_and_normalizes():
+    rows = [(2, ["0xa", "1,000"]), (3, ["0xb", "bad"]), (4, ["0xc", "1.5", "extra"]), (5, ["0xd", "1"])]
+    valid, invalid = convert_batch(rows)
+    assert valid == [(2, ["0xa", "1000"]), (4, ["0xc", "1.5", "extra"]), (5, ["0xd", "1"])]
+    assert [(row_number, value) for row_number, value, _ in invalid] == [(3, "bad")]
+
+def test_convert_batch_rejects_zero():
+    valid, invalid = convert_batch([(2, ["0xa", "0"]), (3, ["0xb", "-0"]), (4, ["0xc", "0.0"]), (5, ["0xd", "1"])])
+    assert valid == [(5, ["0xd", "1"])]
+    assert [row_number for row_number, _, _ in invalid] == [2, 3, 4]
+    assert "zero" in invalid[0][2]
+
+def test_convert_batch_keeps_unchanged_rows():
+    row = ["0xa", "1"]
+    valid, _ = convert_batch([(2, row)])
+    assert valid[0][1] is row
+
+def test_iter_converted_checks_rows_as_they_arrive():
+    invalid = []
+    converted = iter_converted(iter([(2, ["0xa", "1,5"]), (3, ["0xb", "x"]), (4, ["0xc", "2"])]), invalid,
+                               decimal_separator=',')
+    assert next(converted) == (2, ["0xa", "1.5"])
+    assert invalid == []
+    assert next(converted) == (4, ["0xc", "2"])
+    assert [row_number for row_number, _, _ in invalid] == [3]
+
+def test_convert_batch_empty():
+    assert convert_batch([]) == ([], [])
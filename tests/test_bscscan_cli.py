@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from fake_sheets import FakeClient
+from stub_rpc_node import serve_stub_node, ABI_FILE
+from sheet_reader import register_client, clear_client_cache
+from call_bundles import MANIFEST_FILE, read_manifest
+from dedupe_index import DedupeIndex
+from run_journal import RunJournal
+from bscscan_cli import main, load_options, DEFAULT_CONTRACT_URL
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/fake/edit"
+SIGNATURE = 'sendLockByAdmin(uint8,address,uint256)'
+
+@pytest.fixture
+def argv(tmp_path):
+    creds_path = str(tmp_path / "service_account.json")
+    register_client(FakeClient(rows=20), creds_path)
+    yield ['--sheet-url', SHEET_URL, '--start-row', '2', '--end-row', '11', '--creds', creds_path,
+           '--journal', str(tmp_path / "journal.jsonl"), '--dedupe-db', str(tmp_path / "dedupe.db"),
+           '--metrics', str(tmp_path / "metrics.json")]
+    clear_client_cache()
+
+def test_signature_comes_from_the_abi(argv):
+    rpc = ['--backend', 'rpc', '--rpc-url', "http://127.0.0.1:8545"]
+    assert load_options(argv + rpc + ['--abi', ABI_FILE])['function_signature'] == SIGNATURE
+    options = load_options(argv + rpc + ['--abi', ABI_FILE, '--function-signature', SIGNATURE.replace(',', ', ')])
+    assert options['function_signature'] == SIGNATURE
+    # The browser fills the form itself and needs no signature
+    assert load_options(argv)['function_signature'] is None
+
+@pytest.mark.parametrize("extra", [
+    [],
+    ['--abi', ABI_FILE, '--function-signature', 'sendLockByAdmin(uint256,address,uint256)'],
+    ['--function-signature', 'transfer(address,uint256)'],
+])
+def test_missing_or_mismatched_signature(argv, extra):
+    assert main(argv + ['--backend', 'rpc', '--rpc-url', "http://127.0.0.1:8545"] + extra) == 2
+    assert main(argv + ['--export-bundles', "bundles"] + extra) == 2
+
+class BrokenSheet:
+    """Client whose sheet fails while the rows are being checked"""
+
+    @property
+    def sheet1(self):
+        return self
+
+    def open_by_url(self, url):
+        return self
+
+    def get(self, range_name):
+        raise ConnectionError("quota exceeded")
+
+def test_sheet_errors_during_the_check(argv):
+    register_client(BrokenSheet(), argv[argv.index('--creds') + 1])
+    assert main(argv + ['--check']) == 2
+
+def test_rpc_backend(argv):
+    server, url = serve_stub_node(block_time=0.02)
+    try:
+        assert main(argv + ['--backend', 'rpc', '--rpc-url', url, '--abi', ABI_FILE]) == 0
+    finally:
+        server.shutdown()
+    assert len(server.node.transactions) == 10
+    assert all(tx['succeeds'] for tx in server.node.transactions.values())
+
+def test_export_bundles(argv, tmp_path):
+    directory = tmp_path / "bundles"
+    assert main(argv + ['--export-bundles', str(directory), '--abi', ABI_FILE, '--max-calls', "4"]) == 0
+    with open(directory / MANIFEST_FILE, encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert list(manifest['bundles'].values()) == [[2, 3, 4, 5], [6, 7, 8, 9], [10, 11]]
+
+def test_exported_rows_wait_until_marked_executed(argv, tmp_path):
+    directory = tmp_path / "bundles"
+    assert main(argv + ['--export-bundles', str(directory), '--abi', ABI_FILE, '--max-calls', "6"]) == 0
+    journal = RunJournal(SHEET_URL, argv[argv.index('--journal') + 1])
+    bundles = [str(directory / "bundle-001.json"), str(directory / "bundle-002.json")]
+    assert sorted(set(bundle for _, bundle in journal.exported_rows().values())) == bundles
+
+    # A second export, or a run through another backend, leaves the waiting rows out
+    assert main(argv + ['--export-bundles', str(tmp_path / "again"), '--abi', ABI_FILE]) == 0
+    assert read_manifest(str(tmp_path / "again")) == {}
+    server, url = serve_stub_node(block_time=0.02)
+    try:
+        assert main(argv + ['--backend', 'rpc', '--rpc-url', url, '--abi', ABI_FILE]) == 0
+        assert server.node.transactions == {}
+
+        assert main(argv + ['--mark-executed', bundles[0]]) == 0
+        assert sorted(journal.completed_rows()) == list(range(2, 8))
+        dedupe = DedupeIndex(DEFAULT_CONTRACT_URL, path=argv[argv.index('--dedupe-db') + 1])
+        assert dedupe.count() == 6
+        dedupe.close()
+
+        # Only the rows of the bundle not yet executed remain waiting
+        assert main(argv + ['--backend', 'rpc', '--rpc-url', url, '--abi', ABI_FILE, '--resume']) == 0
+        assert server.node.transactions == {}
+    finally:
+        server.shutdown()
+    assert sorted(journal.exported_rows()) == list(range(8, 12))
+
+def test_mark_executed_checks_the_bundle(argv, tmp_path):
+    directory = tmp_path / "bundles"
+    assert main(argv + ['--export-bundles', str(directory), '--abi', ABI_FILE]) == 0
+    assert main(argv + ['--mark-executed', str(directory / "bundle-009.json")]) == 1
+    # Rows outside the range read now can't be checked against the sheet
+    assert main(argv + ['--end-row', '5', '--mark-executed', str(directory / "bundle-001.json")]) == 1
+    journal = RunJournal(SHEET_URL, argv[argv.index('--journal') + 1])
+    assert sorted(journal.completed_rows()) == [2, 3, 4, 5]
+    assert main(argv + ['--mark-executed', "x", '--export-bundles', str(directory)]) == 2
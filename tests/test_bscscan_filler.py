@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from bscscan_filler import asks_operator, auto_prompt, console_prompt
+
+def test_asks_operator():
+    assert asks_operator(console_prompt, 'next_row')
+    assert not asks_operator(auto_prompt(), 'next_row')
+    assert asks_operator(auto_prompt({'next_row': None}), 'next_row')
+    assert not asks_operator(auto_prompt({'next_row': None}), 'retry')
+
+def test_auto_prompt_asks_only_unanswered_questions(monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda message: "q")
+    prompt = auto_prompt({'next_row': None, 'retry': 'n'})
+    assert prompt('next_row', "Row 2 filled: ") == "q"
+    assert prompt('retry', "Retry this row? ") == "n"
+    assert prompt('captcha', "CAPTCHA? ") == "n"
@@ -0,0 +1,92 @@
+import os
+import json
+
+import pytest
+
+from contract_call import encode_call, function_selector, EncodingError
+from call_bundles import (CalldataEncoder, encode_aggregate3, chunk_calls, export_bundles, calldata_gas,
+                          AGGREGATE3_SIGNATURE, MULTICALL3_ADDRESS, MANIFEST_FILE)
+
+CONTRACT = "0xBD576D184f5843881e471f9292036a076CB532b0"
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+SIGNATURE = 'sendLockByAdmin(uint8,address,uint256)'
+
+def words(data):
+    return [int.from_bytes(data[i:i + 32], 'big') for i in range(0, len(data), 32)]
+
+@pytest.mark.parametrize("signature", [SIGNATURE, 'f(uint8,address,uint128)'])
+def test_encoder_matches_encode_call(signature):
+    encoded, invalid = CalldataEncoder(signature).encode_rows([(2, [ADDRESS, "1.5"])])
+    assert invalid == []
+    assert encoded[0][2] == encode_call(signature, (2, ADDRESS, 15 * 10 ** 17))
+
+def test_encoder_uses_the_declared_types():
+    encoded, invalid = CalldataEncoder('f(uint8,address,uint8)').encode_rows([(2, [ADDRESS, "1"])])
+    assert encoded == []
+    assert "uint8" in invalid[0][2]
+
+def test_encoder_rejects_other_arities():
+    with pytest.raises(EncodingError):
+        CalldataEncoder('f(uint256,address)')
+
+def test_encoder_reports_bad_rows():
+    rows = [(2, ["0x123", "1"]), (3, [ADDRESS, "x"]), (4, [ADDRESS])]
+    encoded, invalid = CalldataEncoder(SIGNATURE).encode_rows(rows)
+    assert encoded == []
+    assert [row_number for row_number, _, _ in invalid] == [2, 3, 4]
+
+def test_encode_aggregate3_layout():
+    calls = [bytes.fromhex("aabbccdd") + bytes(32), bytes.fromhex("11223344")]
+    data = encode_aggregate3(CONTRACT, calls)
+    assert data[:4] == function_selector(AGGREGATE3_SIGNATURE)
+    head = words(data[4:])
+    # Offset of the array, its length, then the offsets of the two tuples
+    assert head[:4] == [32, 2, 64, 64 + 4 * 32 + 64]
+    first = data[4 + 32 + 32 + head[2]:]
+    assert words(first)[:4] == [int(CONTRACT, 16), 0, 96, len(calls[0])]
+    assert first[128:128 + len(calls[0])] == calls[0]
+    second = data[4 + 32 + 32 + head[3]:]
+    assert words(second)[3] == 4 and second[128:132] == calls[1]
+    assert len(second) == 4 * 32 + 32
+
+def test_encode_aggregate3_allow_failure():
+    data = encode_aggregate3(CONTRACT, [b"\x01"], allow_failure=True)
+    assert words(data[4 + 96:])[1] == 1
+
+def test_chunk_calls_respects_budget_and_count():
+    data = CalldataEncoder(SIGNATURE).encode(ADDRESS, 1)
+    encoded = [(i, None, data) for i in range(10)]
+    assert [len(chunk) for chunk in chunk_calls(encoded, max_calls=4)] == [4, 4, 2]
+    per_call = 60000 + 5000 + calldata_gas(data) + 4 * (-len(data) % 32) + 16 * 96
+    chunks = list(chunk_calls(encoded, gas_budget=21000 + 3 * per_call))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    with pytest.raises(ValueError):
+        list(chunk_calls(encoded, gas_budget=50000))
+
+@pytest.mark.parametrize("bundle_format", ['safe', 'calls', 'multicall3'])
+def test_export_bundles(tmp_path, bundle_format):
+    rows = [(2, [ADDRESS, "1"]), (3, ["bad", "1"]), (4, [ADDRESS, "2"]), (5, [ADDRESS, "3"])]
+    paths, invalid = export_bundles(rows, CONTRACT, str(tmp_path), SIGNATURE, bundle_format, chain_id=97,
+                                    sender=ADDRESS, max_calls=2)
+    assert [row_number for row_number, _, _ in invalid] == [3]
+    assert [os.path.basename(path) for path in paths] == ["bundle-001.json", "bundle-002.json"]
+    with open(tmp_path / MANIFEST_FILE, encoding='utf-8') as f:
+        assert json.load(f)['bundles'] == {"bundle-001.json": [2, 4], "bundle-002.json": [5]}
+    with open(paths[0], encoding='utf-8') as f:
+        document = json.load(f)
+    expected = "0x" + encode_call(SIGNATURE, (2, ADDRESS, 10 ** 18)).hex()
+    if bundle_format == 'safe':
+        assert document['chainId'] == "97"
+        assert document['transactions'][0]['data'] == expected
+    elif bundle_format == 'calls':
+        assert document['version'] == "2.0.0"
+        assert document['chainId'] == "0x61" and document['from'] == ADDRESS
+        assert [call['data'] for call in document['calls']][0] == expected
+    else:
+        assert document['to'] == MULTICALL3_ADDRESS
+        assert expected[2:] in document['data']
+        assert os.path.exists(tmp_path / "bundle-001.hex")
+
+def test_export_bundles_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_bundles([], CONTRACT, str(tmp_path), SIGNATURE, 'zip')
@@ -0,0 +1,76 @@
+import os
+import re
+import json
+
+import pytest
+
+from stub_rpc_node import ABI_FILE, SEND_LOCK_SELECTOR
+from contract_call import (function_selector, argument_types, encode_call, send_lock_calldata, load_abi,
+                           signature_from_abi, EncodingError)
+
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+SIGNATURE = 'sendLockByAdmin(uint8,address,uint256)'
+FORM = os.path.join(os.path.dirname(ABI_FILE), "write_contract_iframe.html")
+
+def test_function_selector():
+    assert function_selector('transfer(address,uint256)').hex() == "a9059cbb"
+    assert function_selector('aggregate3((address,bool,bytes)[])').hex() == "82ad56cb"
+
+def test_argument_types():
+    assert argument_types(SIGNATURE) == ('uint8', 'address', 'uint256')
+    assert argument_types('f()') == ()
+    with pytest.raises(EncodingError):
+        argument_types('f(string)')
+    with pytest.raises(EncodingError):
+        argument_types('not a signature')
+
+def test_encode_call():
+    data = encode_call('transfer(address,uint256)', (ADDRESS, 10 ** 18))
+    assert data.hex() == ("a9059cbb" + "0" * 24 + ADDRESS[2:].lower()
+                          + format(10 ** 18, '064x'))
+
+def test_send_lock_calldata():
+    data = send_lock_calldata(SIGNATURE, ADDRESS, 5)
+    assert len(data) == 4 + 3 * 32
+    assert data[:4].hex() == SEND_LOCK_SELECTOR
+    assert int.from_bytes(data[4:36], 'big') == 2
+    assert data[48:68].hex() == ADDRESS[2:].lower()
+    assert int.from_bytes(data[68:], 'big') == 5
+
+def test_signature_from_abi_matches_the_form():
+    signature = signature_from_abi(load_abi(ABI_FILE))
+    assert signature == SIGNATURE
+    # The form labels each input "name (type)"
+    with open(FORM, encoding='utf-8') as f:
+        labels = re.findall(r'<label>\w+ \((\w+)\) <input id="input_6_', f.read())
+    assert argument_types(signature) == tuple(labels)
+
+def test_load_abi_formats(tmp_path):
+    abi = load_abi(ABI_FILE)
+    for document in ({'abi': abi}, {'status': "1", 'message': "OK", 'result': json.dumps(abi)}):
+        path = tmp_path / "abi.json"
+        path.write_text(json.dumps(document), encoding='utf-8')
+        assert load_abi(str(path)) == abi
+    path.write_text(json.dumps({'status': "0", 'result': None}), encoding='utf-8')
+    with pytest.raises(EncodingError):
+        load_abi(str(path))
+
+def test_signature_from_abi_rejects():
+    function = {'type': 'function', 'name': 'sendLockByAdmin', 'inputs': [{'type': 'uint8'}]}
+    with pytest.raises(EncodingError):
+        signature_from_abi([])
+    with pytest.raises(EncodingError):
+        signature_from_abi([function, dict(function, inputs=[])])
+    with pytest.raises(EncodingError):
+        signature_from_abi([dict(function, inputs=[{'type': 'string'}])])
+
+@pytest.mark.parametrize("signature, args", [
+    ('f(uint8)', (256,)),
+    ('f(uint256)', (-1,)),
+    ('f(uint256)', ("abc",)),
+    ('f(address)', ("0x123",)),
+    ('f(uint256,uint256)', (1,)),
+])
+def test_encode_call_rejects(signature, args):
+    with pytest.raises(EncodingError):
+        encode_call(signature, args)
@@ -0,0 +1,70 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("undetected_chromedriver")
+if not any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")):
+    pytest.skip("Chrome is not installed", allow_module_level=True)
+
+from fixture_server import serve_fixture
+from browser_session import create_driver
+from contract_form import ContractFrame, wait_for_page_ready, fill_row, clear_row, FILL_MODE_KEYS, FILL_MODE_JS
+from bscscan_filler import fill_bscscan_contract, auto_prompt
+from dedupe_index import DedupeIndex
+from row_scheduler import FILLED
+from run_journal import RunJournal, CONFIRMED
+
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+CONTRACT_URL = "https://bscscan.com/token/0xBD576D184f5843881e471f9292036a076CB532b0#writeContract"
+
+@pytest.fixture(scope="module")
+def page():
+    server, url = serve_fixture()
+    driver = create_driver(headless=True)
+    try:
+        driver.get(url + "?collapse_ms=50&enable_ms=50")
+        wait_for_page_ready(driver)
+        yield driver, ContractFrame(driver)
+    finally:
+        driver.quit()
+        server.shutdown()
+
+@pytest.mark.parametrize("fill_mode", [FILL_MODE_JS, FILL_MODE_KEYS])
+def test_rows_reach_the_page_input_events(page, fill_mode):
+    driver, frame = page
+    for value_in_wei in (10 ** 18, 5):
+        fill_row(driver, frame, ADDRESS, value_in_wei, fill_mode)
+        # The fixture tracks values through input/change events, like the real dapp
+        state = driver.execute_script("return window.__formState;") or {}
+        assert state.get('input_6_2') == ADDRESS
+        assert state.get('input_6_3') == str(value_in_wei)
+        clear_row(driver, frame, fill_mode)
+
+def test_frame_is_entered_once(page):
+    driver, frame = page
+    frame.enter()
+    assert not frame.enter()
+    driver.refresh()
+    wait_for_page_ready(driver)
+    assert frame.enter()
+
+@pytest.mark.parametrize("answers, outcome", [(None, FILLED), ({'next_row': None}, CONFIRMED)])
+def test_only_operator_answers_confirm_rows(tmp_path, monkeypatch, answers, outcome):
+    # The operator presses Enter whenever next_row is put to them
+    monkeypatch.setattr('builtins.input', lambda message: "")
+    rows = [(2, [ADDRESS, "1"]), (3, [ADDRESS, "2"])]
+    dedupe_path = str(tmp_path / "dedupe.db")
+    journal = RunJournal("sheet", str(tmp_path / "journal.jsonl"), dedupe=DedupeIndex(CONTRACT_URL, path=dedupe_path))
+    server, url = serve_fixture()
+    try:
+        counts = fill_bscscan_contract(url + "?collapse_ms=50&enable_ms=50", rows, fill_mode=FILL_MODE_JS,
+                                       journal=journal, prompt=auto_prompt(answers), headless=True)
+    finally:
+        server.shutdown()
+    assert counts[FILLED] == 2
+    latest = {entry['row']: entry['outcome'] for entry in journal._entries()}
+    assert latest == {2: outcome, 3: outcome}
+    dedupe = DedupeIndex(CONTRACT_URL, path=dedupe_path)
+    assert dedupe.contains(rows[0][1]) == (outcome == CONFIRMED)
+    dedupe.close()
@@ -0,0 +1,52 @@
+import pytest
+
+from dedupe_index import DedupeIndex, contract_id, submission_key
+
+CONTRACT_URL = "https://bscscan.com/address/0xBD576D184f5843881e471f9292036a076CB532b0#writeContract"
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+@pytest.fixture
+def dedupe(tmp_path):
+    index = DedupeIndex(CONTRACT_URL, path=str(tmp_path / "dedupe.db"))
+    yield index
+    index.close()
+
+def test_contract_id():
+    assert contract_id(CONTRACT_URL) == "0xbd576d184f5843881e471f9292036a076cb532b0"
+    assert contract_id("not a url") == "not a url"
+
+def test_key_ignores_address_case_and_amount_spelling(dedupe):
+    assert dedupe.key([ADDRESS, "1"]) == dedupe.key([ADDRESS.lower(), "1.000"])
+    assert dedupe.key([ADDRESS, "1"]) != dedupe.key([ADDRESS, "2"])
+    assert dedupe.key([ADDRESS, "bad"]) is None
+
+def test_key_depends_on_the_contract():
+    assert submission_key(ADDRESS, 1, "a") != submission_key(ADDRESS, 1, "b")
+
+def test_claim_catches_repeats_within_a_run(dedupe):
+    assert dedupe.claim([ADDRESS, "1"])
+    assert not dedupe.claim([ADDRESS.lower(), "1.0"])
+    assert dedupe.claim([ADDRESS, "2"])
+
+def test_release_gives_the_claim_back(dedupe):
+    row = [ADDRESS, "1"]
+    assert dedupe.claim(row)
+    dedupe.release(row)
+    assert dedupe.claim(row)
+
+def test_invalid_rows_are_left_to_the_fill_loop(dedupe):
+    assert dedupe.claim([ADDRESS, "bad"])
+    assert dedupe.claim([ADDRESS, "bad"])
+
+def test_added_rows_persist(tmp_path, dedupe):
+    row = [ADDRESS, "1"]
+    dedupe.claim(row)
+    dedupe.add(2, row)
+    dedupe.add(2, row)
+    dedupe.close()
+    reopened = DedupeIndex(CONTRACT_URL, path=dedupe.path)
+    assert reopened.count() == 1
+    assert reopened.contains(row)
+    assert not reopened.claim(row)
+    assert DedupeIndex("0x" + "1" * 40, path=dedupe.path).claim(row)
+    reopened.close()
@@ -0,0 +1,62 @@
+import pytest
+
+from dedupe_index import DedupeIndex
+from row_scheduler import RowScheduler, IN_FLIGHT, PENDING, FILLED, SKIPPED, FAILED
+
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+def rows(count):
+    return [(i + 2, [ADDRESS, str(i + 1)]) for i in range(count)]
+
+def test_rows_are_handed_out_in_order():
+    scheduler = RowScheduler(rows(2))
+    assert scheduler.next_row()[0] == 2
+    assert scheduler.state == IN_FLIGHT
+    scheduler.filled()
+    assert scheduler.next_row()[0] == 3
+    scheduler.skip()
+    assert scheduler.next_row() is None
+    assert scheduler.counts == {FILLED: 1, SKIPPED: 1, FAILED: 0}
+
+def test_next_row_refuses_while_a_row_is_in_flight():
+    scheduler = RowScheduler(rows(2))
+    scheduler.next_row()
+    with pytest.raises(RuntimeError):
+        scheduler.next_row()
+
+def test_retry_hands_the_row_out_again_first():
+    scheduler = RowScheduler(rows(2), max_retries=1)
+    scheduler.next_row()
+    assert scheduler.retry()
+    assert scheduler.state == PENDING
+    assert scheduler.next_row()[0] == 2
+    assert scheduler.attempts == 2
+    assert not scheduler.retry()
+    assert scheduler.counts[FAILED] == 1
+    assert scheduler.next_row()[0] == 3
+    assert scheduler.attempts == 1
+
+def test_rows_are_pulled_lazily():
+    pulled = []
+
+    def source():
+        for row in rows(3):
+            pulled.append(row[0])
+            yield row
+
+    scheduler = RowScheduler(source())
+    assert scheduler.has_pending()
+    assert pulled == [2]
+
+def test_dedupe_skips_repeats_and_releases_unfilled_rows(tmp_path):
+    dedupe = DedupeIndex(ADDRESS, path=str(tmp_path / "dedupe.db"))
+    repeated = [(2, [ADDRESS, "1"]), (3, [ADDRESS, "1.0"]), (4, [ADDRESS, "2"])]
+    scheduler = RowScheduler(repeated, dedupe=dedupe)
+    assert scheduler.next_row()[0] == 2
+    scheduler.filled()
+    assert scheduler.next_row()[0] == 4
+    assert scheduler.counts[SKIPPED] == 1
+    scheduler.fail()
+    assert dedupe.claim([ADDRESS, "2"])
+    assert not dedupe.claim([ADDRESS, "1"])
+    dedupe.close()
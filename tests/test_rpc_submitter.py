@@ -0,0 +1,173 @@
+import pytest
+
+from stub_rpc_node import serve_stub_node, DEV_ACCOUNT, ABI_FILE
+from amounts import to_wei
+from contract_call import send_lock_calldata, load_abi, signature_from_abi
+from dedupe_index import DedupeIndex
+from rpc_client import RpcClient, RpcError
+from rpc_submitter import RpcSubmitter
+from row_scheduler import FILLED, SKIPPED, FAILED, PENDING
+from run_journal import RunJournal, CONFIRMED, UNKNOWN
+
+CONTRACT = "0xBD576D184f5843881e471f9292036a076CB532b0"
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+SIGNATURE = signature_from_abi(load_abi(ABI_FILE))
+
+class FlakyClient(RpcClient):
+    """
+    RpcClient whose eth_sendTransaction calls misbehave on chosen attempts
+    (counted from 1): lost before reaching the node, answered but lost on
+    the way back, or preceded by another sender using the next nonce.
+    """
+
+    def __init__(self, url, node, lose_request=(), lose_response=(), steal_nonce=()):
+        super().__init__(url)
+        self.node = node
+        self.lose_request = lose_request
+        self.lose_response = lose_response
+        self.steal_nonce = steal_nonce
+        self.sends = 0
+        self.submitter = None
+        self.most_in_flight = 0
+
+    def call(self, method, *params, retry=True):
+        if method == 'eth_sendTransaction':
+            self.sends += 1
+            if self.submitter is not None:
+                self.most_in_flight = max(self.most_in_flight, len(self.submitter._in_flight))
+            if self.sends in self.steal_nonce:
+                self.node.nonces[DEV_ACCOUNT] = self.node.nonces.get(DEV_ACCOUNT, 0) + 1
+            if self.sends in self.lose_request:
+                raise RpcError("timed out")
+            if self.sends in self.lose_response:
+                super().call(method, *params, retry=retry)
+                raise RpcError("timed out")
+        return super().call(method, *params, retry=retry)
+
+@pytest.fixture
+def node():
+    server, url = serve_stub_node(block_time=0.05)
+    yield server.node, url
+    server.shutdown()
+
+@pytest.fixture
+def journal(tmp_path):
+    def open_journal():
+        dedupe = DedupeIndex(CONTRACT, path=str(tmp_path / "dedupe.db"))
+        return RunJournal("sheet", str(tmp_path / "journal.jsonl"), dedupe=dedupe)
+    return open_journal
+
+def sample_rows(count):
+    return [(i + 2, [ADDRESS, str(i + 1)]) for i in range(count)]
+
+def submit(url, rows, journal=None, client=None, signature=SIGNATURE, **options):
+    options.setdefault('poll_interval', 0.01)
+    submitter = RpcSubmitter(url, CONTRACT, signature, journal=journal, dedupe=journal.dedupe if journal else None,
+                             client=client, **options)
+    if client is not None:
+        client.submitter = submitter
+    return submitter.run(rows)
+
+def outcomes(journal):
+    latest = {}
+    for entry in journal._entries():
+        latest[entry['row']] = entry['outcome']
+    return latest
+
+def test_rows_are_sent_with_consecutive_nonces(node, journal):
+    stub, url = node
+    run_journal = journal()
+    counts = submit(url, sample_rows(5), run_journal)
+    assert counts == {FILLED: 5, SKIPPED: 0, FAILED: 0, PENDING: 0}
+    assert sorted(tx['nonce'] for tx in stub.transactions.values()) == list(range(5))
+    assert set(outcomes(run_journal).values()) == {CONFIRMED}
+    assert run_journal.sent_transactions() == {}
+
+def test_max_in_flight_is_respected(node):
+    stub, url = node
+    client = FlakyClient(url, stub)
+    counts = submit(url, sample_rows(12), client=client, max_in_flight=3)
+    assert counts[FILLED] == 12
+    assert client.most_in_flight <= 3
+
+def test_invalid_and_repeated_rows(node, journal):
+    stub, url = node
+    rows = [(2, [ADDRESS, "1"]), (3, [ADDRESS, "x"]), (4, [ADDRESS, "1.0"]), (5, ["", "1"])]
+    counts = submit(url, rows, journal())
+    assert counts == {FILLED: 1, SKIPPED: 2, FAILED: 1, PENDING: 0}
+    assert len(stub.transactions) == 1
+
+def test_reverted_rows_fail_and_release_their_claim(tmp_path):
+    server, url = serve_stub_node(block_time=0.02, fail_every=2)
+    try:
+        run_journal = RunJournal("sheet", str(tmp_path / "journal.jsonl"),
+                                 dedupe=DedupeIndex(CONTRACT, path=str(tmp_path / "dedupe.db")))
+        counts = submit(url, sample_rows(4), run_journal, max_in_flight=1)
+    finally:
+        server.shutdown()
+    assert counts[FILLED] == 2 and counts[FAILED] == 2
+    assert outcomes(run_journal) == {2: CONFIRMED, 3: FAILED, 4: CONFIRMED, 5: FAILED}
+    dedupe = DedupeIndex(CONTRACT, path=str(tmp_path / "dedupe.db"))
+    assert dedupe.claim([ADDRESS, "2"])
+    assert not dedupe.claim([ADDRESS, "1"])
+    dedupe.close()
+
+def test_calls_with_another_signature_revert(node):
+    stub, url = node
+    counts = submit(url, sample_rows(2), signature='sendLockByAdmin(uint256,address,uint256)')
+    assert counts[FAILED] == 2 and counts[FILLED] == 0
+
+def test_nonce_taken_by_another_sender_is_resynced(node):
+    stub, url = node
+    client = FlakyClient(url, stub, steal_nonce=(2,))
+    counts = submit(url, sample_rows(3), client=client, max_in_flight=1)
+    assert counts[FILLED] == 3
+    assert sorted(tx['nonce'] for tx in stub.transactions.values()) == [0, 2, 3]
+
+def test_lost_request_is_sent_again_with_the_same_nonce(node):
+    stub, url = node
+    client = FlakyClient(url, stub, lose_request=(2,))
+    counts = submit(url, sample_rows(3), client=client)
+    assert counts[FILLED] == 3
+    assert len(stub.transactions) == 3
+
+def test_lost_response_is_not_failed_or_sent_again(node, journal):
+    stub, url = node
+    client = FlakyClient(url, stub, lose_response=(2,))
+    run_journal = journal()
+    counts = submit(url, sample_rows(3), run_journal, client=client)
+    assert counts == {FILLED: 2, SKIPPED: 0, FAILED: 0, PENDING: 1}
+    assert outcomes(run_journal)[3] == UNKNOWN
+    assert len(stub.transactions) == 3
+
+    # The next run neither resends it nor counts it as done
+    counts = submit(url, sample_rows(3), journal())
+    assert counts == {FILLED: 0, SKIPPED: 2, FAILED: 0, PENDING: 1}
+    assert len(stub.transactions) == 3
+
+def test_transactions_from_an_earlier_run_are_followed(node, journal):
+    stub, url = node
+    run_journal = journal()
+    rows = sample_rows(2)
+    data = "0x" + send_lock_calldata(SIGNATURE, ADDRESS, to_wei("1")).hex()
+    tx_hash = RpcClient(url).call('eth_sendTransaction', {'from': DEV_ACCOUNT, 'to': CONTRACT, 'data': data})
+    run_journal.record(rows[0][0], rows[0][1], FILLED, tx_hash)
+    run_journal.record(rows[1][0], rows[1][1], FILLED, "0x" + "ab" * 32)
+    run_journal.close()
+
+    run_journal = journal()
+    counts = submit(url, rows, run_journal)
+    assert counts[FILLED] == 2
+    # Row 2 was still known to the node; row 3's transaction was dropped and is sent again
+    assert len(stub.transactions) == 2
+    assert outcomes(run_journal) == {2: CONFIRMED, 3: CONFIRMED}
+
+def test_unmined_transactions_stay_pending(tmp_path):
+    server, url = serve_stub_node(block_time=60)
+    try:
+        run_journal = RunJournal("sheet", str(tmp_path / "journal.jsonl"))
+        counts = submit(url, sample_rows(2), run_journal, receipt_timeout=0.05)
+    finally:
+        server.shutdown()
+    assert counts[PENDING] == 2
+    assert set(run_journal.sent_transactions()) == {2, 3}
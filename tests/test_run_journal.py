@@ -0,0 +1,79 @@
+import json
+
+from dedupe_index import DedupeIndex
+from row_scheduler import FILLED, FAILED
+from run_journal import RunJournal, CONFIRMED, UNKNOWN, EXPORTED, row_hash, skip_completed, skip_exported
+
+SHEET = "https://docs.google.com/spreadsheets/d/test"
+ROW = ["0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed", "1"]
+
+def journal_at(tmp_path, **kwargs):
+    return RunJournal(SHEET, str(tmp_path / "journal.jsonl"), **kwargs)
+
+def test_completed_rows_follow_the_latest_outcome(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.record(2, ROW, CONFIRMED)
+    journal.record(3, ROW, CONFIRMED)
+    journal.record(3, ROW, FAILED)
+    journal.record(4, ROW, FILLED)
+    journal.close()
+    assert journal_at(tmp_path).completed_rows() == {2: row_hash(ROW)}
+
+def test_other_sheets_and_torn_lines_are_ignored(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.record(2, ROW, CONFIRMED)
+    journal.close()
+    RunJournal("other sheet", journal.path).record(3, ROW, CONFIRMED)
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"sheet": "' + SHEET + '", "row": 4, "outc')
+    assert journal_at(tmp_path).completed_rows() == {2: row_hash(ROW)}
+
+def test_skip_completed_checks_the_content_hash(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.record(2, ROW, CONFIRMED)
+    journal.record(3, ROW, CONFIRMED)
+    journal.close()
+    edited = [ROW[0], "2"]
+    rows = [(2, ROW), (3, edited), (4, ROW)]
+    assert list(skip_completed(rows, journal.completed_rows())) == [(3, edited), (4, ROW)]
+
+def test_sent_transactions(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.record(2, ROW, FILLED, "0xaa")
+    journal.record(3, ROW, FILLED, "0xbb")
+    journal.record(3, ROW, CONFIRMED, "0xbb")
+    journal.record(4, ROW, FILLED)
+    journal.record(5, ROW, UNKNOWN)
+    journal.close()
+    assert journal.sent_transactions() == {2: (row_hash(ROW), "0xaa"), 5: (row_hash(ROW), None)}
+
+def test_exported_rows_wait_for_their_bundle(tmp_path):
+    journal = journal_at(tmp_path)
+    journal.record(2, ROW, EXPORTED, bundle="/bundles/bundle-001.json")
+    journal.record(3, ROW, EXPORTED, bundle="/bundles/bundle-001.json")
+    journal.record(3, ROW, CONFIRMED)
+    journal.close()
+    exported = journal.exported_rows()
+    assert exported == {2: (row_hash(ROW), "/bundles/bundle-001.json")}
+    assert journal.completed_rows() == {3: row_hash(ROW)}
+    edited = [ROW[0], "2"]
+    assert list(skip_exported([(2, ROW), (4, ROW)], exported)) == [(4, ROW)]
+    assert list(skip_exported([(2, edited)], exported)) == [(2, edited)]
+
+def test_records_are_written_before_close(tmp_path):
+    journal = journal_at(tmp_path, sync_every=100)
+    journal.record(2, ROW, CONFIRMED, "0xaa")
+    with open(journal.path, encoding='utf-8') as f:
+        entry = json.loads(f.readline())
+    assert entry['row'] == 2 and entry['outcome'] == CONFIRMED and entry['tx'] == "0xaa"
+    journal.close()
+
+def test_confirmed_rows_go_to_the_dedupe_index(tmp_path):
+    dedupe = DedupeIndex("https://bscscan.com/address/0xBD576D184f5843881e471f9292036a076CB532b0",
+                         path=str(tmp_path / "dedupe.db"))
+    journal = journal_at(tmp_path, dedupe=dedupe)
+    journal.record(2, ROW, FILLED)
+    assert not dedupe.contains(ROW)
+    journal.record(2, ROW, CONFIRMED)
+    assert dedupe.contains(ROW)
+    journal.close()
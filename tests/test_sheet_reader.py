@@ -0,0 +1,138 @@
+import time
+
+import pytest
+
+from fake_sheets import FakeClient
+from sheet_cache import SheetSnapshotCache
+from sheet_reader import (register_client, clear_client_cache, open_worksheet, iter_sheet_data, iter_valid_rows,
+                          prefetch, column_letter, iter_sheet_chunks)
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/fake/edit"
+
+@pytest.fixture
+def client(tmp_path):
+    fake = FakeClient(rows=50, invalid_every=10)
+    creds_path = str(tmp_path / "service_account.json")
+    register_client(fake, creds_path)
+    yield fake, creds_path
+    clear_client_cache()
+
+def test_rows_carry_sheet_row_numbers(client):
+    fake, creds_path = client
+    rows = list(iter_sheet_data(SHEET_URL, 2, 21, [1, 2], creds_path=creds_path, chunk_size=7))
+    assert [row_number for row_number, _ in rows] == list(range(2, 22))
+    assert rows[0][1] == [fake.worksheet.cell(2, 1), fake.worksheet.cell(2, 2)]
+    assert [row_number for row_number, _ in iter_valid_rows(rows)] == [n for n in range(2, 22) if n % 10]
+
+def test_cache_serves_an_unchanged_sheet(client):
+    fake, creds_path = client
+    cache = SheetSnapshotCache()
+    first = list(iter_sheet_data(SHEET_URL, 2, 21, [1, 2], creds_path=creds_path, cache=cache))
+    calls = fake.worksheet.calls
+    assert list(iter_sheet_data(SHEET_URL, 2, 21, [1, 2], creds_path=creds_path, cache=cache)) == first
+    assert fake.worksheet.calls == calls
+
+    fake.worksheet.spreadsheet.lastUpdateTime = "2024-01-02T00:00:00.000Z"
+    list(iter_sheet_data(SHEET_URL, 2, 21, [1, 2], creds_path=creds_path, cache=cache))
+    assert fake.worksheet.calls > calls
+
+def test_cache_is_skipped_without_a_revision(client):
+    fake, creds_path = client
+    cache = SheetSnapshotCache()
+    open_worksheet(SHEET_URL, creds_path).spreadsheet.lastUpdateTime = None
+    for _ in range(2):
+        calls = fake.worksheet.calls
+        list(iter_sheet_data(SHEET_URL, 2, 21, [1, 2], creds_path=creds_path, cache=cache))
+        assert fake.worksheet.calls > calls
+
+def test_prefetch_stops_fetching_when_the_consumer_stops():
+    fetched = []
+
+    def chunks():
+        for index in range(10):
+            fetched.append(index)
+            yield index
+
+    items = prefetch(chunks(), depth=1)
+    assert next(items) == 0
+    # The producer fills the one-slot buffer, fetches one more and waits to hand it over
+    time.sleep(0.05)
+    assert fetched == [0, 1, 2]
+    items.close()
+    time.sleep(0.05)
+    assert fetched == [0, 1, 2]
+
+def test_prefetch_reraises_producer_errors():
+    def chunks():
+        yield 1
+        raise ValueError("API error")
+
+    items = prefetch(chunks())
+    assert next(items) == 1
+    with pytest.raises(ValueError):
+        next(items)
+
+class GridSheet:
+    """
+    Worksheet stand-in serving get() from a list of rows, trimming trailing
+    empty cells like the Sheets API does, and recording requested ranges.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.ranges = []
+
+    def get(self, range_name):
+        self.ranges.append(range_name)
+        start, end = range_name.split(':')
+        first_col, first_row = _cell(start)
+        last_col, last_row = _cell(end)
+        values = []
+        for row in self.grid[first_row - 1:last_row]:
+            cells = list(row[first_col - 1:last_col])
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        return values
+
+def _cell(name):
+    letters = name.rstrip("0123456789")
+    column = 0
+    for letter in letters:
+        column = column * 26 + ord(letter) - ord('A') + 1
+    return column, int(name[len(letters):])
+
+def grid(rows, columns=3):
+    return [[f"{chr(ord('a') + c)}{r}" for c in range(columns)] for r in range(1, rows + 1)]
+
+def test_column_letter():
+    assert [column_letter(c) for c in (1, 2, 26, 27, 28, 52, 702, 703)] == [
+        "A", "B", "Z", "AA", "AB", "AZ", "ZZ", "AAA"]
+
+def test_chunks_request_only_the_range():
+    sheet = GridSheet(grid(20))
+    chunks = list(iter_sheet_chunks(sheet, 2, 11, [1, 2], chunk_size=4))
+    assert sheet.ranges == ["A2:B5", "A6:B9", "A10:B11"]
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert chunks[0][0] == ["a2", "b2"] and chunks[-1][-1] == ["a11", "b11"]
+
+def test_chunk_boundaries():
+    sheet = GridSheet(grid(20))
+    assert [len(chunk) for chunk in iter_sheet_chunks(sheet, 2, 9, [1, 2], chunk_size=4)] == [4, 4]
+    assert sheet.ranges == ["A2:B5", "A6:B9"]
+    assert [len(chunk) for chunk in iter_sheet_chunks(sheet, 5, 5, [1, 2], chunk_size=4)] == [1]
+    assert sheet.ranges[-1] == "A5:B5"
+
+def test_short_rows_are_padded():
+    rows = grid(4)
+    rows[1][1:] = ["", ""]
+    rows[2][2] = ""
+    chunk, = iter_sheet_chunks(GridSheet(rows), 2, 3, [1, 2, 3])
+    assert chunk == [["a2", "", ""], ["a3", "b3", ""]]
+
+def test_non_contiguous_columns():
+    sheet = GridSheet(grid(5, columns=4))
+    chunk, = iter_sheet_chunks(sheet, 2, 3, [4, 2])
+    # One range spans both columns; only the requested ones come back, in the requested order
+    assert sheet.ranges == ["B2:D3"]
+    assert chunk == [["d2", "b2"], ["d3", "b3"]]
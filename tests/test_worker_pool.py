@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+import worker_pool
+from worker_pool import BrowserWorkerPool, DONE, ERROR
+from amounts import to_wei
+from dedupe_index import DedupeIndex
+from row_scheduler import FILLED, SKIPPED, FAILED
+from run_journal import RunJournal, CONFIRMED
+
+CONTRACT_URL = "https://bscscan.com/token/0xBD576D184f5843881e471f9292036a076CB532b0#writeContract"
+ADDRESS = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+class StubDriver:
+    """Browser stand-in whose fills fail a set number of times per amount"""
+
+    def __init__(self, failures, lock):
+        self.failures = failures
+        self.lock = lock
+        self.filled = []
+        self.refreshes = 0
+
+    def get(self, url):
+        pass
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def quit(self):
+        pass
+
+    def fill(self, address, value_in_wei):
+        with self.lock:
+            if self.failures.get(value_in_wei, 0) > 0:
+                self.failures[value_in_wei] -= 1
+                raise RuntimeError("element not interactable")
+        self.filled.append((address, value_in_wei))
+
+class StubFrame:
+    def __init__(self, driver, *args):
+        pass
+
+    def invalidate(self):
+        pass
+
+@pytest.fixture
+def stub_page(monkeypatch):
+    # The page helpers drive the stub directly instead of going through selenium
+    monkeypatch.setattr(worker_pool, 'ContractFrame', StubFrame)
+    monkeypatch.setattr(worker_pool, 'wait_for_page_ready', lambda driver, *args: None)
+    monkeypatch.setattr(worker_pool, 'clear_row', lambda driver, frame, *args: None)
+    monkeypatch.setattr(worker_pool, 'fill_row',
+                        lambda driver, frame, address, value_in_wei, *args: driver.fill(address, value_in_wei))
+
+def driver_factory(failures=None):
+    drivers = []
+    lock = threading.Lock()
+
+    def create(headless, user_data_dir):
+        driver = StubDriver(failures if failures is not None else {}, lock)
+        drivers.append(driver)
+        return driver
+    return create, drivers
+
+@pytest.fixture
+def journal(tmp_path):
+    dedupe = DedupeIndex(CONTRACT_URL, path=str(tmp_path / "dedupe.db"))
+    return RunJournal("sheet", str(tmp_path / "journal.jsonl"), dedupe=dedupe)
+
+def sample_rows(count):
+    return [(i + 2, [ADDRESS, str(i + 1)]) for i in range(count)]
+
+def outcomes(journal):
+    latest = {}
+    for entry in journal._entries():
+        latest[entry['row']] = entry['outcome']
+    return latest
+
+def run_pool(rows, journal=None, failures=None, **options):
+    create, drivers = driver_factory(failures)
+    pool = BrowserWorkerPool(CONTRACT_URL, workers=2, journal=journal, dedupe=journal.dedupe if journal else None,
+                             driver_factory=create, **options)
+    counts = pool.run(rows)
+    return pool, counts, drivers
+
+def test_failed_fill_is_retried(stub_page):
+    pool, counts, drivers = run_pool(sample_rows(6), failures={to_wei("3"): 2}, max_retries=2)
+    assert counts == {FILLED: 6, SKIPPED: 0, FAILED: 0}
+    assert sum(driver.refreshes for driver in drivers) == 2
+    assert sorted(value for driver in drivers for _, value in driver.filled) == [to_wei(str(i)) for i in range(1, 7)]
+
+def test_failed_row_releases_its_claim(stub_page, journal, tmp_path):
+    rows = sample_rows(4)
+    pool, counts, drivers = run_pool(rows, journal, failures={to_wei("2"): 3}, max_retries=2)
+    assert counts == {FILLED: 3, SKIPPED: 0, FAILED: 1}
+    assert outcomes(journal) == {2: FILLED, 3: FAILED, 4: FILLED, 5: FILLED}
+    # The failed row can be claimed again; filled rows were never confirmed, so stay claimable too
+    assert journal.dedupe.claim(rows[1][1])
+    dedupe = DedupeIndex(CONTRACT_URL, path=str(tmp_path / "dedupe.db"))
+    assert dedupe.count() == 0
+    dedupe.close()
+
+def test_status_counts(stub_page):
+    pool, counts, drivers = run_pool(sample_rows(8), failures={to_wei("5"): 10}, max_retries=1)
+    status = pool.status()
+    assert [worker['state'] for worker in status.values()] == [DONE, DONE]
+    assert sum(worker['filled'] for worker in status.values()) == counts[FILLED] == 7
+    assert sum(worker['failed'] for worker in status.values()) == counts[FAILED] == 1
+    assert all(worker['row'] is None for worker in status.values())
+
+def test_only_submitted_rows_are_confirmed(stub_page, journal, tmp_path):
+    rows = sample_rows(4)
+    submitted = []
+
+    def on_filled(worker_id, driver, row_number, row):
+        submitted.append(row_number)
+        return row_number % 2 == 0
+
+    pool, counts, drivers = run_pool(rows, journal, on_filled=on_filled)
+    assert counts[FILLED] == 4 and sorted(submitted) == [2, 3, 4, 5]
+    assert outcomes(journal) == {2: CONFIRMED, 3: FILLED, 4: CONFIRMED, 5: FILLED}
+    dedupe = DedupeIndex(CONTRACT_URL, path=str(tmp_path / "dedupe.db"))
+    assert [dedupe.contains(row) for _, row in rows] == [True, False, True, False]
+    dedupe.close()
+
+def test_all_workers_failing_to_start(stub_page, journal):
+    def create(headless, user_data_dir):
+        raise RuntimeError("chrome not found")
+
+    pool = BrowserWorkerPool(CONTRACT_URL, workers=2, journal=journal, dedupe=journal.dedupe, driver_factory=create)
+    with pytest.raises(RuntimeError, match="All browser workers stopped"):
+        pool.run(sample_rows(10))
+    assert [worker['state'] for worker in pool.status().values()] == [ERROR, ERROR]
+    assert outcomes(journal) == {}
@@ -0,0 +1,206 @@
+import os
+import shutil
+import tempfile
+import threading
+import queue
+import logging
+from browser_session import create_driver
+from amounts import to_wei
+from row_scheduler import FILLED, SKIPPED, FAILED, MAX_RETRIES
+from run_journal import CONFIRMED
+from contract_form import (ContractFrame, wait_for_page_ready, fill_row, clear_row,
+                           FILL_MODE_JS, READY_TIMEOUT, POLL_INTERVAL)
+
+logger = logging.getLogger(__name__)
+
+# Worker states shown in status()
+STARTING = "starting"
+IDLE = "idle"
+FILLING = "filling"
+DONE = "done"
+ERROR = "error"
+
+class BrowserWorkerPool:
+    """
+    Fill rows with several browser sessions in parallel.
+
+    Each worker owns a Chrome instance with its own profile directory and
+    its own ContractFrame, and takes rows from a shared bounded queue fed
+    lazily from the row iterable. A row that fails is retried by the same
+    worker (after reloading its page) up to max_retries times.
+
+    With a DedupeIndex, rows whose address and amount were already
+    submitted, or repeat a row queued earlier in this run, are skipped
+    before they reach a worker.
+
+    A RunMetrics, if given, collects the step timings of every worker.
+
+    Workers never ask for input. on_filled(worker_id, driver, row_number,
+    row) runs after each filled row, e.g. to submit the form, and returns
+    True once the row was really submitted; only then is it journaled as
+    CONFIRMED (and added to the dedupe index). Without it rows are only
+    filled and stay FILLED, as in the CLI's automatic mode.
+    """
+
+    def __init__(self, contract_url, workers=2, fill_mode=FILL_MODE_JS, headless=True,
+                 profile_root=None, journal=None, on_filled=None, max_retries=MAX_RETRIES,
+                 timeout=READY_TIMEOUT, poll=POLL_INTERVAL, driver_factory=create_driver, dedupe=None,
+                 metrics=None):
+        self.contract_url = contract_url
+        self.workers = workers
+        self.fill_mode = fill_mode
+        self.headless = headless
+        self.profile_root = profile_root
+        self.journal = journal
+        self.on_filled = on_filled
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.poll = poll
+        self.driver_factory = driver_factory
+        self.dedupe = dedupe
+        self.metrics = metrics
+        self.counts = {FILLED: 0, SKIPPED: 0, FAILED: 0}
+        self._status = {}
+        self._lock = threading.Lock()
+        # undetected_chromedriver patches its driver binary on launch, so start one at a time
+        self._launch_lock = threading.Lock()
+
+    def status(self):
+        """Snapshot of each worker's state, current row and counts"""
+        with self._lock:
+            return {worker_id: dict(status) for worker_id, status in self._status.items()}
+
+    def run(self, rows):
+        """Fill every (row_number, [address, value]) pair and return the outcome counts"""
+        work = queue.Queue(maxsize=self.workers * 2)
+        profile_root = self.profile_root or tempfile.mkdtemp(prefix="bscscan-workers-")
+        threads = []
+        for worker_id in range(self.workers):
+            self._set_status(worker_id, state=STARTING, row=None, filled=0, failed=0)
+            profile_dir = os.path.join(profile_root, f"worker-{worker_id}")
+            thread = threading.Thread(target=self._work, args=(worker_id, profile_dir, work), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        try:
+            for row in rows:
+                row_number, row_data = row
+                if len(row_data) < 2 or not row_data[0] or not row_data[1]:
+                    logger.warning(f"Skipping row {row_number}: Invalid data format or empty fields")
+                    self._count(SKIPPED)
+                    self._record(row_number, row_data, SKIPPED)
+                    continue
+                if self.dedupe is not None and not self.dedupe.claim(row_data):
+                    logger.info(f"Skipping row {row_number}: same address and amount already submitted")
+                    self._count(SKIPPED)
+                    continue
+                # Blocks while all workers are busy and the queue is full
+                if not self._put(work, row, threads):
+                    raise RuntimeError("All browser workers stopped")
+        finally:
+            # One stop marker per worker
+            for _ in threads:
+                if not self._put(work, None, threads):
+                    break
+            for thread in threads:
+                thread.join()
+            if not self.profile_root:
+                shutil.rmtree(profile_root, ignore_errors=True)
+            if self.journal is not None:
+                self.journal.close()
+        if self.metrics is not None:
+            self.metrics.finish(self.counts)
+        logger.info(f"Worker pool finished: {self.counts[FILLED]} filled, "
+                    f"{self.counts[SKIPPED]} skipped, {self.counts[FAILED]} failed")
+        return self.counts
+
+    def _put(self, work, item, threads):
+        """Queue an item once there is room; returns False if every worker has stopped"""
+        while any(thread.is_alive() for thread in threads):
+            try:
+                work.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _work(self, worker_id, profile_dir, work):
+        driver = None
+        try:
+            with self._launch_lock:
+                driver = self.driver_factory(headless=self.headless, user_data_dir=profile_dir)
+            driver.get(self.contract_url)
+            wait_for_page_ready(driver, self.timeout, self.poll)
+            frame = ContractFrame(driver, self.timeout, self.poll)
+            self._set_status(worker_id, state=IDLE)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} could not start: {e}")
+            self._set_status(worker_id, state=ERROR, error=str(e))
+            if driver is not None:
+                driver.quit()
+            # Leave the queue to the other workers
+            return
+
+        try:
+            while True:
+                row = work.get()
+                if row is None:
+                    break
+                row_number, row_data = row
+                self._set_status(worker_id, state=FILLING, row=row_number)
+                submitted = self._fill_with_retries(worker_id, driver, frame, row_number, row_data)
+                if submitted is not None:
+                    self._count(FILLED, worker_id, 'filled')
+                    self._record(row_number, row_data, FILLED)
+                    if submitted:
+                        self._record(row_number, row_data, CONFIRMED)
+                else:
+                    self._count(FAILED, worker_id, 'failed')
+                    self._record(row_number, row_data, FAILED)
+                    if self.dedupe is not None:
+                        self.dedupe.release(row_data)
+                self._set_status(worker_id, state=IDLE, row=None)
+            self._set_status(worker_id, state=DONE)
+        finally:
+            driver.quit()
+
+    def _fill_with_retries(self, worker_id, driver, frame, row_number, row_data):
+        """Returns True if the row was filled and submitted, False if only filled, None if it failed"""
+        for attempt in range(self.max_retries + 1):
+            timer = self.metrics.start_row() if self.metrics is not None else None
+            try:
+                value_in_wei = to_wei(row_data[1])  # Exact conversion to integer wei
+                fill_row(driver, frame, row_data[0], value_in_wei, self.fill_mode, self.timeout, self.poll, timer)
+                submitted = False
+                if self.on_filled is not None:
+                    submitted = bool(self.on_filled(worker_id, driver, row_number, row_data))
+                    if timer is not None:
+                        timer.lap('submit')
+                clear_row(driver, frame, self.fill_mode, self.timeout, self.poll, timer)
+                if timer is not None:
+                    timer.finish()
+                logger.info(f"Worker {worker_id} filled row {row_number}")
+                return submitted
+            except Exception as e:
+                logger.warning(f"Worker {worker_id} failed row {row_number} (attempt {attempt + 1}): {e}")
+                frame.invalidate()
+                try:
+                    driver.refresh()
+                    wait_for_page_ready(driver, self.timeout, self.poll)
+                except Exception:
+                    pass
+        return None
+
+    def _count(self, outcome, worker_id=None, field=None):
+        with self._lock:
+            self.counts[outcome] += 1
+            if worker_id is not None:
+                self._status[worker_id][field] += 1
+
+    def _record(self, row_number, row_data, outcome):
+        if self.journal is not None:
+            self.journal.record(row_number, row_data, outcome)
+
+    def _set_status(self, worker_id, **changes):
+        with self._lock:
+            self._status.setdefault(worker_id, {}).update(changes)